@@ -0,0 +1,49 @@
+"""Compare commits/sec of the subprocess and fast-import commit backends.
+
+Usage: PYTHONPATH=src python benchmarks/bench_backends.py [--commits 200]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from common import git, make_config, make_repo
+
+from git_activity_generator.engine import ActivityEngine
+
+
+def run_backend(backend: str, commits: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp))
+        engine = ActivityEngine(make_config(repo, commit_backend=backend))
+        start = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+
+        began = time.perf_counter()
+        for idx in range(commits):
+            work_branch = engine.git.maybe_create_work_branch()
+            changed = engine.files.mutate()
+            engine.git.commit_all(engine.messages.generate(), start + timedelta(minutes=idx), paths=[changed])
+            engine.git.maybe_merge_to_default(work_branch)
+        engine.git.flush()
+        elapsed = time.perf_counter() - began
+
+        total = int(git(repo, "rev-list", "--count", "HEAD"))
+        return {"commits": commits, "seconds": round(elapsed, 3), "commits_per_sec": round(commits / elapsed, 1), "history": total}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=200)
+    args = parser.parse_args()
+    results = {name: run_backend(name, args.commits) for name in ("subprocess", "fast-import")}
+    results["speedup"] = round(results["fast-import"]["commits_per_sec"] / results["subprocess"]["commits_per_sec"], 1)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
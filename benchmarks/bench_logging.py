@@ -0,0 +1,105 @@
+"""Logging cost on the commit path: synchronous `basicConfig` versus the queued, sampled pipeline.
+
+Records go to a sink whose every write sleeps `--sink-latency` seconds,
+standing in for a slow terminal, a pipe to a log shipper under backpressure
+or a network filesystem. Two measurements per setup:
+
+* caller: microseconds a `log.debug` call costs the thread that makes it,
+  over `--calls` calls from one call site, and how many lines reached the sink;
+* backfill: commits/s of a verbose subprocess backfill (every git call logs).
+
+Usage: PYTHONPATH=src python benchmarks/bench_logging.py [--calls 20000] [--sink-latency 0.0005] [--days 5]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from common import make_config, make_repo
+
+from git_activity_generator.config import LogConfig
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.logger import TEXT_FORMAT, flush_logging, log_context, setup_logging, stop_logging
+
+SETUPS = {
+    "sync": None,
+    "async": LogConfig(debug_rate=0),
+    "async+sampled": LogConfig(),
+    "async+sampled json": LogConfig(format="json"),
+}
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def install(setup: str, sink: SlowSink) -> None:
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    cfg = SETUPS[setup]
+    if cfg is None:
+        # what `setup_logging` did before the queue: format and write on the calling thread
+        logging.basicConfig(level=logging.DEBUG, format=TEXT_FORMAT, stream=sink, force=True)
+    else:
+        setup_logging(True, cfg, sink)
+
+
+def bench_caller(setup: str, calls: int, latency: float) -> dict[str, float]:
+    sink = SlowSink(latency)
+    install(setup, sink)
+    log = logging.getLogger("git_activity_generator.git_ops")
+    began = time.perf_counter()
+    for idx in range(calls):
+        with log_context(day="2025-01-01", commit=idx):
+            log.debug("Running: %s", "git commit -q -m message")
+    seconds = time.perf_counter() - began
+    flush_logging()
+    return {"caller_us": round(seconds / calls * 1e6, 2), "lines": sink.lines}
+
+
+def bench_backfill(setup: str, days: int, latency: float) -> dict[str, float]:
+    sink = SlowSink(latency)
+    install(setup, sink)
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp))
+        engine = ActivityEngine(make_config(repo, verbose=True))
+        start = date(2025, 1, 6)
+        stats = engine.backfill(start, start + timedelta(days=days - 1), push_every=0, progress_every=0)
+    flush_logging()
+    return {"commits_per_sec": round(stats.commits_per_sec, 1), "backfill_lines": sink.lines}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sink-latency", type=float, default=0.0005, help="seconds each sink write sleeps")
+    parser.add_argument("--days", type=int, default=5, help="days of 20 commits per backfill")
+    parser.add_argument("--setups", default=",".join(SETUPS), help="comma-separated subset of: " + ", ".join(SETUPS))
+    args = parser.parse_args()
+
+    for setup in args.setups.split(","):
+        row = {"setup": setup, "sink_latency_s": args.sink_latency}
+        row.update(bench_caller(setup, args.calls, args.sink_latency))
+        row.update(bench_backfill(setup, args.days, args.sink_latency))
+        print(json.dumps(row), flush=True)
+    stop_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""Per-mutation cost of JSON edits as the target file grows.
+
+Compares the old read-strip-rewrite approach with the in-place tail patch.
+
+Usage: PYTHONPATH=src python benchmarks/bench_mutation.py [--max-entries 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from git_activity_generator.file_simulator import JSON_SEED, append_json_entries
+
+ENTRY = '\n  "generated_flag_{id}": true'
+
+
+def rewrite_whole_file(path: Path, entry: str) -> None:
+    if not path.exists():
+        path.write_bytes(JSON_SEED)
+    body = path.read_text(encoding="utf-8").rstrip("\n}\t ")
+    path.write_text(body + "," + entry + "\n}\n", encoding="utf-8")
+
+
+def time_per_mutation(path: Path, strategy: str, samples: int) -> float:
+    began = time.perf_counter()
+    if strategy == "rewrite":
+        for idx in range(samples):
+            rewrite_whole_file(path, ENTRY.format(id=idx))
+    else:
+        for idx in range(samples):
+            append_json_entries(path, [ENTRY.format(id=idx)])
+    return (time.perf_counter() - began) / samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-entries", type=int, default=200_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        size = 1_000
+        while size <= args.max_entries:
+            row: dict[str, float | int] = {"entries": size}
+            for strategy in ("rewrite", "tail-patch"):
+                path = Path(tmp) / f"{strategy}.json"
+                path.unlink(missing_ok=True)
+                append_json_entries(path, [ENTRY.format(id=idx) for idx in range(size)])
+                row["bytes"] = path.stat().st_size
+                row[f"{strategy}_us"] = round(time_per_mutation(path, strategy, args.samples) * 1e6, 1)
+                json.loads(path.read_text(encoding="utf-8"))
+            results.append(row)
+            size *= 10
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
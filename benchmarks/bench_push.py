@@ -0,0 +1,94 @@
+"""Multi-remote push: one `git push` per remote in turn versus all remotes at once.
+
+Every remote is a local bare repo. `--latency` adds a `pre-receive` hook that
+sleeps, standing in for a network round trip and server-side checks. Each round
+commits `--commits` new files and pushes them to every remote both ways (into
+separate sets of remotes, so each way sends the same objects).
+
+Usage: PYTHONPATH=src python benchmarks/bench_push.py [--remotes 1,2,4,8] [--latency 0.2] [--rounds 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from common import git, make_config, make_repo
+
+from git_activity_generator.config import PushConfig
+from git_activity_generator.metrics import Metrics
+from git_activity_generator.pushing import RemotePusher
+
+
+def add_remotes(root: Path, repo: Path, prefix: str, count: int, latency: float) -> list[str]:
+    names = []
+    for idx in range(count):
+        bare = root / f"{prefix}{idx}.git"
+        git(root, "init", "-q", "--bare", str(bare))
+        if latency:
+            hook = bare / "hooks" / "pre-receive"
+            hook.write_text(f"#!/bin/sh\ncat >/dev/null\nsleep {latency}\n", encoding="utf-8")
+            hook.chmod(0o755)
+        git(repo, "remote", "add", f"{prefix}{idx}", str(bare))
+        names.append(f"{prefix}{idx}")
+    return names
+
+
+def commit_batch(repo: Path, round_idx: int, commits: int) -> None:
+    for idx in range(commits):
+        (repo / f"r{round_idx}_{idx}.txt").write_text(f"{round_idx}-{idx}\n" * 200, encoding="utf-8")
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", f"round {round_idx} commit {idx}")
+
+
+def bench(remotes: int, latency: float, rounds: int, commits: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        repo = make_repo(root, with_origin=False)
+        sequential = add_remotes(root, repo, "seq", remotes, latency)
+        concurrent = add_remotes(root, repo, "par", remotes, latency)
+        metrics = Metrics()
+        pusher = RemotePusher(make_config(repo, push=PushConfig(remotes=concurrent)), repo, lambda: metrics)
+
+        seq_seconds = par_seconds = 0.0
+        for round_idx in range(rounds):
+            commit_batch(repo, round_idx, commits)
+            began = time.perf_counter()
+            for name in sequential:
+                subprocess.run(["git", "push", "-q", name, "main"], cwd=repo, check=True, capture_output=True)
+            seq_seconds += time.perf_counter() - began
+            began = time.perf_counter()
+            pusher.push("main")
+            par_seconds += time.perf_counter() - began
+
+    return {
+        "sequential_s": round(seq_seconds / rounds, 3),
+        "concurrent_s": round(par_seconds / rounds, 3),
+        "speedup": round(seq_seconds / par_seconds, 2),
+        "bytes_per_remote": sum(metrics.push_bytes.values()) // remotes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--remotes", default="1,2,4,8", help="comma-separated remote counts")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds each remote's pre-receive hook sleeps")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--commits", type=int, default=20, help="commits per pushed batch")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = []
+    for count in (int(value) for value in args.remotes.split(",")):
+        row = {"remotes": count, "latency_s": args.latency, **bench(count, args.latency, args.rounds, args.commits)}
+        results.append(row)
+        print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
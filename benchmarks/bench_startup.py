@@ -0,0 +1,76 @@
+"""CLI startup cost: wall time of short commands in fresh interpreters.
+
+Each command runs `--runs` times as `python -m git_activity_generator.cli`
+against a config in a throwaway directory, with the compiled config cache
+off (every run parses the YAML) and on (every run after the first reuses it).
+The bare interpreter start is measured as a floor.
+
+Usage: PYTHONPATH=src python benchmarks/bench_startup.py [--runs 20] [--config config/config.example.yaml]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import make_repo
+
+COMMANDS = {
+    "python -c pass": None,
+    "stop": ["stop"],
+    "report": ["report", "--no-history"],
+    "report (history)": ["report"],
+    "report --range": ["report", "--range", "2025-01-01..2025-12-31", "--heatmap", "--no-history"],
+}
+
+
+def time_command(argv: list[str], env: dict[str, str], cwd: Path, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - began) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--config", type=Path, default=Path(__file__).resolve().parent.parent / "config" / "config.example.yaml")
+    args = parser.parse_args()
+
+    src = Path(__file__).resolve().parent.parent / "src"
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        repo = make_repo(root, with_origin=False)
+        text = args.config.read_text(encoding="utf-8").replace("/path/to/target/repo", str(repo))
+        config = root / "config.yaml"
+        config.write_text(text.replace("dry_run: true", "dry_run: false").replace("verbose: true", "verbose: false"), encoding="utf-8")
+        base_env = {**os.environ, "PYTHONPATH": str(src), "GAG_CONFIG_CACHE": str(root / "cache")}
+
+        for name, command in COMMANDS.items():
+            for cache in ("off", "on"):
+                if command is None and cache == "on":
+                    continue
+                env = {**base_env, "GAG_CONFIG_CACHE": "off"} if cache == "off" else base_env
+                argv = [sys.executable, "-c", "pass"] if command is None else [sys.executable, "-m", "git_activity_generator.cli", "--config", str(config), *command]
+                if command is not None and cache == "on":
+                    time_command(argv, env, root, 1)  # populate the cache
+                samples = time_command(argv, env, root, args.runs)
+                row = {"command": name, "config_cache": cache if command else "-", "min_ms": round(min(samples), 1), "median_ms": round(statistics.median(samples), 1)}
+                results.append(row)
+                print(f"{name:<18} cache={row['config_cache']:<3} min {row['min_ms']:>7.1f} ms  median {row['median_ms']:>7.1f} ms", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from git_activity_generator.config import AppConfig, AuthorProfile, BranchingConfig
+
+
+# a fixed date for the initial commit, so two repos built from the same seed end on the same SHA
+EPOCH = "2024-12-01T00:00:00+00:00"
+
+
+def git(repo: Path, *args: str) -> str:
+    out = subprocess.run(["git", *args], cwd=repo, check=True, text=True, capture_output=True)
+    return out.stdout.strip()
+
+
+def make_repo(root: Path, files: int = 0, with_origin: bool = True, name: str = "repo") -> Path:
+    """Create a committed local repo `root/name` with `files` tracked files and a bare `origin` next to it."""
+    repo = root / name
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.name", "Bench Bot")
+    git(repo, "config", "user.email", "bench@example.com")
+    (repo / "README.md").write_text("# bench\n", encoding="utf-8")
+    for idx in range(files):
+        target = repo / "src" / f"pkg_{idx % 100}" / f"mod_{idx}.py"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"VALUE_{idx} = {idx}\n", encoding="utf-8")
+    git(repo, "add", "-A")
+    env = {**os.environ, "GIT_AUTHOR_DATE": EPOCH, "GIT_COMMITTER_DATE": EPOCH}
+    subprocess.run(["git", "commit", "-q", "-m", "initial"], cwd=repo, check=True, env=env)
+
+    if with_origin:
+        origin = root / f"{name}-origin.git"
+        git(root, "init", "-q", "--bare", str(origin))
+        git(repo, "remote", "add", "origin", str(origin))
+        git(repo, "push", "-q", "origin", "main")
+    return repo
+
+
+def make_config(repo: Path, **overrides: Any) -> AppConfig:
+    cfg = AppConfig(
+        repo_path=str(repo),
+        deterministic_seed=1234,
+        verbose=False,
+        daily_min_commits=20,
+        daily_max_commits=20,
+        max_commits_per_day=20,
+        branching=BranchingConfig(feature_branch_probability=0.2, hotfix_branch_probability=0.05),
+        authors=[AuthorProfile("Alex Rivera", "alex.rivera@example.com"), AuthorProfile("Morgan Lee", "morgan.lee@example.com")],
+    )
+    return replace(cfg, **overrides)
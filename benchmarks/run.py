@@ -0,0 +1,205 @@
+"""End-to-end benchmark suite for the commit pipeline.
+
+Runs against throwaway local repos (with a local bare repo as `origin`) and
+writes one JSON document per run, so results can be diffed over time.
+
+Usage:
+    PYTHONPATH=src python benchmarks/run.py --output bench.json
+    PYTHONPATH=src python benchmarks/run.py --sizes 0,1000,10000,100000 --compare old.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from common import git, make_config, make_repo
+
+from git_activity_generator.config import BranchingConfig, PipelineConfig, RealismConfig, WorktreeConfig
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.file_simulator import FileChangeSimulator
+from git_activity_generator.messages import MessageGenerator
+from git_activity_generator.scheduler import SchedulingEngine
+
+MONDAY = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+STEADY = RealismConfig(
+    streak_burst_probability=0.0,
+    late_night_probability=0.0,
+    pre_weekend_spike_probability=0.0,
+    large_refactor_probability=0.0,
+    cooldown_day_probability=0.0,
+)
+
+
+def record(results: list[dict[str, Any]], name: str, value: float, unit: str, **params: Any) -> None:
+    results.append({"name": name, "params": params, "value": round(value, 3), "unit": unit})
+    print(f"{name:<22} {json.dumps(params, sort_keys=True):<48} {value:>12.3f} {unit}", file=sys.stderr)
+
+
+def per_second(count: int, fn: Callable[[], Any]) -> float:
+    began = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - began)
+
+
+def bench_simulate_day(results: list[dict[str, Any]], size: int, backend: str, commits: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp), files=size)
+        cfg = make_config(repo, commit_backend=backend, realism=STEADY, daily_min_commits=commits, daily_max_commits=commits, max_commits_per_day=commits)
+        engine = ActivityEngine(cfg)
+        stats = engine.simulate_day(MONDAY)
+        record(results, "simulate_day", stats.commits_per_sec, "commits/s", files=size, backend=backend, commits=stats.commits_created)
+
+
+def bench_backfill(results: list[dict[str, Any]], size: int, backend: str, days: int, workers: int = 0) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp), files=size)
+        cfg = make_config(
+            repo,
+            commit_backend=backend,
+            daily_min_commits=1,
+            daily_max_commits=8,
+            max_commits_per_day=12,
+            pipeline=PipelineConfig(workers=workers),
+        )
+        stats = ActivityEngine(cfg).backfill(date(2025, 1, 1), date(2025, 1, 1) + timedelta(days=days - 1), progress_every=0)
+        params = {"files": size, "backend": backend, "days": days, "commits": stats.commits_created}
+        if workers:
+            params["workers"] = workers
+        record(results, "backfill", stats.commits_per_sec, "commits/s", **params)
+
+
+def bench_worktrees(results: list[dict[str, Any]], size: int, days: int, lanes: int) -> None:
+    """Branch-heavy subprocess backfill: sequential branches (lanes=0) vs `lanes` worktrees."""
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp), files=size)
+        cfg = make_config(
+            repo,
+            commit_backend="subprocess",
+            daily_min_commits=4,
+            daily_max_commits=12,
+            max_commits_per_day=12,
+            branching=BranchingConfig(feature_branch_probability=0.75, hotfix_branch_probability=0.05),
+            worktrees=WorktreeConfig(enabled=lanes > 0, branches=max(lanes, 1)),
+        )
+        stats = ActivityEngine(cfg).backfill(date(2025, 1, 1), date(2025, 1, 1) + timedelta(days=days - 1), progress_every=0)
+        record(results, "backfill.branches", stats.commits_per_sec, "commits/s", files=size, days=days, lanes=lanes, commits=stats.commits_created)
+
+
+def bench_preview(results: list[dict[str, Any]], days: int) -> None:
+    cfg = make_config(Path(tempfile.gettempdir()) / "gag-preview-no-repo", dry_run=True, daily_min_commits=1, daily_max_commits=8, max_commits_per_day=12)
+    stats = ActivityEngine(cfg).backfill(date(2020, 1, 1), date(2020, 1, 1) + timedelta(days=days - 1), progress_every=0)
+    record(results, "preview", stats.commits_per_sec, "commits/s", days=days, commits=stats.commits_created)
+
+
+def bench_stages(results: list[dict[str, Any]], size: int, iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp), files=size, with_origin=False)
+        cfg = make_config(repo)
+
+        scheduler = SchedulingEngine(cfg, random.Random(1))
+        start = date(2025, 1, 1)
+
+        def plan_year() -> None:
+            for offset in range(365):
+                day = start + timedelta(days=offset)
+                scheduler.build_windows(day, scheduler.planned_commits_for_day(day))
+
+        record(results, "stage.schedule", per_second(365, plan_year), "days/s", files=size)
+
+        messages = MessageGenerator(cfg, random.Random(1))
+        record(results, "stage.message", per_second(iterations, lambda: [messages.generate() for _ in range(iterations)]), "msgs/s", files=size)
+        record(results, "stage.message_batch", per_second(iterations, lambda: messages.generate_batch(iterations)), "msgs/s", files=size)
+        unique = MessageGenerator(replace(cfg, messages=replace(cfg.messages, unique_subjects=True)), random.Random(1))
+        record(results, "stage.message_batch_unique", per_second(iterations, lambda: unique.generate_batch(iterations)), "msgs/s", files=size)
+
+        began = time.perf_counter()
+        files = FileChangeSimulator(cfg, random.Random(1))
+        len(files.index)
+        record(results, "stage.file_index", (time.perf_counter() - began) * 1000, "ms", files=size)
+
+        record(results, "stage.mutate", per_second(iterations, lambda: [files.mutate() for _ in range(iterations)]), "mutations/s", files=size)
+
+        for backend in ("subprocess", "fast-import", "memory"):
+            engine = ActivityEngine(replace(cfg, commit_backend=backend, dry_run=backend == "memory"))
+
+            def commit_only() -> None:
+                for idx in range(iterations):
+                    changed = engine.files.mutate()
+                    engine.git.commit_all("bench commit", MONDAY + timedelta(minutes=idx), paths=[changed])
+                engine.git.flush()
+
+            record(results, "stage.commit", per_second(iterations, commit_only), "commits/s", files=size, backend=backend)
+
+
+def metadata() -> dict[str, Any]:
+    root = Path(__file__).resolve().parent.parent
+    try:
+        revision = git(root, "rev-parse", "HEAD")
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git": subprocess.run(["git", "--version"], check=True, text=True, capture_output=True).stdout.strip(),
+    }
+
+
+def compare(current: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r["value"] for r in baseline["results"]}
+    print(f"\nvs {baseline_path} ({baseline['meta'].get('revision')})", file=sys.stderr)
+    for result in current:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        if previous.get(key):
+            print(f"{key[0]:<22} {key[1]:<48} {result['value'] / previous[key]:>8.2f}x", file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="0,1000,10000", help="Comma separated tracked-file counts (e.g. 0,1000,10000,100000)")
+    parser.add_argument("--backends", default="subprocess,fast-import")
+    parser.add_argument("--commits", type=int, default=40, help="Commits per simulate_day run")
+    parser.add_argument("--days", type=int, default=30, help="Days per backfill run")
+    parser.add_argument("--workers", default="0", help="Comma separated pipeline worker counts for backfill (e.g. 0,2,4)")
+    parser.add_argument("--worktrees", default="", help="Comma separated worktree lane counts for a branch-heavy backfill (e.g. 0,2,4)")
+    parser.add_argument("--preview-days", type=int, default=3650, help="Days per in-memory preview run")
+    parser.add_argument("--iterations", type=int, default=200, help="Iterations per stage benchmark")
+    parser.add_argument("--output", type=Path, help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to print ratios against")
+    args = parser.parse_args()
+
+    results: list[dict[str, Any]] = []
+    bench_preview(results, args.preview_days)
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench_stages(results, size, args.iterations)
+        for backend in args.backends.split(","):
+            bench_simulate_day(results, size, backend, args.commits)
+            for workers in (int(w) for w in args.workers.split(",")):
+                bench_backfill(results, size, backend, args.days, workers)
+        for lanes in (int(n) for n in args.worktrees.split(",") if n):
+            bench_worktrees(results, size, args.days, lanes)
+
+    document = {"meta": metadata(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(document, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
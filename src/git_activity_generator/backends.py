@@ -0,0 +1,477 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .config import AppConfig, AuthorProfile
+
+log = logging.getLogger(__name__)
+
+Runner = Callable[..., str]
+Observer = Callable[[str, float], None]
+
+BATCH_CHUNK = 256
+
+
+class BatchCheck:
+    """Resolves revisions through one long-lived `git cat-file --batch-check` process.
+
+    Refs and objects are looked up fresh on every query, so the helper sees
+    commits made by other git processes; it only saves the process spawn.
+    """
+
+    def __init__(self, repo: Path, observe: Observer | None = None):
+        self.repo = repo
+        self.observe = observe
+        self.proc: subprocess.Popen[str] | None = None
+        self._lock = threading.Lock()
+
+    def resolve(self, rev: str) -> str | None:
+        return self.resolve_many([rev])[0]
+
+    def resolve_many(self, revs: list[str]) -> list[str | None]:
+        """Object names for `revs`, None for anything missing or ambiguous."""
+        if not revs:
+            return []
+        started = time.perf_counter()
+        lines: list[str] = []
+        with self._lock:
+            proc = self._start()
+            assert proc.stdin is not None and proc.stdout is not None
+            # bounded chunks so neither pipe fills while the other side waits
+            for offset in range(0, len(revs), BATCH_CHUNK):
+                chunk = revs[offset : offset + BATCH_CHUNK]
+                proc.stdin.write("".join(f"{rev}\n" for rev in chunk))
+                proc.stdin.flush()
+                lines += (proc.stdout.readline() for _ in chunk)
+        if self.observe is not None:
+            self.observe("cat-file", time.perf_counter() - started)
+        if not all(lines):
+            self.close()
+            raise RuntimeError(f"git cat-file --batch-check exited unexpectedly in {self.repo}")
+        return [_batch_object(line) for line in lines]
+
+    def close(self) -> None:
+        with self._lock:
+            proc, self.proc = self.proc, None
+        if proc is not None:
+            assert proc.stdin is not None
+            proc.stdin.close()
+            proc.wait()
+
+    def _start(self) -> subprocess.Popen[str]:
+        if self.proc is None:
+            log.debug("Starting git cat-file --batch-check in %s", self.repo)
+            self.proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                cwd=self.repo,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        return self.proc
+
+
+def commit_env(when: datetime, author: AuthorProfile | None = None) -> dict[str, str]:
+    """Environment for a `git commit`/`git merge` dated `when`, optionally as `author`."""
+    env = os.environ.copy()
+    if author:
+        env["GIT_AUTHOR_NAME"] = author.name
+        env["GIT_AUTHOR_EMAIL"] = author.email
+        env["GIT_COMMITTER_NAME"] = author.name
+        env["GIT_COMMITTER_EMAIL"] = author.email
+
+    timestamp = when.strftime("%Y-%m-%dT%H:%M:%S%z")
+    env["GIT_AUTHOR_DATE"] = timestamp
+    env["GIT_COMMITTER_DATE"] = timestamp
+    return env
+
+
+def _batch_object(line: str) -> str | None:
+    name, _, kind = line.strip().rpartition(" ")
+    return name if kind not in ("missing", "ambiguous") and name else None
+
+
+class CommitBackend:
+    """Applies branches, commits and merges to the target repository."""
+
+    name = "base"
+
+    def __init__(self, cfg: AppConfig, run: Runner, objects: BatchCheck | None = None):
+        self.cfg = cfg
+        self.run = run
+        self.repo = Path(cfg.repo_path)
+        self.objects = objects or BatchCheck(self.repo)
+
+    def current_branch(self) -> str:
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        """Forget cached repository state after a git command failed."""
+
+    def create_branch(self, branch: str) -> None:
+        raise NotImplementedError
+
+    def commit(self, message: str, when: datetime, author: AuthorProfile | None, paths: Iterable[Path]) -> str | None:
+        raise NotImplementedError
+
+    def merge(self, work_branch: str, squash: bool) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Make everything written so far visible to regular git commands."""
+
+
+class SubprocessBackend(CommitBackend):
+    """One `git` process per operation, working on the checked-out tree."""
+
+    name = "subprocess"
+
+    def __init__(self, cfg: AppConfig, run: Runner, objects: BatchCheck | None = None):
+        super().__init__(cfg, run, objects)
+        # every branch switch goes through this backend, so the checked-out branch
+        # is only read from git at startup and after a failed command
+        self._branch: str | None = None
+        self._last_when: datetime | None = None
+
+    def current_branch(self) -> str:
+        if self._branch is None:
+            self._branch = self.run("rev-parse", "--abbrev-ref", "HEAD")
+        return self._branch
+
+    def invalidate(self) -> None:
+        self._branch = None
+
+    def create_branch(self, branch: str) -> None:
+        self.run("checkout", "-b", branch)
+        self._branch = branch
+
+    def commit(self, message: str, when: datetime, author: AuthorProfile | None, paths: Iterable[Path]) -> str | None:
+        self.run("add", "-A")
+        self.run("commit", "-m", message, env=commit_env(when, author))
+        self._last_when = when
+        return self.objects.resolve("HEAD")
+
+    def merge(self, work_branch: str, squash: bool) -> None:
+        self.run("checkout", self.cfg.default_branch)
+        self._branch = self.cfg.default_branch
+        # merges carry the last commit's time, like the fast-import backend
+        env = commit_env(self._last_when) if self._last_when is not None else None
+        if squash:
+            self.run("merge", "--squash", work_branch)
+            self.run("commit", "-m", f"chore(merge): squash merge {work_branch}", env=env)
+        else:
+            self.run("merge", "--no-ff", work_branch, "-m", f"chore(merge): merge {work_branch}", env=env)
+        self.run("branch", "-D", work_branch)
+
+    def flush(self) -> None:
+        self.objects.close()
+
+
+class FastImportBackend(CommitBackend):
+    """Streams commits into a single long-lived `git fast-import` process.
+
+    Only the paths handed to `commit` are recorded, read from the working tree.
+    Branches are tracked in memory instead of being checked out; HEAD, the index
+    and deleted branches are reconciled with the repository on `flush`.
+    """
+
+    name = "fast-import"
+
+    def __init__(self, cfg: AppConfig, run: Runner, objects: BatchCheck | None = None):
+        super().__init__(cfg, run, objects)
+        self.proc: subprocess.Popen[bytes] | None = None
+        self._branch: str | None = None
+        self._head_branch: str | None = None
+        self._ident: tuple[str, str] | None = None
+        self._next_mark = 1
+        self._tips: dict[str, str | None] = {}
+        self._branch_paths: dict[str, set[str]] = {}
+        self._blobs: dict[str, tuple[str, str]] = {}
+        self._blob_marks: dict[bytes, str] = {}
+        self._deleted: list[str] = []
+        self._last_when: datetime | None = None
+
+    def current_branch(self) -> str:
+        if self._branch is None:
+            self._branch = self.run("rev-parse", "--abbrev-ref", "HEAD")
+            self._head_branch = self._branch
+        return self._branch
+
+    def create_branch(self, branch: str) -> None:
+        parent = self.current_branch()
+        self._tips[branch] = self._tip(parent)
+        self._branch_paths[branch] = set(self._branch_paths.get(parent, ()))
+        self._branch = branch
+
+    def commit(self, message: str, when: datetime, author: AuthorProfile | None, paths: Iterable[Path]) -> str | None:
+        branch = self.current_branch()
+        changes = [self._file_change(path) for path in paths]
+        if branch in self._branch_paths:
+            self._branch_paths[branch].update(rel for rel, _ in changes)
+
+        ident = (author.name, author.email) if author else self._default_ident()
+        mark = self._write_commit(branch, message, when, ident, [line for _, line in changes])
+        self._last_when = when
+        return self._get_mark(mark)
+
+    def merge(self, work_branch: str, squash: bool) -> None:
+        default = self.cfg.default_branch
+        when = self._last_when or datetime.now().astimezone()
+        lines = [self._branch_change(rel) for rel in sorted(self._branch_paths.pop(work_branch, ()))]
+        if squash:
+            message = f"chore(merge): squash merge {work_branch}"
+            merge_from = None
+        else:
+            message = f"chore(merge): merge {work_branch}"
+            merge_from = self._tip(work_branch)
+        self._write_commit(default, message, when, self._default_ident(), lines, merge_from=merge_from)
+        self._tips.pop(work_branch, None)
+        self._deleted.append(work_branch)
+        self._branch = default
+
+    def flush(self) -> None:
+        written = self.proc is not None
+        if self.proc is not None:
+            proc, self.proc = self.proc, None
+            assert proc.stdin is not None
+            proc.stdin.write(b"done\n")
+            proc.stdin.close()
+            stderr = proc.stderr.read() if proc.stderr else b""
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args, stderr=stderr.decode(errors="replace"))
+            self._tips.clear()
+            self._blobs.clear()
+            self._blob_marks.clear()
+            self._next_mark = 1
+
+        deleted = [b for b in dict.fromkeys(self._deleted) if b != self._branch]
+        self._deleted.clear()
+        if deleted:
+            self.run("update-ref", "--stdin", input="".join(f"delete refs/heads/{b}\n" for b in deleted))
+        if self._branch is not None and self._branch != self._head_branch:
+            self.run("symbolic-ref", "HEAD", f"refs/heads/{self._branch}")
+            self._head_branch = self._branch
+        if written:
+            self.run("reset", "-q")
+        self.objects.close()
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        if self.proc is None:
+            log.debug("Starting git fast-import in %s", self.repo)
+            self.proc = subprocess.Popen(
+                ["git", "fast-import", "--quiet", "--done", "--date-format=raw"],
+                cwd=self.repo,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        return self.proc
+
+    def _mark(self) -> str:
+        mark = f":{self._next_mark}"
+        self._next_mark += 1
+        return mark
+
+    def _tip(self, branch: str) -> str | None:
+        if branch not in self._tips:
+            tip = self.objects.resolve(f"refs/heads/{branch}^0")
+            if tip is None:
+                return None
+            self._tips[branch] = tip
+        return self._tips[branch]
+
+    def _default_ident(self) -> tuple[str, str]:
+        if self._ident is None:
+            ident = self.run("var", "GIT_COMMITTER_IDENT")
+            name, _, rest = ident.partition(" <")
+            self._ident = (name, rest.partition(">")[0])
+        return self._ident
+
+    def _file_change(self, path: Path) -> tuple[str, str]:
+        rel = Path(os.path.relpath(path, self.repo)).as_posix()
+        quoted = _quote_path(rel)
+        if not path.is_file():
+            return rel, f"D {quoted}\n"
+
+        mode = "100755" if os.access(path, os.X_OK) else "100644"
+        data = path.read_bytes()
+        # content already sent in this stream is referenced by its mark instead of being resent
+        oid = hashlib.sha1(b"blob %d\0" % len(data))
+        oid.update(data)
+        mark = self._blob_marks.get(oid.digest())
+        if mark is None:
+            mark = self._blob_marks[oid.digest()] = self._mark()
+            self._write(b"blob\nmark %s\ndata %d\n" % (mark.encode(), len(data)) + data + b"\n")
+        self._blobs[rel] = (mode, mark)
+        return rel, f"M {mode} {mark} {quoted}\n"
+
+    def _branch_change(self, rel: str) -> str:
+        path = self.repo / rel
+        if rel in self._blobs and path.is_file():
+            mode, mark = self._blobs[rel]
+            return f"M {mode} {mark} {_quote_path(rel)}\n"
+        return self._file_change(path)[1]
+
+    def _write_commit(
+        self,
+        branch: str,
+        message: str,
+        when: datetime,
+        ident: tuple[str, str],
+        changes: list[str],
+        merge_from: str | None = None,
+    ) -> str:
+        mark = self._mark()
+        parent = self._tip(branch)
+        stamp = f"{int(when.timestamp())} {when.strftime('%z') or '+0000'}"
+        who = f"{ident[0]} <{ident[1]}> {stamp}"
+        # as `git commit` stores it after its default cleanup, so both backends write the same commit
+        msg = (message.strip() + "\n").encode()
+        header = [f"commit refs/heads/{branch}", f"mark {mark}", f"author {who}", f"committer {who}"]
+        tail = []
+        if parent:
+            tail.append(f"from {parent}")
+        if merge_from:
+            tail.append(f"merge {merge_from}")
+        self._write(
+            ("\n".join(header) + f"\ndata {len(msg)}\n").encode()
+            + msg
+            + ("\n" + "".join(f"{line}\n" for line in tail) + "".join(changes) + "\n").encode()
+        )
+        self._tips[branch] = mark
+        return mark
+
+    def _get_mark(self, mark: str) -> str:
+        proc = self._start()
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write(f"get-mark {mark}\n".encode())
+        proc.stdin.flush()
+        return proc.stdout.readline().decode().strip()
+
+    def _write(self, data: bytes) -> None:
+        proc = self._start()
+        assert proc.stdin is not None
+        proc.stdin.write(data)
+
+
+class SimCommit:
+    __slots__ = ("parent", "merge_parent", "when", "author", "kind")
+
+    def __init__(self, parent: int, merge_parent: int, when: datetime, author: str | None, kind: int):
+        self.parent = parent
+        self.merge_parent = merge_parent
+        self.when = when
+        self.author = author
+        self.kind = kind
+
+
+COMMIT, MERGE, SQUASH = 0, 1, 2
+
+
+class MemoryBackend(CommitBackend):
+    """Dry-run model of the repository: branches, commits and merges as in-memory records.
+
+    Never runs git and needs no repository. Commits are `SimCommit`s in one list;
+    parents and branch tips are indices into it (-1 for none).
+    """
+
+    name = "memory"
+
+    def __init__(self, cfg: AppConfig, run: Runner, objects: BatchCheck | None = None):
+        super().__init__(cfg, run, objects)
+        self.commits: list[SimCommit] = []
+        self.tips: dict[str, int] = {cfg.default_branch: -1}
+        self.branches_created = 0
+        self._branch = cfg.default_branch
+
+    def current_branch(self) -> str:
+        return self._branch
+
+    def create_branch(self, branch: str) -> None:
+        self.tips[branch] = self.tips.get(self._branch, -1)
+        self.branches_created += 1
+        self._branch = branch
+
+    def commit(self, message: str, when: datetime, author: AuthorProfile | None, paths: Iterable[Path]) -> str | None:
+        self._append(self._branch, -1, when, author.name if author else None, COMMIT)
+        return None
+
+    def merge(self, work_branch: str, squash: bool) -> None:
+        default = self.cfg.default_branch
+        tip = self.tips.pop(work_branch, -1)
+        when = self.commits[tip].when if tip >= 0 else datetime.now().astimezone()
+        self._append(default, -1 if squash else tip, when, None, SQUASH if squash else MERGE)
+        self._branch = default
+
+    def _append(self, branch: str, merge_parent: int, when: datetime, author: str | None, kind: int) -> None:
+        self.commits.append(SimCommit(self.tips.get(branch, -1), merge_parent, when, author, kind))
+        self.tips[branch] = len(self.commits) - 1
+
+    def summary(self) -> dict[str, Any]:
+        per_day: Counter[date] = Counter()
+        weekdays = [0] * 7
+        authors: Counter[str] = Counter()
+        kinds = [0, 0, 0]
+        for commit in self.commits:
+            kinds[commit.kind] += 1
+            if commit.kind == COMMIT:
+                day = commit.when.date()
+                per_day[day] += 1
+                weekdays[day.weekday()] += 1
+                authors[commit.author or "(git default)"] += 1
+
+        commits, merges, squashes = kinds
+        counts = sorted(per_day.values())
+        return {
+            "commits": commits,
+            "active_days": len(per_day),
+            "per_day": {
+                "min": counts[0] if counts else 0,
+                "median": counts[len(counts) // 2] if counts else 0,
+                "max": counts[-1] if counts else 0,
+                "mean": round(commits / len(per_day), 2) if per_day else 0.0,
+            },
+            "busiest_days": {day.isoformat(): count for day, count in per_day.most_common(5)},
+            "weekdays": dict(zip(("mon", "tue", "wed", "thu", "fri", "sat", "sun"), weekdays)),
+            "branches": self.branches_created,
+            "merges": merges,
+            "squash_merges": squashes,
+            "merge_ratio": round((merges + squashes) / commits, 4) if commits else 0.0,
+            "squash_ratio": round(squashes / (merges + squashes), 4) if merges + squashes else 0.0,
+            "authors": dict(authors.most_common()),
+            "days": {day.isoformat(): per_day[day] for day in sorted(per_day)},
+        }
+
+
+def _quote_path(path: str) -> str:
+    if path.startswith('"') or "\n" in path:
+        return '"' + path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return path
+
+
+BACKENDS: dict[str, type[CommitBackend]] = {
+    SubprocessBackend.name: SubprocessBackend,
+    FastImportBackend.name: FastImportBackend,
+}
+
+
+def create_backend(cfg: AppConfig, run: Runner, objects: BatchCheck | None = None) -> CommitBackend:
+    if cfg.dry_run:
+        return MemoryBackend(cfg, run, objects)
+    try:
+        backend_cls = BACKENDS[cfg.commit_backend]
+    except KeyError as exc:
+        raise ValueError(
+            f"Unknown commit_backend {cfg.commit_backend!r}; expected one of {', '.join(BACKENDS)}"
+        ) from exc
+    return backend_cls(cfg, run, objects)
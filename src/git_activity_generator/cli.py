@@ -3,81 +3,282 @@ from __future__ import annotations
 import argparse
 import json
 import logging
-import time
-from datetime import datetime
+import os
+import signal
+from datetime import date, datetime
 from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
 
-from .config import load_config
-from .engine import ActivityEngine
-from .logger import setup_logging
+# cron runs this once per repo and command: each command imports only the subsystems it
+# uses, so `stop` and `report` never load the engine, git or the fleet's multiprocessing
+if TYPE_CHECKING:
+    from .config import AppConfig
+    from .history import HistoryIndex
 
 log = logging.getLogger(__name__)
 PID_FILE = Path(".activity-generator.pid")
+# profiled inside the engine's commit loop (or the daemon's dispatch, or each fleet worker's loop)
+LOOP_COMMANDS = {"simulate", "backfill", "preview", "start", "fleet"}
 
 
 def cmd_simulate(args: argparse.Namespace) -> int:
+    from .config import load_config
+    from .engine import ActivityEngine
+    from .logger import setup_logging
+    from .pushing import PushError
+
     cfg = load_config(args.config)
-    setup_logging(cfg.verbose)
+    setup_logging(cfg.verbose, cfg.logging)
     engine = ActivityEngine(cfg)
-    stats = engine.simulate_day()
-    print(json.dumps({"planned": stats.commits_planned, "created": stats.commits_created}, indent=2))
+    try:
+        stats = engine.simulate_day()
+    except PushError as exc:
+        print(json.dumps({**exc.stats.to_dict(), "error": str(exc)}, indent=2))
+        return 1
+    print(json.dumps(stats.to_dict(), indent=2))
     return 0
 
 
-def cmd_start(args: argparse.Namespace) -> int:
+def cmd_backfill(args: argparse.Namespace) -> int:
+    from .config import load_config
+    from .engine import ActivityEngine
+    from .logger import setup_logging
+    from .pushing import PushError
+
     cfg = load_config(args.config)
-    setup_logging(cfg.verbose)
+    setup_logging(cfg.verbose, cfg.logging)
     engine = ActivityEngine(cfg)
-    PID_FILE.write_text(str(time.time()), encoding="utf-8")
-    log.info("Starting unattended loop with %s minute interval", args.interval)
+    summary: dict[str, Any] = {"from": args.start.isoformat(), "to": args.end.isoformat()}
     try:
-        while PID_FILE.exists():
-            now = datetime.now()
-            if now.hour == cfg.working_hours_start and now.minute < args.interval:
-                engine.simulate_day()
-            time.sleep(args.interval * 60)
-    finally:
-        if PID_FILE.exists():
-            PID_FILE.unlink()
+        stats = engine.backfill(args.start, args.end, push_every=args.push_every, progress_every=args.progress_every)
+    except PushError as exc:
+        # the commits are made and recorded; a later run pushes them
+        print(json.dumps({**summary, **exc.stats.to_dict(), "error": str(exc)}, indent=2))
+        return 1
+    print(json.dumps({**summary, **stats.to_dict()}, indent=2))
+    return 0
+
+
+def cmd_preview(args: argparse.Namespace) -> int:
+    from dataclasses import replace
+
+    from .config import load_config
+    from .engine import ActivityEngine
+    from .logger import setup_logging
+
+    cfg = replace(load_config(args.config), dry_run=True, plan_store=None, metrics_textfile=None)
+    setup_logging(False, cfg.logging)
+    # the JSON summary is the output; only problems go to stderr
+    logging.getLogger().setLevel(logging.WARNING)
+    engine = ActivityEngine(cfg)
+    stats = engine.preview(args.start, args.end)
+    summary = engine.git.backend.summary()
+    if not args.days:
+        summary.pop("days")
+    payload = {"from": args.start.isoformat(), "to": args.end.isoformat(), **summary, "seconds": round(stats.seconds, 3)}
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def cmd_fleet(args: argparse.Namespace) -> int:
+    from .fleet import discover_configs, run_fleet
+    from .logger import setup_logging
+
+    setup_logging(args.verbose)
+    configs = discover_configs(args.configs)
+    if not configs:
+        print("No config files found.")
+        return 1
+    summary = run_fleet(configs, workers=args.workers)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+def cmd_start(args: argparse.Namespace) -> int:
+    from .config import load_config
+    from .daemon import ActivityDaemon
+    from .engine import ActivityEngine
+    from .logger import setup_logging
+
+    cfg = load_config(args.config)
+    setup_logging(cfg.verbose, cfg.logging)
+    engine = ActivityEngine(cfg)
+    # the lock, held for the daemon's lifetime, is what tells `stop` the pid is still ours
+    with PID_FILE.open("a+", encoding="utf-8") as handle:
+        if not _lock(handle, exclusive=True):
+            print("Another activity daemon is running.")
+            return 1
+        handle.truncate(0)
+        handle.write(str(os.getpid()))
+        handle.flush()
+        log.info("Starting activity daemon (pid %s)", os.getpid())
+        try:
+            ActivityDaemon(engine).run()
+        finally:
+            PID_FILE.unlink(missing_ok=True)
     return 0
 
 
 def cmd_stop(_: argparse.Namespace) -> int:
-    if PID_FILE.exists():
-        PID_FILE.unlink()
-        print("Stop signal written.")
-    else:
+    try:
+        handle = PID_FILE.open(encoding="utf-8")
+    except FileNotFoundError:
         print("No active loop detected.")
+        return 0
+    with handle:
+        if _lock(handle, exclusive=False):
+            # nothing holds the daemon's lock, so the pid may since belong to another process
+            PID_FILE.unlink(missing_ok=True)
+            print("Stale pid file removed.")
+            return 0
+        try:
+            pid = int(handle.read().strip())
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            print("Daemon already exited.")
+            return 0
+        except (ValueError, OSError) as exc:
+            print(f"Could not stop the daemon in {PID_FILE}: {exc}")
+            return 1
+    print(f"Stop signal sent to {pid}.")
     return 0
 
 
+def _lock(handle: IO[str], exclusive: bool) -> bool:
+    """Try to flock the pid file; false if a running daemon holds it."""
+    import fcntl
+
+    try:
+        fcntl.flock(handle, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def parse_range(value: str) -> tuple[date, date]:
+    start, sep, end = value.partition("..")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected START..END, e.g. 2025-01-01..2025-12-31")
+    try:
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    if last < first:
+        raise argparse.ArgumentTypeError("range end is before its start")
+    return first, last
+
+
+def _history(cfg: AppConfig, enabled: bool) -> HistoryIndex | None:
+    if not enabled or not (Path(cfg.repo_path) / ".git").exists():
+        return None
+    from .history import load_history
+
+    return load_history(cfg)
+
+
 def cmd_report(args: argparse.Namespace) -> int:
+    from .config import load_config
+    from .logger import setup_logging
+
     cfg = load_config(args.config)
-    setup_logging(cfg.verbose)
-    engine = ActivityEngine(cfg)
-    today = datetime.now(engine.tz).date()
-    planned = engine.scheduler.planned_commits_for_day(today)
-    windows = [x.when.isoformat() for x in engine.scheduler.build_windows(today, planned)]
-    print(json.dumps({"date": today.isoformat(), "planned": planned, "windows": windows}, indent=2))
+    setup_logging(cfg.verbose, cfg.logging)
+    history = _history(cfg, args.history)
+    if args.range:
+        from .planner import RangePlan, plan_from_windows, plan_range, render_heatmap
+
+        if cfg.plan_store:
+            # read (and persist) the same plan that simulate/backfill will execute
+            from .engine import ActivityEngine
+
+            engine = ActivityEngine(cfg)
+            plan = plan_from_windows(args.range[0], engine.plan_days(*args.range), engine.tz)
+        else:
+            plan = plan_range(cfg, *args.range)
+        actual = history.counts(plan.start, plan.end) if history else None
+        if args.heatmap:
+            print(render_heatmap(plan))
+            active = sum(1 for c in plan.counts if c)
+            print(f"{plan.start}..{plan.end}: {plan.total} commit(s) planned on {active}/{len(plan.counts)} day(s)")
+            if actual is not None:
+                print()
+                print(render_heatmap(RangePlan(start=plan.start, counts=actual, window_day=[], window_seconds=[], tz=plan.tz)))
+                active = sum(1 for c in actual if c)
+                print(f"{plan.start}..{plan.end}: {sum(actual)} commit(s) in history on {active}/{len(actual)} day(s)")
+        else:
+            days = plan.by_day()
+            payload: dict[str, Any] = {"from": plan.start.isoformat(), "to": plan.end.isoformat(), "planned": plan.total}
+            if actual is not None and history is not None:
+                for day, count in zip(days, actual):
+                    day["actual"] = count
+                payload["actual"] = sum(actual)
+                payload["authors"] = dict(history.authors(plan.start, plan.end).most_common())
+            payload["days"] = days
+            print(json.dumps(payload, indent=2))
+        return 0
+
+    if cfg.plan_store:
+        from .engine import ActivityEngine
+
+        engine = ActivityEngine(cfg)
+        today = datetime.now(engine.tz).date()
+        windows = engine.plan_day(today)
+        payload = {"date": today.isoformat(), "planned": len(windows), "windows": [x.when.isoformat() for x in windows]}
+        payload["status"] = [x.status for x in windows]
+    else:
+        # the engine's plan for the day without loading the engine, as for --range
+        from zoneinfo import ZoneInfo
+
+        from .planner import plan_range
+
+        today = datetime.now(ZoneInfo(cfg.timezone)).date()
+        plan = plan_range(cfg, today, today)
+        payload = {"date": today.isoformat(), "planned": plan.total, "windows": plan.iso_windows()}
+    if history is not None:
+        payload["actual"] = history.count(today)
+    print(json.dumps(payload, indent=2))
     return 0
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Human-like git activity generator")
     parser.add_argument("--config", default="config/config.yaml", help="Path to YAML configuration")
+    parser.add_argument("--profile", choices=("cpu", "mem"), help="Profile the run: sampled stacks (cpu) or tracemalloc (mem)")
+    parser.add_argument("--profile-dir", default=".", help="Where --profile writes its reports (default: working directory)")
     sub = parser.add_subparsers(dest="command", required=True)
 
     simulate = sub.add_parser("simulate", help="Run one day simulation immediately")
     simulate.set_defaults(func=cmd_simulate)
 
-    start = sub.add_parser("start", help="Start unattended loop mode")
-    start.add_argument("--interval", type=int, default=15, help="Polling interval in minutes")
+    backfill = sub.add_parser("backfill", help="Generate history for a range of past days in one run")
+    backfill.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    backfill.add_argument("--to", dest="end", type=date.fromisoformat, required=True, help="Last day, inclusive (YYYY-MM-DD)")
+    backfill.add_argument("--push-every", type=int, default=None, help="Push after every N commits (0 = once at the end; default: push.every_commits)")
+    backfill.add_argument("--progress-every", type=int, default=100, help="Log progress every N commits")
+    backfill.set_defaults(func=cmd_backfill)
+
+    preview = sub.add_parser("preview", help="Simulate a date range in memory and summarize it; reads the repo but never writes to it")
+    preview.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD)")
+    preview.add_argument("--to", dest="end", type=date.fromisoformat, required=True, help="Last day, inclusive (YYYY-MM-DD)")
+    preview.add_argument("--days", action="store_true", help="Include the per-day commit counts")
+    preview.set_defaults(func=cmd_preview)
+
+    fleet = sub.add_parser("fleet", help="Simulate one day for many repos in parallel worker processes")
+    fleet.add_argument("configs", nargs="+", help="Config files and/or directories of *.yaml/*.yml/*.json configs")
+    fleet.add_argument("--workers", type=int, default=None, help="Max concurrent repos (default: CPU count)")
+    fleet.add_argument("--verbose", action="store_true", help="Debug logging for the fleet and its workers")
+    fleet.set_defaults(func=cmd_fleet)
+
+    start = sub.add_parser("start", help="Start the daemon: each commit runs at its planned time")
+    start.add_argument("--interval", type=int, default=None, help=argparse.SUPPRESS)  # no longer polls; kept for old wrappers
     start.set_defaults(func=cmd_start)
 
-    stop = sub.add_parser("stop", help="Stop loop mode")
+    stop = sub.add_parser("stop", help="Send the running daemon a shutdown signal")
     stop.set_defaults(func=cmd_stop)
 
-    report = sub.add_parser("report", help="Show planned commit schedule for today")
+    report = sub.add_parser("report", help="Show planned commit schedule for today or a date range")
+    report.add_argument("--range", type=parse_range, help="Plan a whole date range, e.g. 2025-01-01..2025-12-31")
+    report.add_argument("--heatmap", action="store_true", help="With --range, print a per-day heatmap instead of every window")
+    report.add_argument("--no-history", dest="history", action="store_false", help="Skip comparing the plan with the repo's history")
     report.set_defaults(func=cmd_report)
 
     return parser
@@ -86,7 +287,16 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
-    return args.func(args)
+    if not args.profile:
+        return args.func(args)
+
+    from . import profiling
+
+    profiling.enable(args.profile, args.profile_dir)
+    if args.command in LOOP_COMMANDS:
+        return args.func(args)
+    with profiling.scope(args.command):
+        return args.func(args)
 
 
 if __name__ == "__main__":
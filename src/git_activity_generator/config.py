@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
@@ -28,6 +30,11 @@ class MessageConfig:
     typo_probability: float = 0.06
     markov_enabled: bool = True
     ai_templates_enabled: bool = True
+    markov_corpus: str | None = None
+    markov_cache_dir: str | None = None
+    unique_subjects: bool = False
+    unique_capacity: int = 1_000_000
+    unique_error_rate: float = 0.001
 
 
 @dataclass
@@ -39,6 +46,70 @@ class RealismConfig:
     cooldown_day_probability: float = 0.05
 
 
+@dataclass
+class FileSimConfig:
+    index_cache: bool = False
+
+
+@dataclass
+class PipelineConfig:
+    workers: int = 0
+    depth: int = 32
+
+
+@dataclass
+class MaintenanceConfig:
+    enabled: bool = False
+    check_every: int = 500
+    loose_objects: int = 6700
+    max_packs: int = 10
+    commit_graph_every: int = 2000
+
+
+@dataclass
+class TreeConfig:
+    enabled: bool = False
+    root: str = ".activity-sim/tree"
+    target_files: int = 5000
+    max_depth: int = 6
+    fanout: int = 6
+    median_size: int = 4096
+    size_sigma: float = 1.2
+    max_size: int = 8 << 20
+    binary_probability: float = 0.02
+    rename_probability: float = 0.03
+    delete_probability: float = 0.02
+    reuse_probability: float = 0.2
+    cache_mb: int = 64
+
+
+@dataclass
+class WorktreeConfig:
+    enabled: bool = False
+    branches: int = 4
+    max_branch_commits: int = 6
+    root: str | None = None
+
+
+@dataclass
+class PushConfig:
+    remotes: list[str] = field(default_factory=lambda: ["origin"])
+    every_commits: int = 0
+    every_bytes: int = 0
+    retries: int = 3
+    backoff: float = 1.0
+    max_backoff: float = 30.0
+    timeout: float | None = None
+
+
+@dataclass
+class LogConfig:
+    format: str = "text"
+    queue_size: int = 10000
+    debug_rate: float = 20.0
+    debug_burst: int = 100
+
+
 @dataclass
 class AuthorProfile:
     name: str
@@ -60,24 +131,25 @@ class AppConfig:
     dry_run: bool = False
     verbose: bool = True
     deterministic_seed: int | None = None
+    commit_backend: str = "subprocess"
+    metrics_textfile: str | None = None
+    plan_store: str | None = None
     vacation_ranges: list[dict[str, str]] = field(default_factory=list)
+    holiday_calendars: list[str] = field(default_factory=list)
     seasonal: SeasonalProfile = field(default_factory=SeasonalProfile)
     branching: BranchingConfig = field(default_factory=BranchingConfig)
     messages: MessageConfig = field(default_factory=MessageConfig)
     realism: RealismConfig = field(default_factory=RealismConfig)
+    files: FileSimConfig = field(default_factory=FileSimConfig)
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
+    maintenance: MaintenanceConfig = field(default_factory=MaintenanceConfig)
+    tree: TreeConfig = field(default_factory=TreeConfig)
+    worktrees: WorktreeConfig = field(default_factory=WorktreeConfig)
+    push: PushConfig = field(default_factory=PushConfig)
+    logging: LogConfig = field(default_factory=LogConfig)
     authors: list[AuthorProfile] = field(default_factory=list)
 
 
-def _merge_dict(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    result = base.copy()
-    for key, value in override.items():
-        if isinstance(value, dict) and isinstance(result.get(key), dict):
-            result[key] = _merge_dict(result[key], value)
-        else:
-            result[key] = value
-    return result
-
-
 def _load_raw(path: Path) -> dict[str, Any]:
     text = path.read_text(encoding="utf-8")
     if path.suffix.lower() == ".json":
@@ -93,20 +165,35 @@ def _load_raw(path: Path) -> dict[str, Any]:
         ) from exc
 
 
-def load_config(config_path: str | Path) -> AppConfig:
+def load_config(config_path: str | Path, use_cache: bool = True) -> AppConfig:
+    """Load and validate a config, reusing the parsed copy cached for this file when it is unchanged.
+
+    `GAG_REPO_PATH` and `GAG_DRY_RUN` are applied on top, so they never invalidate the cache.
+    """
     config_path = Path(config_path)
-    raw = _load_raw(config_path)
+    cache = ConfigCache.for_config(config_path) if use_cache else None
+    raw = cache.load() if cache is not None else None
+    if raw is not None:
+        # validated when it was cached
+        cfg = compile_config(raw, validate=False)
+    else:
+        raw = _load_raw(config_path)
+        cfg = compile_config(raw)
+        if cache is not None:
+            cache.save(raw)
 
     env_override: dict[str, Any] = {}
     if os.getenv("GAG_REPO_PATH"):
         env_override["repo_path"] = os.getenv("GAG_REPO_PATH")
     if os.getenv("GAG_DRY_RUN"):
         env_override["dry_run"] = os.getenv("GAG_DRY_RUN", "false").lower() == "true"
+    return replace(cfg, **env_override) if env_override else cfg
+
 
-    raw = _merge_dict(raw, env_override)
+def compile_config(raw: dict[str, Any], validate: bool = True) -> AppConfig:
     authors = [AuthorProfile(**author) for author in raw.get("authors", [])]
 
-    return AppConfig(
+    cfg = AppConfig(
         repo_path=raw["repo_path"],
         default_branch=raw.get("default_branch", "main"),
         timezone=raw.get("timezone", "UTC"),
@@ -120,10 +207,126 @@ def load_config(config_path: str | Path) -> AppConfig:
         dry_run=raw.get("dry_run", False),
         verbose=raw.get("verbose", True),
         deterministic_seed=raw.get("deterministic_seed"),
+        commit_backend=raw.get("commit_backend", "subprocess"),
+        metrics_textfile=raw.get("metrics_textfile"),
+        plan_store=raw.get("plan_store"),
         vacation_ranges=raw.get("vacation_ranges", []),
+        holiday_calendars=raw.get("holiday_calendars", []),
         seasonal=SeasonalProfile(monthly_multiplier={int(k): v for k, v in raw.get("seasonal", {}).get("monthly_multiplier", {}).items()}),
         branching=BranchingConfig(**raw.get("branching", {})),
         messages=MessageConfig(**raw.get("messages", {})),
         realism=RealismConfig(**raw.get("realism", {})),
+        files=FileSimConfig(**raw.get("files", {})),
+        pipeline=PipelineConfig(**raw.get("pipeline", {})),
+        maintenance=MaintenanceConfig(**raw.get("maintenance", {})),
+        tree=TreeConfig(**raw.get("tree", {})),
+        worktrees=WorktreeConfig(**raw.get("worktrees", {})),
+        push=PushConfig(**raw.get("push", {})),
+        logging=LogConfig(**raw.get("logging", {})),
         authors=authors,
     )
+    if validate:
+        validate_config(cfg)
+    return cfg
+
+
+def validate_config(cfg: AppConfig) -> None:
+    """Reject settings that would otherwise only fail mid-run. Runs once per config change, not per load."""
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        ZoneInfo(cfg.timezone)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Unknown timezone {cfg.timezone!r}") from exc
+    if not 0 <= cfg.working_hours_start <= cfg.working_hours_end <= 23:
+        raise ValueError("working_hours_start/working_hours_end must satisfy 0 <= start <= end <= 23")
+    if not 0 <= cfg.daily_min_commits <= cfg.daily_max_commits:
+        raise ValueError("daily_min_commits must be between 0 and daily_max_commits")
+    if not cfg.push.remotes:
+        raise ValueError("push.remotes must list at least one remote")
+    if not 0 < cfg.messages.unique_error_rate < 1:
+        raise ValueError("messages.unique_error_rate must be between 0 and 1")
+    if cfg.logging.format not in ("text", "json"):
+        raise ValueError("logging.format must be 'text' or 'json'")
+    if cfg.push.retries < 0:
+        raise ValueError("push.retries must be >= 0")
+    if cfg.maintenance.max_packs < 2:
+        raise ValueError("maintenance.max_packs must be >= 2")
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "git-activity-generator"
+
+
+class ConfigCache:
+    """The parsed config file for one config path, as JSON under the cache dir.
+
+    Only data is cached, so a hit skips the YAML parse and validation while
+    `AppConfig` is still built fresh from it; nothing in the cache dir is ever
+    run. An entry is fresh when the file's mtime and size match what was
+    cached. As with git's racily-clean index entries, a file modified within
+    `RACY_SECONDS` of the cache write is confirmed by content hash instead, so
+    a quick edit that keeps the size cannot be missed.
+    """
+
+    VERSION = 2
+    RACY_SECONDS = 2
+
+    def __init__(self, source: Path, path: Path):
+        self.source = source
+        self.path = path
+
+    @classmethod
+    def for_config(cls, source: Path) -> "ConfigCache | None":
+        """`GAG_CONFIG_CACHE` picks the cache directory; `off` disables caching."""
+        setting = os.environ.get("GAG_CONFIG_CACHE", "")
+        if setting.lower() in ("off", "0", "false"):
+            return None
+        source = source.resolve()
+        name = hashlib.blake2b(str(source).encode(), digest_size=16).hexdigest()
+        base = Path(setting) if setting else default_cache_dir() / "config"
+        return cls(source, base / f"{name}.json")
+
+    def load(self) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(self.path.read_text(encoding="utf-8"))
+            stat = self.source.stat()
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != self.VERSION or not isinstance(entry.get("raw"), dict):
+            return None
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        racy_ns = self.RACY_SECONDS * 10**9
+        fresh = entry.get("stamp") == stamp
+        if fresh and stat.st_mtime_ns < entry.get("written_ns", 0) - racy_ns:
+            return entry["raw"]
+        try:
+            if self._digest() != entry.get("digest"):
+                return None
+        except OSError:
+            return None
+        if not fresh or time.time_ns() - stat.st_mtime_ns > racy_ns:
+            self.save(entry["raw"])  # touched but unchanged, or no longer racy: refresh the entry
+        return entry["raw"]
+
+    def save(self, raw: dict[str, Any]) -> None:
+        try:
+            stat = self.source.stat()
+            entry = {
+                "version": self.VERSION,
+                "stamp": [stat.st_mtime_ns, stat.st_size],
+                "digest": self._digest(),
+                "written_ns": time.time_ns(),
+                "raw": raw,
+            }
+            # YAML values JSON has no type for (an unquoted date, say) are left uncached
+            text = json.dumps(entry)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except (OSError, TypeError, ValueError):
+            pass  # the cache is an optimization; a read-only home must not break runs
+
+    def _digest(self) -> str:
+        return hashlib.blake2b(self.source.read_bytes(), digest_size=16).hexdigest()
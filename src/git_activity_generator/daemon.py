@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import signal
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from types import FrameType
+from typing import Any
+
+from . import profiling
+from .engine import ActivityEngine, RunStats
+from .pushing import PushError
+
+log = logging.getLogger(__name__)
+
+
+class ActivityDaemon:
+    """Timer-queue scheduler: each commit runs at its planned window.
+
+    Days are planned at local midnight and their windows pushed onto a heap;
+    the loop sleeps on an Event until the earliest entry is due, so it wakes
+    only for work or for a shutdown signal. Windows that are already past when
+    their day is planned (daemon started mid-day, host suspended) run
+    immediately with their planned timestamps, so no day is skipped.
+    """
+
+    def __init__(self, engine: ActivityEngine):
+        self.engine = engine
+        self.queue: list[tuple[float, int, str, Any]] = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self._pending: RunStats | None = None
+
+    def schedule(self, at: float, kind: str, payload: Any = None) -> None:
+        heapq.heappush(self.queue, (at, next(self._seq), kind, payload))
+
+    def plan_day(self, day: date) -> None:
+        windows = self.engine.plan_day(day)
+        pending = self.engine.resume(windows)
+        stats = RunStats(commits_planned=len(windows), days=1)
+        for slot in pending:
+            self.schedule(slot.when.timestamp(), "commit", (slot, stats))
+        if windows:
+            self.schedule(windows[-1].when.timestamp(), "push", stats)
+        self.schedule(self._midnight(day + timedelta(days=1)), "plan", day + timedelta(days=1))
+        log.info("Planned %s commit(s) for %s", len(windows), day.isoformat())
+
+    def stop(self, signum: int | None = None, _frame: FrameType | None = None) -> None:
+        if signum is not None:
+            log.info("Received signal %s, shutting down", signum)
+        self._stop.set()
+
+    def run(self, install_signals: bool = True) -> None:
+        if install_signals:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, self.stop)
+
+        self.plan_day(datetime.now(self.engine.tz).date())
+        try:
+            while self.queue and not self._stop.is_set():
+                at, _, kind, payload = self.queue[0]
+                delay = at - time.time()
+                if delay > 0:
+                    # re-check after waking: wall-clock jumps can make a wait end early
+                    self._stop.wait(delay)
+                    continue
+                heapq.heappop(self.queue)
+                # profile the work, not the sleeps between windows
+                with profiling.scope(kind):
+                    self._dispatch(kind, payload)
+        finally:
+            if self._pending is not None:
+                log.info("Pushing %s commit(s) created before shutdown", self._pending.commits_created)
+                with profiling.scope("push"):
+                    self._finish(self._pending)
+
+    def _dispatch(self, kind: str, payload: Any) -> None:
+        if kind == "plan":
+            self.plan_day(payload)
+        elif kind == "commit":
+            slot, stats = payload
+            if self._pending is not stats:
+                self.engine.start_run(stats)
+                self._pending = stats
+            started = time.perf_counter()
+            changed = self.engine.commit_window(slot)
+            stats.seconds += time.perf_counter() - started
+            stats.commits_created += 1
+            log.info("Committed %s at %s", changed, slot.when.isoformat())
+            if self.engine.push_due():
+                self.engine.push(stats, final=False)
+        elif kind == "push":
+            self._finish(payload)
+
+    def _finish(self, stats: RunStats) -> None:
+        started = time.perf_counter()
+        try:
+            self.engine.push(stats)
+        except PushError as exc:
+            # the commits stay in the repo and go out with the next push; keep scheduling
+            log.error("Day push failed, retrying with the next push: %s", exc)
+        finally:
+            self.engine.save_indexes()
+            stats.seconds += time.perf_counter() - started
+            self.engine.finish_run(stats)
+            self._pending = None
+        log.info("Day complete: %s/%s commit(s) in %.1fs", stats.commits_created, stats.commits_planned, stats.seconds)
+
+    def _midnight(self, day: date) -> float:
+        return datetime.combine(day, dt_time(0), tzinfo=self.engine.tz).timestamp()
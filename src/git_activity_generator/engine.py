@@ -1,17 +1,35 @@
 from __future__ import annotations
 
 import logging
+import os
 import random
-from dataclasses import dataclass
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
 from zoneinfo import ZoneInfo
 
 from .config import AppConfig
-from .file_simulator import FileChangeSimulator
-from .git_ops import GitService
-from .messages import MessageGenerator
-from .scheduler import SchedulingEngine
+from . import profiling
+from .logger import bind, log_context
+from .metrics import Metrics, write_prometheus_textfile
+from .scheduler import CommitWindow, SchedulingEngine
+from .seeds import SeedStream
+
+if TYPE_CHECKING:
+    from .file_simulator import FileChangeSimulator
+    from .git_ops import GitService
+    from .messages import MessageGenerator
+    from .store import PlanStore
+    from .tree import Edit
+    from .worktrees import Route, WorktreePool
 
 log = logging.getLogger(__name__)
 
@@ -20,34 +38,529 @@ log = logging.getLogger(__name__)
 class RunStats:
     commits_planned: int = 0
     commits_created: int = 0
+    days: int = 0
+    pushes: int = 0
+    seconds: float = 0.0
+    metrics: Metrics = field(default_factory=Metrics)
+    # tags every log record of the run, to tell apart interleaved fleet and daemon runs
+    run_id: str = field(default_factory=lambda: os.urandom(4).hex())
+
+    @property
+    def commits_per_sec(self) -> float:
+        return self.commits_created / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run": self.run_id,
+            "planned": self.commits_planned,
+            "created": self.commits_created,
+            "days": self.days,
+            "pushes": self.pushes,
+            "seconds": round(self.seconds, 3),
+            "commits_per_sec": round(self.commits_per_sec, 1),
+            **self.metrics.to_dict(),
+        }
+
+
+@dataclass
+class CommitPlan:
+    slot: CommitWindow
+    edit: Edit
+    files_rng: random.Random
+    message_rng: random.Random
+    git_rng: random.Random
+
+
+@dataclass
+class PreparedCommit:
+    plan: CommitPlan
+    payload: str | bytes
+    message: str
+    seconds: float
+
+
+def _slot_fields(slot: CommitWindow) -> dict[str, Any]:
+    return {"day": (slot.day or slot.when.date()).isoformat(), "commit": slot.index}
+
+
+def _open_store(cfg: AppConfig) -> PlanStore | None:
+    if not cfg.plan_store:
+        return None
+    from .store import PlanStore
+
+    # relative to the repo, not to the directory cron happens to start in
+    return PlanStore(Path(cfg.repo_path) / cfg.plan_store)
 
 
 class ActivityEngine:
     def __init__(self, cfg: AppConfig):
         self.cfg = cfg
-        self.rng = random.Random(cfg.deterministic_seed)
-        self.scheduler = SchedulingEngine(cfg, self.rng)
-        self.messages = MessageGenerator(cfg, self.rng)
-        self.files = FileChangeSimulator(cfg, self.rng)
-        self.git = GitService(cfg, self.rng)
+        # days and commits draw from their own streams; the component RNGs are only fallbacks
+        self.seeds = SeedStream(cfg.deterministic_seed)
+        self.scheduler = SchedulingEngine(cfg, self.seeds.rng("scheduler"))
         self.tz = ZoneInfo(cfg.timezone)
+        self.metrics = Metrics()
+        self.store = _open_store(cfg)
+        # commits and payload bytes since the last push, for `push.every_commits`/`every_bytes`
+        self.unpushed_commits = 0
+        self.unpushed_bytes = 0
+        self.push_failed = False
+        self._batches: dict[date, list[str]] = {}
+        self._batch_lock = threading.Lock()
+
+    # built on first use: planning and reports never pay for git, the file index or the Markov model
+
+    @cached_property
+    def messages(self) -> MessageGenerator:
+        from .messages import MessageGenerator
+
+        return MessageGenerator(self.cfg, self.seeds.rng("messages"))
+
+    @cached_property
+    def files(self) -> FileChangeSimulator:
+        from .file_simulator import FileChangeSimulator
+
+        return FileChangeSimulator(self.cfg, self.seeds.rng("files"))
+
+    @cached_property
+    def git(self) -> GitService:
+        from .git_ops import GitService
+
+        return GitService(self.cfg, self.seeds.rng("git"))
+
+    def plan_days(self, start: date, end: date) -> list[tuple[date, list[CommitWindow]]]:
+        stored = self.store.load_days(start, end) if self.store else {}
+        plan: list[tuple[date, list[CommitWindow]]] = []
+        fresh: list[tuple[date, list[CommitWindow]]] = []
+        day = start
+        while day <= end:
+            if day in stored:
+                plan.append((day, stored[day]))
+            else:
+                fresh.append((day, self.scheduler.plan_day(day, self.seeds.rng("day", day.toordinal()))))
+                plan.append(fresh[-1])
+            day += timedelta(days=1)
+        if self.store and fresh:
+            self.store.save_days(fresh)
+        return plan
+
+    def plan_day(self, day: date) -> list[CommitWindow]:
+        return self.plan_days(day, day)[0][1]
+
+    def resume(self, windows: list[CommitWindow]) -> list[CommitWindow]:
+        """Reconcile stored progress with the repo and return the windows still to commit."""
+        if not self.store or self.cfg.dry_run:
+            return [w for w in windows if w.status == "planned"] if self.store else windows
+
+        committing = [w for w in windows if w.status == "committing"]
+        if committing or any(w.status == "committed" for w in windows):
+            # commits on a branch the interrupted run never merged are not done; replaying recreates the branch
+            dropped = self.git.drop_work_branches()
+            since = min(w.when for w in windows if w.status != "planned")
+            # a squash merge leaves its windows' own commits unreachable; the merge itself stands in for them
+            merged = self.git.merged_branches(since)
+            for slot in committing:
+                # interrupted between recording the attempt and recording the result
+                sha = self.git.find_commit(slot.message or "", slot.when) or merged.get(slot.branch or "")
+                self.store.mark(slot, "committed" if sha else "planned", sha=sha)
+            committed = [w for w in windows if w.status == "committed"]
+            present = self.git.reachable_commits((w.sha or "" for w in committed), since)
+            missing = []
+            for slot in committed:
+                if slot.sha in present:
+                    continue
+                if slot.branch in merged:
+                    self.store.mark(slot, "committed", sha=merged[slot.branch])
+                else:
+                    self.store.mark(slot, "planned")
+                    missing.append(slot)
+            rewound = self._rewind(windows)
+            if committing or missing or dropped or rewound:
+                # the edits of windows about to be replayed may still be in the checkout
+                log.warning("Resuming an interrupted run: resetting the checkout to %s", self.cfg.default_branch)
+                self.git.reset_checkout([self.files.generated, self.files.repo / self.cfg.tree.root])
+
+        pending = [w for w in windows if w.status == "planned"]
+        if len(pending) < len(windows):
+            log.info("Resuming: %s of %s window(s) already committed", len(windows) - len(pending), len(windows))
+        return pending
+
+    def _rewind(self, windows: list[CommitWindow]) -> int:
+        """Undo committed windows after the first one to replay, so it commits onto the same tip as before.
+
+        Lanes branch from the default branch as of the window that opens them,
+        and a branch never outlives its day; so with worktrees the replay starts
+        at the first incomplete day, otherwise at the first incomplete window.
+        """
+        assert self.store is not None
+        first = next((w for w in windows if w.status == "planned"), None)
+        if first is None:
+            return 0
+        if self.cfg.worktrees.enabled:
+            day = first.day or first.when.date()
+            first = next(w for w in windows if (w.day or w.when.date()) == day)
+        later = windows[windows.index(first):]
+        if any(w.status == "pushed" for w in later):
+            log.warning("Not rewinding past pushed commits; windows after %s are replayed onto the current tip", first.when)
+            return 0
+        undone = [w for w in later if w.status == "committed"]
+        if not undone:
+            return 0
+        for slot in undone:
+            self.store.mark(slot, "planned")
+        dropped = self.git.rewind(min(w.when for w in later))
+        log.warning("Rewound %s commit(s) of %s window(s) committed after %s", dropped, len(undone), first.when)
+        return len(undone)
+
+    def start_run(self, stats: RunStats) -> None:
+        self.metrics = stats.metrics
+        self.git.metrics = stats.metrics
+        bind(run=stats.run_id)
+
+    def finish_run(self, stats: RunStats) -> None:
+        if self.cfg.metrics_textfile:
+            gauges = {
+                "run_commits_planned": stats.commits_planned,
+                "run_commits_created": stats.commits_created,
+                "run_seconds": round(stats.seconds, 6),
+                "run_last_completed_timestamp_seconds": round(time.time(), 3),
+            }
+            write_prometheus_textfile(self.cfg.metrics_textfile, stats.metrics, {"repo": self.cfg.repo_path}, gauges)
+
+    def plan_commit(self, slot: CommitWindow) -> CommitPlan:
+        """Producer stage: picks the edit in window order, since that depends on earlier commits."""
+        stream = self.seeds.child("commit", (slot.day or slot.when.date()).toordinal(), slot.index)
+        files_rng = stream.rng("files")
+        edit = self.files.plan_edit(files_rng)
+        return CommitPlan(slot=slot, edit=edit, files_rng=files_rng, message_rng=stream.rng("message"), git_rng=stream.rng("git"))
+
+    def prepare_commit(self, plan: CommitPlan) -> PreparedCommit:
+        """Worker stage: touches nothing but the plan, so it can run on any thread."""
+        started = time.perf_counter()
+        # a dry run writes nothing, and the payload's stream feeds nothing else
+        payload = "" if self.cfg.dry_run else self.files.render(plan.edit, plan.slot.when, plan.files_rng)
+        batch = self._day_messages(plan.slot.day or plan.slot.when.date())
+        # a stored plan from a config with a higher daily cap can hold more windows than a batch
+        message = batch[plan.slot.index] if plan.slot.index < len(batch) else self.messages.generate(plan.message_rng)
+        return PreparedCommit(plan=plan, payload=payload, message=message, seconds=time.perf_counter() - started)
+
+    def _day_messages(self, day: date) -> list[str]:
+        """Subjects for a day's windows by index, drawn in one batch from the day's own stream.
+
+        A pure function of the seed and the day, so whichever worker thread
+        asks first, and however a run is split, the day gets the same batch.
+        """
+        with self._batch_lock:
+            batch = self._batches.get(day)
+            if batch is None:
+                rng = self.seeds.child("messages", day.toordinal()).rng("batch")
+                batch = self.messages.generate_batch(self.cfg.max_commits_per_day, rng, unique=False)
+                # windows arrive in day order: only the day being prepared and the next are asked for
+                if len(self._batches) > 2:
+                    self._batches.pop(min(self._batches))
+                self._batches[day] = batch
+            return batch
+
+    def apply_commit(self, prepared: PreparedCommit) -> Path:
+        """Writer stage: the only one that touches the worktree, git and the plan store."""
+        slot, edit, rng = prepared.plan.slot, prepared.plan.edit, prepared.plan.git_rng
+        with log_context(**_slot_fields(slot)):
+            prepared.message = self.messages.claim(prepared.message, prepared.plan.message_rng)
+            phase = self.metrics.phase
+            self.metrics.observe_phase("prepare", prepared.seconds)
+            record = self.store is not None and not self.cfg.dry_run
+            if record:
+                # before the checkout changes, so resume knows to clean up after a crash anywhere below
+                self.store.mark(slot, "committing", message=prepared.message)
+            with phase("branch"):
+                work_branch = self.git.maybe_create_work_branch(rng, slot.when)
+            with phase("mutate"):
+                self.files.apply(edit, prepared.payload)
+            with phase("commit"):
+                result = self.git.commit_all(message=prepared.message, commit_time=slot.when, paths=edit.paths, rng=rng)
+            with phase("merge"):
+                self.git.maybe_merge_to_default(work_branch, rng)
+            if record:
+                # a window counts as committed once its work is on the default branch
+                branch = work_branch if work_branch != self.cfg.default_branch else None
+                self.store.mark(slot, "committed", sha=result.sha, branch=branch)
+            self.git.maintenance.after_commit()
+            if self.git.maintenance.due:
+                self.maintain()
+            self._count_unpushed(prepared)
+            return edit.path
+
+    def commit_window(self, slot: CommitWindow) -> Path:
+        return self.apply_commit(self.prepare_commit(self.plan_commit(slot)))
+
+    def commit_windows(self, slots: Iterable[CommitWindow]) -> Iterator[tuple[CommitWindow, Path]]:
+        """Commit `slots` in order, preparing up to `pipeline.depth` commits ahead on worker threads.
+
+        Each commit draws from its own seed streams, so the history is the same
+        for any worker count. The lookahead is bounded: when git is the slow stage
+        the workers simply idle, and the writer's wait on a not-yet-prepared commit
+        is recorded as the `wait` phase.
+        """
+        plans = (self.plan_commit(slot) for slot in slots)
+        if self.git.worktrees is not None:
+            yield from self._commit_on_worktrees(self.git.worktrees, plans)
+            return
+        workers = self.cfg.pipeline.workers
+        if workers <= 0:
+            for plan in plans:
+                yield plan.slot, self.apply_commit(self.prepare_commit(plan))
+            return
+
+        depth = max(self.cfg.pipeline.depth, workers)
+        self.messages  # build it here, not racing on the first worker threads
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gag-prepare")
+        ahead: deque[Future[PreparedCommit]] = deque()
+        try:
+            for plan in plans:
+                ahead.append(pool.submit(self.prepare_commit, plan))
+                if len(ahead) >= depth:
+                    yield self._apply_next(ahead)
+            while ahead:
+                yield self._apply_next(ahead)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _apply_next(self, ahead: deque[Future[PreparedCommit]]) -> tuple[CommitWindow, Path]:
+        with self.metrics.phase("wait"):
+            prepared = ahead.popleft().result()
+        return prepared.plan.slot, self.apply_commit(prepared)
+
+    def _commit_on_worktrees(self, pool: WorktreePool, plans: Iterator[CommitPlan]) -> Iterator[tuple[CommitWindow, Path]]:
+        """Commit to several feature branches at once, each checked out in its own worktree lane.
+
+        This thread only routes and dispatches, in window order: commits to the
+        default branch and merges queue on the pool's main thread, branch commits
+        on their lane. A merge waits for its lane; a new branch starts from the
+        default tip as of its place in that order. Branches still open at the
+        end of a day are merged before the next day's first commit, so runs
+        split at day boundaries match one long run. The history therefore only
+        depends on the windows and seed, never on which lane runs fastest.
+        """
+        from .worktrees import BranchRouter
+
+        router = BranchRouter(self.cfg, len(pool.paths))
+        depth = max(self.cfg.pipeline.depth, len(pool.paths))
+        ahead: deque[tuple[PreparedCommit, Future[str | None]]] = deque()
+        merges: deque[Future[None]] = deque()
+        day: date | None = None
+        pool.start()
+        try:
+            for plan in plans:
+                if (plan.slot.day or plan.slot.when.date()) != day:
+                    merges.extend(pool.close_branch(route) for route in router.drain())
+                    day = plan.slot.day or plan.slot.when.date()
+                    if self.git.maintenance.due:
+                        # every branch is closed: once the lanes are done, nothing else writes to the repo
+                        while ahead:
+                            yield self._collect(ahead)
+                        while merges:
+                            merges.popleft().result()
+                        self.maintain()
+                # the lane and main threads run each job in a copy of this context
+                with log_context(**_slot_fields(plan.slot)):
+                    prepared = self.prepare_commit(plan)
+                    prepared.message = self.messages.claim(prepared.message, plan.message_rng)
+                    self.metrics.observe_phase("prepare", prepared.seconds)
+                    route = router.route(plan.slot.when, plan.git_rng)
+                    if self.store is not None:
+                        self.store.mark(plan.slot, "committing", message=prepared.message, branch=route.branch)
+                    ahead.append((prepared, self._dispatch(pool, route, prepared)))
+                    if route.closes:
+                        merges.append(pool.close_branch(route))
+                while merges and merges[0].done():
+                    merges.popleft().result()
+                while ahead and (len(ahead) >= depth or ahead[0][1].done()):
+                    yield self._collect(ahead)
+            merges.extend(pool.close_branch(route) for route in router.drain())
+            while ahead:
+                yield self._collect(ahead)
+            for merge in merges:
+                with self.metrics.phase("wait"):
+                    merge.result()
+        finally:
+            pool.stop()
+
+    def _dispatch(self, pool: WorktreePool, route: Route, prepared: PreparedCommit) -> Future[str | None]:
+        if route.branch is None:
+            return pool.on_main(self._commit_default, prepared)
+        if route.opens:
+            pool.open_branch(route.lane, route.branch)
+        return pool.on_lane(route.lane, self._commit_lane, pool, route, prepared)
+
+    def _commit_default(self, prepared: PreparedCommit) -> str | None:
+        plan = prepared.plan
+        with self.metrics.phase("mutate"):
+            self.files.apply(plan.edit, prepared.payload)
+        with self.metrics.phase("commit"):
+            return self.git.commit_all(prepared.message, plan.slot.when, plan.edit.paths, plan.git_rng).sha
+
+    def _commit_lane(self, pool: WorktreePool, route: Route, prepared: PreparedCommit) -> str | None:
+        plan = prepared.plan
+        assert route.branch is not None
+        paths = [pool.local(route.lane, path) for path in plan.edit.paths]
+        with self.metrics.phase("mutate"):
+            self.files.apply(plan.edit, prepared.payload, target=paths[0])
+        with self.metrics.phase("commit"):
+            return self.git.commit_on_lane(route.lane, route.branch, prepared.message, plan.slot.when, paths, plan.git_rng).sha
+
+    def _collect(self, ahead: deque[tuple[PreparedCommit, Future[str | None]]]) -> tuple[CommitWindow, Path]:
+        prepared, done = ahead.popleft()
+        with self.metrics.phase("wait"):
+            sha = done.result()
+        slot = prepared.plan.slot
+        if self.store is not None:
+            self.store.mark(slot, "committed", sha=sha)
+        self.git.maintenance.after_commit()
+        self._count_unpushed(prepared)
+        return slot, prepared.plan.edit.path
+
+    def _count_unpushed(self, prepared: PreparedCommit) -> None:
+        self.unpushed_commits += 1
+        payload = prepared.payload
+        # text payloads are written as UTF-8
+        self.unpushed_bytes += len(payload.encode() if isinstance(payload, str) else payload)
+
+    def push_due(self, every_commits: int | None = None) -> bool:
+        """Whether the commits or payload bytes since the last push fill a `push` batch."""
+        every = self.cfg.push.every_commits if every_commits is None else every_commits
+        every_bytes = self.cfg.push.every_bytes
+        return bool(every and self.unpushed_commits >= every) or bool(every_bytes and self.unpushed_bytes >= every_bytes)
+
+    def push(self, stats: RunStats, final: bool = True) -> None:
+        """Push to every remote. A failed batch push (`final=False`) is only logged: the next push resends it."""
+        from .pushing import PushError
+
+        if self.git.maintenance.enabled and not (self.git.worktrees is not None and self.git.worktrees.running):
+            # pack what fast-import or the loose commits left behind so the push walks less
+            self.maintain()
+        self.unpushed_commits = self.unpushed_bytes = 0
+        with self.metrics.phase("push"):
+            try:
+                self.git.push()
+            except PushError as exc:
+                if final:
+                    raise
+                log.warning("Batch push incomplete, retrying with the next batch: %s", exc)
+                self.push_failed = True
+                return
+            finally:
+                stats.pushes += 1
+            self.push_failed = False
+            if self.store and not self.cfg.dry_run:
+                self.store.mark_pushed()
+            if not final:
+                # a checkpoint: a run killed after it still knows the subjects it pushed
+                self.save_indexes()
+
+    @contextmanager
+    def _finishing(self, stats: RunStats, started: float) -> Iterator[None]:
+        """Close a run even when it fails: indexes saved, metrics written, and a failed push carrying the stats."""
+        from .pushing import PushError
+
+        try:
+            yield
+        except PushError as exc:
+            exc.stats = stats
+            raise
+        finally:
+            # what was committed is in the repo whether or not it reached the remotes
+            self.save_indexes()
+            stats.seconds = time.perf_counter() - started
+            self.finish_run(stats)
+
+    def maintain(self) -> None:
+        """Run repo maintenance now; the caller makes sure nothing else is writing to the repo."""
+        # fast-import's pack is still open until the stream ends
+        self.git.flush()
+        self.git.maintenance.check()
+
+    def save_indexes(self) -> None:
+        """Persist the edit-candidate index and the used-subject filter at the end of a run."""
+        self.files.save_index()
+        if "messages" in self.__dict__:
+            self.messages.save()
 
     def simulate_day(self, when: datetime | None = None) -> RunStats:
         when = when or datetime.now(self.tz)
         today = when.date()
-        count = self.scheduler.planned_commits_for_day(today)
-        windows = self.scheduler.build_windows(today, count)
-        stats = RunStats(commits_planned=count)
-
-        log.info("Planned %s commit(s) for %s", count, today.isoformat())
-        for slot in windows:
-            work_branch = self.git.maybe_create_work_branch()
-            changed = self.files.mutate()
-            message = self.messages.generate()
-            self.git.commit_all(message=message, commit_time=slot.when)
-            self.git.maybe_merge_to_default(work_branch)
-            stats.commits_created += 1
-            log.info("Committed %s at %s", changed, slot.when.isoformat())
-
-        self.git.push()
+        stats = RunStats(days=1)
+        self.start_run(stats)
+        started = time.perf_counter()
+        with self.metrics.phase("plan"):
+            windows = self.plan_day(today)
+            pending = self.resume(windows)
+        stats.commits_planned = len(windows)
+
+        log.info("Planned %s commit(s) for %s", len(windows), today.isoformat())
+        with profiling.scope("simulate_day"), self._finishing(stats, started):
+            for slot, changed in self.commit_windows(pending):
+                stats.commits_created += 1
+                log.info("Committed %s at %s", changed, slot.when.isoformat())
+                if self.push_due():
+                    self.push(stats, final=False)
+
+            self.push(stats)
+        return stats
+
+    def preview(self, start: date, end: date) -> RunStats:
+        """Count a dry run of the range: branches, commits and merges only, with no messages, edits or payloads.
+
+        Each commit's branch, author and merge draws come from the same `git`
+        stream as in `backfill`, so the in-memory model ends up the same as a
+        dry-run backfill's.
+        """
+        assert self.cfg.dry_run, "preview only drives the in-memory backend"
+        stats = RunStats()
+        started = time.perf_counter()
+        plan = self.plan_days(start, end)
+        windows = sorted((slot for _, day_windows in plan for slot in day_windows), key=lambda x: x.when)
+        git = self.git
+        # the stream is only drawn from for branches and authors
+        draws = self.cfg.branching.enabled or bool(self.cfg.authors)
+        with profiling.scope("preview"):
+            for slot in windows:
+                rng = self.seeds.child("commit", (slot.day or slot.when.date()).toordinal(), slot.index).rng("git") if draws else None
+                branch = git.maybe_create_work_branch(rng, slot.when)
+                git.commit_all("", slot.when, rng=rng)
+                git.maybe_merge_to_default(branch, rng)
+        stats.commits_planned = stats.commits_created = len(windows)
+        stats.days = len(plan)
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def backfill(self, start: date, end: date, push_every: int | None = None, progress_every: int = 100) -> RunStats:
+        """Commit every planned window in the range; `push_every` overrides `push.every_commits`."""
+        stats = RunStats()
+        self.start_run(stats)
+        started = time.perf_counter()
+        with self.metrics.phase("plan"):
+            plan = self.plan_days(start, end)
+            windows = sorted((slot for _, day_windows in plan for slot in day_windows), key=lambda x: x.when)
+            pending = self.resume(windows)
+        stats.commits_planned = len(windows)
+        stats.days = len(plan)
+
+        log.info("Planned %s commit(s) over %s day(s) from %s to %s", len(windows), len(plan), start, end)
+        with profiling.scope("backfill"), self._finishing(stats, started):
+            for slot, _ in self.commit_windows(pending):
+                stats.commits_created += 1
+                if self.push_due(push_every):
+                    self.push(stats, final=False)
+                if progress_every and stats.commits_created % progress_every == 0:
+                    stats.seconds = time.perf_counter() - started
+                    log.info(
+                        "Backfill %s/%s commit(s), at %s, %.1f commits/sec",
+                        stats.commits_created,
+                        stats.commits_planned,
+                        slot.when.date().isoformat(),
+                        stats.commits_per_sec,
+                    )
+
+            if self.unpushed_commits or self.push_failed or not stats.pushes:
+                self.push(stats)
         return stats
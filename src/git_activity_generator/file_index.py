@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Container
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+SKIP_DIRS = frozenset({".git"})
+
+# rel_dir -> (mtime_ns, matching file names, sub-directory names)
+DirEntry = tuple[int, list[str], list[str]]
+
+
+class CandidateIndex:
+    """Existing files the simulator may edit, built once per run.
+
+    The walk never descends into `.git`. With a cache path the per-directory
+    listing is persisted and, on the next run, only directories whose mtime
+    changed are listed again. Candidates are kept sorted, so a seeded draw picks
+    the same file whether the index was just walked or grew during the run.
+    """
+
+    def __init__(self, root: Path, suffixes: tuple[str, ...] = (".py", ".md"), cache_path: Path | None = None):
+        self.root = root
+        self.suffixes = suffixes
+        self.cache_path = cache_path
+        self._dirs: dict[str, DirEntry] | None = None
+        self._paths: list[str] = []
+
+    def __len__(self) -> int:
+        self._ensure()
+        return len(self._paths)
+
+    def choice(self, rng: random.Random, pending: Container[Path] = ()) -> Path | None:
+        """Random indexed file; `pending` paths count as present even before they are written."""
+        self._ensure()
+        while self._paths:
+            rel = rng.choice(self._paths)
+            path = self.root / rel
+            if path in pending or path.is_file():
+                return path
+            self.discard(path)
+        return None
+
+    def add(self, path: Path) -> None:
+        self._ensure()
+        if path.suffix not in self.suffixes:
+            return
+        rel = self._rel(path)
+        idx = bisect.bisect_left(self._paths, rel)
+        if idx == len(self._paths) or self._paths[idx] != rel:
+            self._paths.insert(idx, rel)
+
+    def discard(self, path: Path) -> None:
+        self._ensure()
+        rel = self._rel(path)
+        idx = bisect.bisect_left(self._paths, rel)
+        if idx < len(self._paths) and self._paths[idx] == rel:
+            del self._paths[idx]
+
+    def save(self) -> None:
+        if self.cache_path is None or self._dirs is None:
+            return
+        payload = {"version": INDEX_VERSION, "root": str(self.root), "suffixes": list(self.suffixes), "dirs": self._dirs}
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def _rel(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def _ensure(self) -> None:
+        if self._dirs is None:
+            self._build(self._read_cache())
+
+    def _read_cache(self) -> dict[str, DirEntry]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable file index cache %s", self.cache_path)
+            return {}
+        if payload.get("version") != INDEX_VERSION or payload.get("root") != str(self.root):
+            return {}
+        if tuple(payload.get("suffixes", ())) != self.suffixes:
+            return {}
+        return {rel: (entry[0], entry[1], entry[2]) for rel, entry in payload.get("dirs", {}).items()}
+
+    def _build(self, cached: dict[str, DirEntry]) -> None:
+        dirs: dict[str, DirEntry] = {}
+        rescanned = 0
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            full = self.root / rel if rel else self.root
+            try:
+                mtime = full.stat().st_mtime_ns
+            except OSError:
+                continue
+            entry = cached.get(rel)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, *self._list_dir(full))
+                rescanned += 1
+            dirs[rel] = entry
+            stack.extend(f"{rel}/{name}" if rel else name for name in entry[2])
+
+        self._dirs = dirs
+        self._paths = sorted(f"{rel}/{name}" if rel else name for rel, entry in dirs.items() for name in entry[1])
+        log.debug("File index: %s candidate(s), %s/%s dir(s) listed", len(self._paths), rescanned, len(dirs))
+
+    def _list_dir(self, full: Path) -> tuple[list[str], list[str]]:
+        files: list[str] = []
+        subdirs: list[str] = []
+        try:
+            with os.scandir(full) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False):
+                        if item.name not in SKIP_DIRS:
+                            subdirs.append(item.name)
+                    elif item.name.endswith(self.suffixes) and item.is_file():
+                        files.append(item.name)
+        except OSError:
+            pass
+        return sorted(files), sorted(subdirs)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import os
 import random
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
 from .config import AppConfig
+from .file_index import CandidateIndex
+from .tree import Edit, TreeGrower
 
 
 PY_SNIPPETS = [
@@ -24,45 +27,110 @@ JSON_SNIPPETS = [
 ]
 
 
+JSON_SEED = b"{\n  \"seed\": 1\n}\n"
+JSON_TAIL_CHARS = b"\n}\t "
+
+
+def append_text(path: Path, chunks: list[str]) -> None:
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write("".join(chunks))
+
+
+def append_json_entries(path: Path, entries: list[str]) -> None:
+    """Insert entries before the closing brace by rewriting only the file's tail."""
+    if not path.exists():
+        path.write_bytes(JSON_SEED)
+    with path.open("r+b") as fh:
+        cut = fh.seek(0, os.SEEK_END)
+        while cut > 0:
+            step = min(cut, 64)
+            fh.seek(cut - step)
+            chunk = fh.read(step)
+            kept = len(chunk.rstrip(JSON_TAIL_CHARS))
+            cut -= step - kept
+            if kept:
+                break
+        fh.seek(cut)
+        fh.write(("," + ",".join(entries) + "\n}\n").encode("utf-8"))
+        fh.truncate()
+
+
+def _apply(path: Path, chunks: list[str]) -> None:
+    if path.suffix == ".json":
+        append_json_entries(path, chunks)
+    else:
+        append_text(path, chunks)
+
+
 class FileChangeSimulator:
     def __init__(self, cfg: AppConfig, rng: random.Random):
         self.cfg = cfg
         self.rng = rng
         self.repo = Path(cfg.repo_path)
         self.generated = self.repo / ".activity-sim"
-        self.generated.mkdir(exist_ok=True)
+        if not cfg.dry_run:
+            self.generated.mkdir(exist_ok=True)
+        git_dir = self.repo / ".git"
+        cache_path = git_dir / "activity-sim-index.json" if cfg.files.index_cache and git_dir.is_dir() else None
+        self.index = CandidateIndex(self.repo, cache_path=cache_path)
+        self.created: set[Path] = set()
+        self.tree = TreeGrower(cfg.tree, self.repo) if cfg.tree.enabled else None
 
-    def _pick_target(self) -> Path:
-        candidates = list(self.repo.glob("**/*.py")) + list(self.repo.glob("**/*.md"))
-        candidates = [c for c in candidates if ".git" not in c.parts and c.is_file()]
-        if candidates and self.rng.random() < 0.6:
-            return self.rng.choice(candidates)
+    def pick_target(self, rng: random.Random | None = None) -> Path:
+        """Choose the next file to edit and register it in the index before it exists on disk."""
+        rng = rng or self.rng
+        target = None
+        if len(self.index) and rng.random() < 0.6:
+            target = self.index.choice(rng, self.created)
+        if target is None:
+            ext = rng.choice(["py", "md", "json", "yaml", "js"])
+            target = self.generated / f"module_{rng.randint(1, 8)}.{ext}"
+        if target not in self.created and not target.exists():
+            self.created.add(target)
+            self.index.add(target)
+        return target
 
-        ext = self.rng.choice(["py", "md", "json", "yaml", "js"])
-        return self.generated / f"module_{self.rng.randint(1, 8)}.{ext}"
+    def plan_edit(self, rng: random.Random | None = None) -> Edit:
+        if self.tree is not None:
+            return self.tree.plan(rng or self.rng)
+        return Edit(self.pick_target(rng))
 
-    def mutate(self) -> Path:
-        target = self._pick_target()
-        target.parent.mkdir(parents=True, exist_ok=True)
-        ts = datetime.utcnow().isoformat()
-        random_id = self.rng.randint(100, 999)
+    def render(self, edit: Edit, when: datetime, rng: random.Random | None = None) -> str | bytes:
+        if edit.op != "append":
+            return self.tree.render(edit) if self.tree is not None else b""
+        target = edit.path
+        rng = rng or self.rng
+        ts = when.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+        random_id = rng.randint(100, 999)
 
         if target.suffix == ".py":
-            payload = self.rng.choice(PY_SNIPPETS).format(id=random_id, delta=self.rng.randint(1, 10), ts=ts)
-        elif target.suffix == ".md":
-            payload = self.rng.choice(MD_SNIPPETS).format(id=random_id, ts=ts)
-        elif target.suffix == ".json":
-            if not target.exists():
-                target.write_text("{\n  \"seed\": 1\n}\n", encoding="utf-8")
-            body = target.read_text(encoding="utf-8").rstrip("\n}\t ")
-            payload = body + "," + self.rng.choice(JSON_SNIPPETS).format(id=random_id, ts=ts) + "\n}\n"
-            target.write_text(payload, encoding="utf-8")
-            return target
-        elif target.suffix == ".yaml":
-            payload = f"\nentry_{random_id}:\n  updated_at: '{ts}'\n  note: generated automation edit\n"
-        else:
-            payload = f"\nfunction generated{random_id}() {{\n  return 'auto-{random_id}';\n}}\n"
-
-        with target.open("a", encoding="utf-8") as fh:
-            fh.write(payload)
-        return target
+            return rng.choice(PY_SNIPPETS).format(id=random_id, delta=rng.randint(1, 10), ts=ts)
+        if target.suffix == ".md":
+            return rng.choice(MD_SNIPPETS).format(id=random_id, ts=ts)
+        if target.suffix == ".json":
+            return rng.choice(JSON_SNIPPETS).format(id=random_id, ts=ts)
+        if target.suffix == ".yaml":
+            return f"\nentry_{random_id}:\n  updated_at: '{ts}'\n  note: generated automation edit\n"
+        return f"\nfunction generated{random_id}() {{\n  return 'auto-{random_id}';\n}}\n"
+
+    def apply(self, edit: Edit, payload: str | bytes, target: Path | None = None) -> None:
+        """Write `edit`, to `target` instead of `edit.path` for another worktree."""
+        if self.cfg.dry_run:
+            return
+        if edit.op != "append":
+            assert self.tree is not None and isinstance(payload, bytes)
+            self.tree.apply(edit, payload)
+            return
+        assert isinstance(payload, str)
+        path = target or edit.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _apply(path, [payload])
+
+    def mutate(self, when: datetime | None = None, rng: random.Random | None = None) -> Path:
+        edit = self.plan_edit(rng)
+        self.apply(edit, self.render(edit, when or datetime.now(timezone.utc), rng))
+        return edit.path
+
+    def save_index(self) -> None:
+        if not self.cfg.dry_run:
+            self.index.save()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Iterable
+
+log = logging.getLogger(__name__)
+
+CONFIG_SUFFIXES = (".yaml", ".yml", ".json")
+
+
+def discover_configs(paths: Iterable[str | Path]) -> list[Path]:
+    found: list[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            found.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in CONFIG_SUFFIXES and p.is_file()))
+        else:
+            found.append(path)
+    return list(dict.fromkeys(found))
+
+
+def run_one(config_path: str) -> dict[str, Any]:
+    """Worker entry point: simulate one repo's day, never raising."""
+    from .config import load_config
+    from .engine import ActivityEngine
+    from .logger import flush_logging
+
+    started = time.perf_counter()
+    result: dict[str, Any] = {"config": config_path, "pid": os.getpid()}
+    try:
+        cfg = load_config(config_path)
+        result["repo_path"] = cfg.repo_path
+        stats = ActivityEngine(cfg).simulate_day()
+        result.update(ok=True, stats=stats.to_dict())
+    except Exception as exc:  # isolate one repo's failure from the rest of the fleet
+        log.exception("Fleet run failed for %s", config_path)
+        result.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    # pool workers exit without running atexit, so the log queue is drained here
+    flush_logging()
+    return result
+
+
+def run_fleet(config_paths: list[Path], workers: int | None = None) -> dict[str, Any]:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(config_paths) or 1))
+    started = time.perf_counter()
+    results: list[dict[str, Any]] = []
+
+    log.info("Running %s repo(s) with %s worker(s)", len(config_paths), workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, str(path)): path for path in config_paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:  # worker process died (e.g. BrokenProcessPool)
+                result = {"config": str(futures[future]), "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            log.info("Fleet: %s %s", result["config"], "ok" if result["ok"] else "failed")
+            results.append(result)
+
+    order = {str(path): idx for idx, path in enumerate(config_paths)}
+    results.sort(key=lambda r: order[r["config"]])
+    succeeded = [r for r in results if r["ok"]]
+    return {
+        "repos": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "workers": workers,
+        "commits_planned": sum(r["stats"]["planned"] for r in succeeded),
+        "commits_created": sum(r["stats"]["created"] for r in succeeded),
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import logging
-import os
 import random
 import subprocess
+import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable
 
+from .backends import BatchCheck, create_backend
 from .config import AppConfig, AuthorProfile
+from .maintenance import RepoMaintenance
+from .metrics import Metrics
+from .pushing import RemotePusher
+from .worktrees import WorktreePool
 
 log = logging.getLogger(__name__)
 
+# work branches are named `<kind>/auto-<commit time>`; one left at the start of a run was never merged
+WORK_BRANCHES = ("refs/heads/feature/auto-*", "refs/heads/hotfix/auto-*")
+# subjects of the commits that bring a work branch back, followed by the branch name
+MERGE_SUBJECT = "chore(merge): merge "
+SQUASH_SUBJECT = "chore(merge): squash merge "
+# refs whose history counts as done; a worktree lane's detached HEAD can still hold a dropped branch's commits
+KEPT_REFS = ("--branches", "--tags", "--remotes")
+
 
 @dataclass
 class CommitResult:
@@ -24,68 +38,138 @@ class GitService:
         self.cfg = cfg
         self.rng = rng
         self.repo = Path(cfg.repo_path)
-
-    def _run(self, *args: str, env: dict[str, str] | None = None) -> str:
+        self.metrics = Metrics()
+        self.objects = BatchCheck(self.repo, lambda command, seconds: self.metrics.observe_git(command, seconds))
+        self.backend = create_backend(cfg, self._run, self.objects)
+        self.maintenance = RepoMaintenance(cfg, self._run, lambda: self.metrics)
+        self.pusher = RemotePusher(cfg, self.repo, lambda: self.metrics)
+        # dry runs keep modelling branches one at a time in memory
+        use_worktrees = cfg.worktrees.enabled and not cfg.dry_run
+        self.worktrees = WorktreePool(cfg, self._run, self.objects, self.backend, lambda: self.metrics) if use_worktrees else None
+
+    def _run(self, *args: str, env: dict[str, str] | None = None, input: str | None = None, cwd: Path | None = None) -> str:
         cmd = ["git", *args]
-        log.debug("Running: %s", " ".join(cmd))
-        out = subprocess.run(cmd, cwd=self.repo, env=env, check=True, text=True, capture_output=True)
+        if log.isEnabledFor(logging.DEBUG):  # skip the join on the per-commit path when debug is off
+            log.debug("Running: %s", " ".join(cmd))
+        started = time.perf_counter()
+        try:
+            out = subprocess.run(cmd, cwd=cwd or self.repo, env=env, input=input, check=True, text=True, capture_output=True)
+        except subprocess.CalledProcessError:
+            self.backend.invalidate()
+            raise
+        finally:
+            self.metrics.observe_git(args[0] if args else "", time.perf_counter() - started)
         return out.stdout.strip()
 
     def _current_branch(self) -> str:
-        return self._run("rev-parse", "--abbrev-ref", "HEAD")
+        return self.backend.current_branch()
 
-    def _pick_author(self) -> AuthorProfile | None:
-        return self.rng.choice(self.cfg.authors) if self.cfg.authors else None
+    def _pick_author(self, rng: random.Random) -> AuthorProfile | None:
+        return rng.choice(self.cfg.authors) if self.cfg.authors else None
 
-    def maybe_create_work_branch(self) -> str:
+    def maybe_create_work_branch(self, rng: random.Random | None = None, when: datetime | None = None) -> str:
         branch = self._current_branch()
         if not self.cfg.branching.enabled:
             return branch
 
-        roll = self.rng.random()
+        roll = (rng or self.rng).random()
+        # named after the commit time, not the wall clock, so seeded runs are reproducible
+        stamp = (when or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y%m%d-%H%M%S")
         if roll < self.cfg.branching.hotfix_branch_probability:
-            branch = f"hotfix/auto-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
-            self._run("checkout", "-b", branch)
+            branch = f"hotfix/auto-{stamp}"
+            self.backend.create_branch(branch)
         elif roll < self.cfg.branching.hotfix_branch_probability + self.cfg.branching.feature_branch_probability:
-            branch = f"feature/auto-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
-            self._run("checkout", "-b", branch)
+            branch = f"feature/auto-{stamp}"
+            self.backend.create_branch(branch)
         return branch
 
-    def commit_all(self, message: str, commit_time: datetime) -> CommitResult:
+    def commit_all(
+        self, message: str, commit_time: datetime, paths: Iterable[Path] = (), rng: random.Random | None = None
+    ) -> CommitResult:
         if self.cfg.dry_run:
-            log.info("[dry-run] commit: %s @ %s", message, commit_time.isoformat())
-            return CommitResult(branch=self._current_branch(), sha=None)
-
-        env = os.environ.copy()
-        author = self._pick_author()
-        if author:
-            env["GIT_AUTHOR_NAME"] = author.name
-            env["GIT_AUTHOR_EMAIL"] = author.email
-            env["GIT_COMMITTER_NAME"] = author.name
-            env["GIT_COMMITTER_EMAIL"] = author.email
-
-        timestamp = commit_time.strftime("%Y-%m-%dT%H:%M:%S%z")
-        env["GIT_AUTHOR_DATE"] = timestamp
-        env["GIT_COMMITTER_DATE"] = timestamp
-
-        self._run("add", "-A")
-        self._run("commit", "-m", message, env=env)
-        sha = self._run("rev-parse", "HEAD")
+            log.debug("[dry-run] commit: %s @ %s", message, commit_time.isoformat())
+        sha = self.backend.commit(message, commit_time, self._pick_author(rng or self.rng), paths)
         return CommitResult(branch=self._current_branch(), sha=sha)
 
-    def maybe_merge_to_default(self, work_branch: str) -> None:
-        if work_branch == self.cfg.default_branch or not self.cfg.branching.enabled or self.cfg.dry_run:
+    def commit_on_lane(
+        self, lane: int, branch: str, message: str, commit_time: datetime, paths: Iterable[Path], rng: random.Random
+    ) -> CommitResult:
+        assert self.worktrees is not None
+        sha = self.worktrees.commit(lane, branch, message, commit_time, self._pick_author(rng), paths)
+        return CommitResult(branch=branch, sha=sha)
+
+    def maybe_merge_to_default(self, work_branch: str, rng: random.Random | None = None) -> None:
+        if work_branch == self.cfg.default_branch or not self.cfg.branching.enabled:
             return
-        self._run("checkout", self.cfg.default_branch)
-        if self.rng.random() < self.cfg.branching.squash_merge_probability:
-            self._run("merge", "--squash", work_branch)
-            self._run("commit", "-m", f"chore(merge): squash merge {work_branch}")
-        else:
-            self._run("merge", "--no-ff", work_branch, "-m", f"chore(merge): merge {work_branch}")
-        self._run("branch", "-D", work_branch)
+        squash = (rng or self.rng).random() < self.cfg.branching.squash_merge_probability
+        self.backend.merge(work_branch, squash=squash)
+
+    def reachable_commits(self, shas: Iterable[str], since: datetime) -> set[str]:
+        """The `shas` reachable from a branch, tag or remote. A dropped branch's or an unfinished fast-import's commits exist but are not."""
+        wanted = {sha for sha in shas if sha}
+        if not wanted:
+            return set()
+        # every commit of a window is dated at or after the window, so the walk can stop there
+        return wanted & set(self._run("rev-list", *KEPT_REFS, f"--since={int(since.timestamp()) - 1}").split())
+
+    def find_commit(self, message: str, when: datetime) -> str | None:
+        """The commit a window made, found by subject and time, or the squash merge of the branch named after it."""
+        stamp = str(int(when.timestamp()))
+        squashed = "/auto-" + when.astimezone(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        subject = message.partition("\n")[0]
+        out = self._run("log", *KEPT_REFS, "--format=%H %at %s", f"--since={stamp}", f"--until={stamp}")
+        for line in out.splitlines():
+            sha, at, found = (line.split(" ", 2) + [""])[:3]
+            if at == stamp and (found == subject or found.startswith(SQUASH_SUBJECT) and found.endswith(squashed)):
+                return sha
+        return None
+
+    def merged_branches(self, since: datetime) -> dict[str, str]:
+        """Work branches merged into a ref since `since`, mapped to their merge or squash commit."""
+        out = self._run("log", *KEPT_REFS, "--fixed-strings", "--grep=chore(merge): ", "--format=%H %s", f"--since={int(since.timestamp()) - 1}")
+        merged = {}
+        for line in out.splitlines():
+            sha, _, subject = line.partition(" ")
+            for prefix in (SQUASH_SUBJECT, MERGE_SUBJECT):
+                if subject.startswith(prefix):
+                    merged[subject[len(prefix):]] = sha
+        return merged
+
+    def drop_work_branches(self) -> list[str]:
+        """Delete the work branches an interrupted run left unmerged, after moving HEAD off them."""
+        branches = self._run("for-each-ref", "--format=%(refname:short)", *WORK_BRANCHES).split()
+        if branches:
+            if self._run("rev-parse", "--abbrev-ref", "HEAD") in branches:
+                self._run("checkout", "-q", "-f", self.cfg.default_branch)
+            self._run("update-ref", "--stdin", input="".join(f"delete refs/heads/{branch}\n" for branch in branches))
+            self.backend.invalidate()
+        return branches
+
+    def rewind(self, before: datetime) -> int:
+        """Move the default branch back to its last commit dated before `before`; returns the commits dropped."""
+        branch = self.cfg.default_branch
+        target = self._run("rev-list", "-1", "--first-parent", f"--before={int(before.timestamp()) - 1}", branch)
+        dropped = int(self._run("rev-list", "--count", f"{target}..{branch}"))
+        if dropped:
+            self._run("checkout", "-q", "-f", branch)
+            self._run("reset", "-q", "--hard", target)
+            self.backend.invalidate()
+        return dropped
+
+    def reset_checkout(self, generated: Iterable[Path]) -> None:
+        """Throw away edits an interrupted run left behind: tracked files back to HEAD, untracked generated files removed."""
+        self._run("reset", "-q", "--hard")
+        self._run("clean", "-fdq", "--", *(str(path) for path in generated))
+        self.backend.invalidate()
+
+    def flush(self) -> None:
+        self.backend.flush()
+        if self.worktrees is not None:
+            self.worktrees.flush()
 
     def push(self) -> None:
         if self.cfg.dry_run:
             log.info("[dry-run] push skipped")
             return
-        self._run("push", "origin", self.cfg.default_branch)
+        self.flush()
+        self.pusher.push(self.cfg.default_branch)
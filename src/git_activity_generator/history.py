@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from .config import AppConfig
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+class HistoryIndex:
+    """Non-merge commits on one branch, counted per local day and author."""
+
+    def __init__(self, head: str | None = None, days: dict[str, Counter[str]] | None = None):
+        self.head = head
+        self.days: dict[str, Counter[str]] = days or {}
+
+    @property
+    def total(self) -> int:
+        return sum(sum(authors.values()) for authors in self.days.values())
+
+    def add(self, day: str, author: str) -> None:
+        authors = self.days.get(day)
+        if authors is None:
+            authors = self.days[day] = Counter()
+        authors[author] += 1
+
+    def count(self, day: date) -> int:
+        return sum(self.days.get(day.isoformat(), {}).values())
+
+    def counts(self, start: date, end: date) -> list[int]:
+        return [self.count(start + timedelta(days=offset)) for offset in range((end - start).days + 1)]
+
+    def authors(self, start: date, end: date) -> Counter[str]:
+        lo, hi = start.isoformat(), end.isoformat()
+        total: Counter[str] = Counter()
+        for day, authors in self.days.items():
+            if lo <= day <= hi:
+                total.update(authors)
+        return total
+
+    def save(self, path: Path, tz: str) -> None:
+        payload = {"version": INDEX_VERSION, "tz": tz, "head": self.head, "days": self.days}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, tz: str) -> "HistoryIndex | None":
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != INDEX_VERSION or payload.get("tz") != tz:
+            return None
+        return cls(payload.get("head"), {day: Counter(authors) for day, authors in payload.get("days", {}).items()})
+
+
+def stream_log(repo: Path, revs: str, tz: str) -> Iterator[tuple[str, str]]:
+    """(local day, author) for each non-merge commit in `revs`, streamed from `git log`."""
+    proc = subprocess.Popen(
+        ["git", "log", "--no-merges", "--date=format-local:%Y-%m-%d", "--format=%ad%x09%aN", revs, "--"],
+        cwd=repo,
+        env={**os.environ, "TZ": tz},
+        stdout=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    assert proc.stdout is not None
+    try:
+        for line in proc.stdout:
+            day, _, author = line.rstrip("\n").partition("\t")
+            yield day, author
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+
+def _git(repo: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(["git", *args], cwd=repo, text=True, capture_output=True)
+
+
+def load_history(cfg: AppConfig, branch: str | None = None) -> HistoryIndex:
+    """Index of `branch` (the default branch), cached in `.git` and extended from the last indexed tip."""
+    repo = Path(cfg.repo_path)
+    branch = branch or cfg.default_branch
+    tip = _git(repo, "rev-parse", "-q", "--verify", f"refs/heads/{branch}^{{commit}}").stdout.strip()
+    if not tip:
+        return HistoryIndex()
+
+    git_dir = repo / ".git"
+    cache_path = git_dir / f"activity-sim-history-{branch.replace('/', '-')}.json" if git_dir.is_dir() else None
+    index = HistoryIndex.load(cache_path, cfg.timezone) if cache_path else None
+    if index is not None and index.head == tip:
+        return index
+
+    if index is not None and index.head and _git(repo, "merge-base", "--is-ancestor", index.head, tip).returncode == 0:
+        revs, mode = f"{index.head}..{tip}", "incremental"
+    else:
+        index, revs, mode = HistoryIndex(), tip, "full"
+
+    added = 0
+    for day, author in stream_log(repo, revs, cfg.timezone):
+        index.add(day, author)
+        added += 1
+    index.head = tip
+    log.debug("History index for %s: %s pass, %s commit(s) added", branch, mode, added)
+    if cache_path is not None:
+        try:
+            index.save(cache_path, cfg.timezone)
+        except OSError as exc:
+            log.warning("Could not cache history index at %s: %s", cache_path, exc)
+    return index
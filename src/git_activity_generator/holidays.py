@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import csv
+import logging
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from .config import AppConfig
+
+log = logging.getLogger(__name__)
+
+Interval = tuple[int, int]  # inclusive (start, end) date ordinals
+
+
+class HolidayCalendar:
+    """Vacation ranges and holiday dates compiled into sorted, merged intervals.
+
+    Membership is a single bisect over the interval starts.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.add_intervals(intervals)
+
+    @classmethod
+    def from_config(cls, cfg: AppConfig) -> "HolidayCalendar":
+        calendar = cls(_parse_range(item["start"], item["end"]) for item in cfg.vacation_ranges)
+        for path in cfg.holiday_calendars:
+            calendar.add_intervals(load_calendar_file(Path(path)))
+        return calendar
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __contains__(self, target: date) -> bool:
+        ordinal = target.toordinal()
+        idx = bisect_right(self.starts, ordinal) - 1
+        return idx >= 0 and ordinal <= self.ends[idx]
+
+    def add_intervals(self, intervals: Iterable[Interval]) -> None:
+        merged: list[Interval] = []
+        for start, end in sorted([*zip(self.starts, self.ends), *intervals]):
+            if end < start:
+                continue
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+
+def _parse_range(start: str, end: str) -> Interval:
+    return datetime.fromisoformat(start).date().toordinal(), datetime.fromisoformat(end).date().toordinal()
+
+
+def load_calendar_file(path: Path) -> list[Interval]:
+    suffix = path.suffix.lower()
+    if suffix in (".ics", ".ical"):
+        intervals = load_ics(path)
+    elif suffix == ".csv":
+        intervals = load_csv(path)
+    else:
+        raise ValueError(f"Unsupported holiday calendar {path}; expected .ics or .csv")
+    log.debug("Loaded %s holiday interval(s) from %s", len(intervals), path)
+    return intervals
+
+
+def load_csv(path: Path) -> list[Interval]:
+    """One date per row, or `start,end` rows; a header row such as `date` or `start,end` is skipped."""
+    intervals: list[Interval] = []
+    with path.open(newline="", encoding="utf-8") as fh:
+        for row in csv.reader(fh):
+            cells = [cell.strip() for cell in row if cell.strip()]
+            if not cells or cells[0].startswith("#"):
+                continue
+            try:
+                start = date.fromisoformat(cells[0][:10])
+                end = date.fromisoformat(cells[1][:10]) if len(cells) > 1 else start
+            except ValueError:
+                continue
+            intervals.append((start.toordinal(), end.toordinal()))
+    return intervals
+
+
+def load_ics(path: Path) -> list[Interval]:
+    """VEVENT DTSTART/DTEND dates; DTEND is exclusive for all-day events. RRULEs are not expanded."""
+    intervals: list[Interval] = []
+    start: date | None = None
+    end: date | None = None
+    all_day = True
+    for line in _unfold(path.read_text(encoding="utf-8", errors="replace")):
+        name, _, value = line.partition(":")
+        key = name.split(";", 1)[0].upper()
+        if key == "BEGIN" and value.strip().upper() == "VEVENT":
+            start = end = None
+            all_day = True
+        elif key == "DTSTART":
+            start, all_day = _ics_date(value), len(value.strip()) == 8
+        elif key == "DTEND":
+            end = _ics_date(value)
+        elif key == "END" and value.strip().upper() == "VEVENT" and start is not None:
+            if end is None:
+                last = start
+            elif all_day:
+                last = max(start, end - timedelta(days=1))
+            else:
+                last = end
+            intervals.append((start.toordinal(), last.toordinal()))
+            start = end = None
+    return intervals
+
+
+def _unfold(text: str) -> Iterable[str]:
+    current = ""
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t"):
+            current += raw[1:]
+            continue
+        if current:
+            yield current
+        current = raw
+    if current:
+        yield current
+
+
+def _ics_date(value: str) -> date:
+    value = value.strip()
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
@@ -1,9 +1,218 @@
+from __future__ import annotations
+
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import IO, TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from .config import LogConfig
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# run / day / commit / phase of whatever the current thread is doing; never mutated, only replaced
+_context: ContextVar[dict[str, Any]] = ContextVar("gag_log_context", default={})
+_installed: logging.Handler | None = None
+_listener: _Listener | None = None
+_handler: AsyncHandler | None = None
+
+
+def bind(**fields: Any) -> None:
+    """Attach `fields` to every later record from the current context (e.g. the run id)."""
+    _context.set({**_context.get(), **fields})
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach `fields` to the records logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class DebugSampler(logging.Filter):
+    """Rate limit for records below INFO: a token bucket per call site (logger and message template).
+
+    Each call site may log `rate` records per second, in bursts of `burst`. The
+    next record that gets through carries the number dropped since as `suppressed`.
+    """
+
+    MAX_SITES = 4096
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__()
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._buckets: dict[tuple[str, Any], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO or self.rate <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_SITES:  # pre-formatted messages would make every call a site
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.suppressed = int(bucket[2])
+                bucket[2] = 0
+        return True
+
+
+class AsyncHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting them or ever blocking.
+
+    The caller only captures its log context; when the bounded queue is full
+    the record is dropped and counted instead of stalling the commit loop.
+    """
+
+    def __init__(self, size: int):
+        super().__init__(queue.Queue(size))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # same process, so the record needs no pickling-safe rendering here
+        record.context = _context.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # the stock `put_nowait` raises when the queue is full; the thread is draining it, so wait for room
+        self.queue.put(self._sentinel)
+
+
+class ContextFilter(logging.Filter):
+    """Synchronous counterpart of `AsyncHandler.prepare`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _context.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = {**getattr(record, "context", {}), **_suppressed(record)}
+        if extra:
+            line += " {" + " ".join(f"{key}={value}" for key, value in extra.items()) + "}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, the log context and any traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "context", {}),
+            **_suppressed(record),
+        }
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+def _suppressed(record: logging.LogRecord) -> dict[str, int]:
+    suppressed = getattr(record, "suppressed", 0)
+    return {"suppressed": suppressed} if suppressed else {}
+
+
+def setup_logging(verbose: bool = True, cfg: LogConfig | None = None, stream: IO[str] | None = None) -> None:
+    """Log to `stream` (stderr by default) through a background thread, as text or JSON lines.
+
+    Like `logging.basicConfig`, this leaves a root logger that already has
+    handlers of its own alone.
+    """
+    from .config import LogConfig
+
+    global _installed, _listener, _handler
+    cfg = cfg or LogConfig()
+    root = logging.getLogger()
+    if any(handler is not _installed for handler in root.handlers):
+        return
+    stop_logging()
+    if _installed is not None:
+        root.removeHandler(_installed)
+
+    sink = logging.StreamHandler(stream)
+    sink.setFormatter(JsonFormatter() if cfg.format == "json" else TextFormatter())
+    front: logging.Handler
+    if cfg.queue_size > 0:
+        _handler = front = AsyncHandler(cfg.queue_size)
+        _listener = _Listener(front.queue, sink)
+        _listener.start()
+    else:
+        _handler = None
+        front = sink
+        front.addFilter(ContextFilter())
+    front.addFilter(DebugSampler(cfg.debug_rate, cfg.debug_burst))
+    _installed = front
+    root.addHandler(front)
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+def flush_logging() -> None:
+    """Write out everything queued so far; for process exits that skip `atexit` (pool workers)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Drain the queue and stop the listener thread; registered with `atexit`."""
+    global _listener
+    if _handler is not None and _handler.dropped:
+        logging.getLogger(__name__).warning("Log queue was full: %s record(s) dropped", _handler.dropped)
+        _handler.dropped = 0
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child() -> None:
+    # the listener thread did not survive the fork, and the queue may hold the parent's records
+    global _listener
+    if _listener is None or _handler is None:
+        return
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    _listener = _Listener(_handler.queue, *_listener.handlers)
+    _listener.start()
 
 
-def setup_logging(verbose: bool = True) -> None:
-    level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-    )
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
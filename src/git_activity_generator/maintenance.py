@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from .config import AppConfig
+from .metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+Runner = Callable[..., str]
+
+
+class RepoMaintenance:
+    """Keeps a repo that grows by thousands of commits cheap to work with.
+
+    Due every `maintenance.check_every` commits. The engine runs `check` once
+    the backend is flushed and nothing else writes to the repo: right after the
+    commit that made it due or, with worktree lanes, at the next day boundary
+    once the lanes are idle; and before each push made while no lane runs.
+
+    - loose objects (estimated like `git gc --auto`, from one fan-out directory)
+      over `loose_objects` are packed with an incremental `repack -d`;
+    - `max_packs` or more packs are indexed by a multi-pack-index and the
+      smaller ones folded together, as `git maintenance`'s incremental-repack does;
+    - every `commit_graph_every` new commits, the split commit-graph is extended.
+
+    Each step is timed into the `maintenance` phase and git's own timings.
+    """
+
+    def __init__(self, cfg: AppConfig, run: Runner, metrics: Callable[[], Metrics]):
+        self.cfg = cfg.maintenance
+        self.enabled = self.cfg.enabled and not cfg.dry_run
+        self.run = run
+        self.metrics = metrics
+        self.objects = Path(cfg.repo_path) / ".git" / "objects"
+        self.commits = 0
+        self._checked_at = 0
+        self._graph_at = 0
+
+    def after_commit(self) -> None:
+        self.commits += 1
+
+    @property
+    def due(self) -> bool:
+        return self.enabled and self.commits - self._checked_at >= self.cfg.check_every
+
+    def check(self) -> None:
+        if not self.enabled:
+            return
+        self._checked_at = self.commits
+        started = time.perf_counter()
+        done: list[str] = []
+
+        loose = self.loose_objects()
+        if loose >= self.cfg.loose_objects:
+            self.run("repack", "-d", "-q")
+            done.append(f"repack ({loose} loose)")
+
+        packs = self.pack_sizes()
+        if len(packs) >= self.cfg.max_packs:
+            self.run("multi-pack-index", "write")
+            self.run("multi-pack-index", "expire")
+            self.run("multi-pack-index", "repack", f"--batch-size={packs[1] + 1}")
+            done.append(f"multi-pack-index ({len(packs)} packs)")
+
+        if self.commits - self._graph_at >= self.cfg.commit_graph_every or not self._has_commit_graph():
+            self.run("commit-graph", "write", "--reachable", "--split", "--changed-paths")
+            self._graph_at = self.commits
+            done.append("commit-graph")
+
+        if done:
+            seconds = time.perf_counter() - started
+            self.metrics().observe_phase("maintenance", seconds)
+            log.info("Maintenance after %s commit(s): %s in %.2fs", self.commits, ", ".join(done), seconds)
+
+    def loose_objects(self) -> int:
+        # objects are spread evenly over 256 fan-out dirs; one is a good sample
+        try:
+            with os.scandir(self.objects / "17") as it:
+                return sum(1 for _ in it) * 256
+        except FileNotFoundError:
+            return 0
+
+    def pack_sizes(self) -> list[int]:
+        """Pack sizes in bytes, largest first."""
+        try:
+            with os.scandir(self.objects / "pack") as it:
+                sizes = [entry.stat().st_size for entry in it if entry.name.endswith(".pack")]
+        except FileNotFoundError:
+            return []
+        return sorted(sizes, reverse=True)
+
+    def _has_commit_graph(self) -> bool:
+        info = self.objects / "info"
+        return (info / "commit-graph").exists() or (info / "commit-graphs").is_dir()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import re
+import struct
+import subprocess
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .config import default_cache_dir
+
+log = logging.getLogger(__name__)
+
+MODEL_VERSION = 2
+START, END = "__start__", "__end__"
+MAGIC = b"GAGMARKV"
+# magic, version, states, slots, token bytes; then the tokens, newline-separated, and the raw arrays
+HEADER = struct.Struct("<8sIQQQ")
+
+# conventional-commit prefixes, issue refs and bracketed paths are added back by MessageGenerator
+_PREFIX = re.compile(r"^\W*[a-z]+(\([^)]*\))?!?:\s*", re.IGNORECASE)
+_NOISE = re.compile(r"\(#\d+\)|\[[^\]]*\]|#\d+")
+
+
+class MarkovModel:
+    """First-order word chain stored as flat alias tables.
+
+    State `i` owns slots `offsets[i]:offsets[i + 1]` of `prob`/`alias`/`outcome`,
+    so sampling the next token is O(1) regardless of corpus size.
+    """
+
+    def __init__(self, tokens: list[str], offsets: array, prob: array, alias: array, outcome: array):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.prob = prob
+        self.alias = alias
+        self.outcome = outcome
+
+    @classmethod
+    def train(cls, sentences: Iterable[str]) -> "MarkovModel":
+        ids: dict[str, int] = {START: 0, END: 1}
+        counts: dict[int, Counter[int]] = defaultdict(Counter)
+        for sentence in sentences:
+            prev = 0
+            for word in sentence.split():
+                cur = ids.setdefault(word, len(ids))
+                counts[prev][cur] += 1
+                prev = cur
+            if prev:
+                counts[prev][1] += 1
+
+        offsets = array("Q", [0])
+        prob, alias, outcome = array("f"), array("Q"), array("I")
+        for state in range(len(ids)):
+            base = len(outcome)
+            _append_alias_table(counts.get(state, Counter({1: 1})), base, prob, alias, outcome)
+            offsets.append(len(outcome))
+        return cls(list(ids), offsets, prob, alias, outcome)
+
+    @property
+    def states(self) -> int:
+        return len(self.tokens)
+
+    def sample(self, rng: random.Random, max_words: int = 10) -> str:
+        state = 0
+        out: list[str] = []
+        while len(out) < max_words:
+            lo, hi = self.offsets[state], self.offsets[state + 1]
+            slot = lo + int(rng.random() * (hi - lo))
+            state = self.outcome[slot] if rng.random() < self.prob[slot] else self.outcome[self.alias[slot]]
+            if state == 1:
+                break
+            out.append(self.tokens[state])
+        return " ".join(out)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        # tokens come from str.split, so none holds a newline
+        tokens = "\n".join(self.tokens).encode()
+        with tmp.open("wb") as fh:
+            fh.write(HEADER.pack(MAGIC, MODEL_VERSION, self.states, len(self.outcome), len(tokens)))
+            fh.write(tokens)
+            for table in (self.offsets, self.prob, self.alias, self.outcome):
+                table.tofile(fh)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "MarkovModel | None":
+        try:
+            with path.open("rb") as fh:
+                magic, version, states, slots, size = HEADER.unpack(fh.read(HEADER.size))
+                if magic != MAGIC or version != MODEL_VERSION:
+                    return None
+                tokens = fh.read(size).decode().split("\n")
+                tables = []
+                for code, count in (("Q", states + 1), ("f", slots), ("Q", slots), ("I", slots)):
+                    table = array(code)
+                    table.fromfile(fh, count)
+                    tables.append(table)
+                trailing = fh.read(1)
+        except (OSError, EOFError, ValueError, struct.error):
+            return None
+        offsets, prob, alias, outcome = tables
+        # a damaged file must not send sampling out of bounds
+        if trailing or len(tokens) != states or offsets[-1] != slots or max(alias, default=0) >= slots or max(outcome, default=0) >= states:
+            return None
+        return cls(tokens, offsets, prob, alias, outcome)
+
+
+def _append_alias_table(counts: Counter[int], base: int, prob: array, alias: array, outcome: array) -> None:
+    """Vose's alias method; `alias` holds absolute slot indices."""
+    items = list(counts.items())
+    n = len(items)
+    total = sum(weight for _, weight in items)
+    scaled = [weight * n / total for _, weight in items]
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    table_prob = [1.0] * n
+    table_alias = list(range(n))
+    while small and large:
+        s, g = small.pop(), large.pop()
+        table_prob[s] = scaled[s]
+        table_alias[s] = g
+        scaled[g] -= 1.0 - scaled[s]
+        (small if scaled[g] < 1.0 else large).append(g)
+
+    outcome.extend(token for token, _ in items)
+    prob.extend(table_prob)
+    alias.extend(base + a for a in table_alias)
+
+
+def normalize_subject(subject: str) -> str:
+    subject = _PREFIX.sub("", subject.strip())
+    subject = _NOISE.sub(" ", subject)
+    return " ".join(subject.lower().split())
+
+
+def iter_corpus(source: Path) -> Iterator[str]:
+    """Subjects from a git repo's history or lines of a text file, normalized."""
+    if source.is_dir():
+        proc = subprocess.Popen(
+            ["git", "log", "--no-merges", "--format=%s", "HEAD"],
+            cwd=source,
+            stdout=subprocess.PIPE,
+            text=True,
+            errors="replace",
+        )
+        assert proc.stdout is not None
+        lines: Iterable[str] = proc.stdout
+    else:
+        proc = None
+        lines = source.open(encoding="utf-8", errors="replace")
+    try:
+        for line in lines:
+            subject = normalize_subject(line)
+            if subject:
+                yield subject
+    finally:
+        if proc is not None:
+            proc.stdout.close()  # type: ignore[union-attr]
+            proc.wait()
+        else:
+            lines.close()  # type: ignore[attr-defined]
+
+
+def corpus_key(source: Path) -> str:
+    digest = hashlib.sha256(f"v{MODEL_VERSION}:".encode())
+    if source.is_dir():
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=source, check=True, text=True, capture_output=True).stdout
+        digest.update(f"git:{source.resolve()}:{head.strip()}".encode())
+    else:
+        with source.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_or_train(source: Path, cache_dir: Path | None = None) -> MarkovModel:
+    cache_path = (cache_dir or default_cache_dir()) / f"markov-{corpus_key(source)}.bin"
+    model = MarkovModel.load(cache_path) if cache_path.exists() else None
+    if model is not None:
+        log.debug("Loaded Markov model (%s states) from %s", model.states, cache_path)
+        return model
+
+    model = MarkovModel.train(iter_corpus(source))
+    log.info("Trained Markov model with %s states from %s", model.states, source)
+    try:
+        model.save(cache_path)
+    except OSError as exc:
+        log.warning("Could not cache Markov model at %s: %s", cache_path, exc)
+    return model
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import logging
 import random
 import re
-from collections import defaultdict
+from pathlib import Path
 
+from .bloom import BloomFilter, history_subjects
 from .config import AppConfig
+from .markov import MarkovModel, load_or_train
+
+log = logging.getLogger(__name__)
 
 TYPES = ["feature", "bugfix", "refactor", "docs", "chore", "test", "perf"]
 SCOPES = ["auth", "api", "ui", "worker", "db", "core", "scheduler", "cli"]
@@ -30,13 +35,72 @@ TONE_TEMPLATES = {
 }
 
 
+CC_TYPES = {
+    "feature": "feat",
+    "bugfix": "fix",
+    "refactor": "refactor",
+    "docs": "docs",
+    "chore": "chore",
+    "test": "test",
+    "perf": "perf",
+}
+EMOJI = ["✨", "🐛", "🧹", "📝", "⚡"]
+WHITESPACE = re.compile(r"\s+")
+MARKOV_PROBABILITY = 0.35
+# fresh draws for a subject the filter has seen before giving up and repeating one
+UNIQUE_ATTEMPTS = 32
+
+_TYPE_IDX = range(len(TYPES))
+_SCOPE_IDX = range(len(SCOPES))
+_COMPONENT_IDX = range(len(COMPONENTS))
+_FILE_IDX = range(len(FILES))
+_ISSUES = range(10, 1000)
+
+# (conventional prefix, template text, " [file]") for every type x scope x component x file x template
+Row = tuple[str, str, str]
+
+
+def expand_templates(tone: str, conventional: bool) -> list[Row]:
+    """Every combination `generate` can draw, flattened in its draw order so one index finds it."""
+    rows: list[Row] = []
+    for change_type in TYPES:
+        for scope in SCOPES:
+            prefix = f"{CC_TYPES[change_type]}({scope}): " if conventional else ""
+            for component in COMPONENTS:
+                for file_ref in FILES:
+                    tail = f" [{file_ref}]"
+                    for template in TONE_TEMPLATES[tone]:
+                        body = template.format(type=change_type, component=component, scope=scope, file=file_ref)
+                        rows.append((prefix, WHITESPACE.sub(" ", body).strip(), tail))
+    return rows
+
+
 class MessageGenerator:
+    """Commit subjects from tone templates, optionally varied by a Markov chain.
+
+    All template combinations are expanded once, so a message is a table
+    lookup plus its issue number. `generate` draws from `rng` exactly as the
+    original per-field version did; `generate_batch` draws a whole batch at
+    once instead, and is what the commit pipeline uses. With
+    `messages.unique_subjects`, `claim`/`generate_batch` also consult a Bloom
+    filter of subjects already used in the repo.
+    """
+
     def __init__(self, cfg: AppConfig, rng: random.Random):
         self.cfg = cfg
         self.rng = rng
         self.markov = self._build_markov_chain()
+        tone = cfg.messages.tone if cfg.messages.tone in TONE_TEMPLATES else "startup"
+        self.table = expand_templates(tone, cfg.messages.conventional_commits)
+        self._templates = range(len(TONE_TEMPLATES[tone]))
+        self.seen = self._open_seen() if cfg.messages.unique_subjects else None
+        self.repeats = 0
+
+    def _build_markov_chain(self) -> MarkovModel:
+        if self.cfg.messages.markov_corpus:
+            cache_dir = Path(self.cfg.messages.markov_cache_dir) if self.cfg.messages.markov_cache_dir else None
+            return load_or_train(Path(self.cfg.messages.markov_corpus), cache_dir)
 
-    def _build_markov_chain(self) -> dict[str, list[str]]:
         corpus = [
             "add endpoint validation for token refresh",
             "fix flaky worker queue retry path",
@@ -45,66 +109,116 @@ class MessageGenerator:
             "improve test coverage around commit generator",
             "optimize file mutation batching logic",
         ]
-        graph: dict[str, list[str]] = defaultdict(list)
-        for sentence in corpus:
-            words = ["__start__"] + sentence.split() + ["__end__"]
-            for i in range(len(words) - 1):
-                graph[words[i]].append(words[i + 1])
-        return graph
-
-    def _markov_sentence(self, max_words: int = 10) -> str:
-        token = "__start__"
-        out: list[str] = []
-        while len(out) < max_words:
-            nxt = self.rng.choice(self.markov[token])
-            if nxt == "__end__":
-                break
-            out.append(nxt)
-            token = nxt
-        return " ".join(out)
-
-    def _inject_typo(self, text: str) -> str:
+        return MarkovModel.train(corpus)
+
+    def _markov_sentence(self, rng: random.Random, max_words: int = 10) -> str:
+        return self.markov.sample(rng, max_words)
+
+    def _inject_typo(self, text: str, rng: random.Random) -> str:
         if len(text) < 6:
             return text
-        idx = self.rng.randint(1, len(text) - 2)
+        idx = rng.randint(1, len(text) - 2)
         return text[:idx] + text[idx + 1] + text[idx] + text[idx + 2 :]
 
-    def generate(self) -> str:
-        change_type = self.rng.choice(TYPES)
-        scope = self.rng.choice(SCOPES)
-        component = self.rng.choice(COMPONENTS)
-        file_ref = self.rng.choice(FILES)
-        issue = self.rng.randint(10, 999)
-
-        tone = self.cfg.messages.tone if self.cfg.messages.tone in TONE_TEMPLATES else "startup"
-        template = self.rng.choice(TONE_TEMPLATES[tone]).format(
-            type=change_type,
-            component=component,
-            scope=scope,
-            file=file_ref,
-        )
-
-        if self.cfg.messages.markov_enabled and self.rng.random() < 0.35:
-            template = self._markov_sentence()
-
-        summary = f"{template} (#{issue}) [{file_ref}]"
-
-        if self.cfg.messages.conventional_commits:
-            cc_type = {
-                "feature": "feat",
-                "bugfix": "fix",
-                "refactor": "refactor",
-                "docs": "docs",
-                "chore": "chore",
-                "test": "test",
-                "perf": "perf",
-            }[change_type]
-            summary = f"{cc_type}({scope}): {summary}"
-
-        if self.cfg.messages.emoji:
-            summary = self.rng.choice(["✨", "🐛", "🧹", "📝", "⚡"]) + " " + summary
-
-        if self.cfg.messages.typo_probability > 0 and self.rng.random() < self.cfg.messages.typo_probability:
-            summary = self._inject_typo(summary)
-
-        return re.sub(r"\s+", " ", summary).strip()
+    def generate(self, rng: random.Random | None = None) -> str:
+        rng = rng or self.rng
+        choice = rng.choice
+        # one draw per field, in the original order: the same seed gives the same message
+        idx = choice(_TYPE_IDX) * len(SCOPES) + choice(_SCOPE_IDX)
+        idx = idx * len(COMPONENTS) + choice(_COMPONENT_IDX)
+        idx = idx * len(FILES) + choice(_FILE_IDX)
+        issue = rng.randint(10, 999)
+        prefix, body, tail = self.table[idx * len(self._templates) + choice(self._templates)]
+        messages = self.cfg.messages
+
+        dirty = messages.markov_enabled and rng.random() < MARKOV_PROBABILITY
+        if dirty:
+            body = self._markov_sentence(rng)
+        summary = f"{prefix}{body} (#{issue}){tail}"
+        if messages.emoji:
+            summary = choice(EMOJI) + " " + summary
+        if messages.typo_probability > 0 and rng.random() < messages.typo_probability:
+            summary = self._inject_typo(summary, rng)
+            dirty = True
+        # table rows are already normalized; only Markov text and typos can add stray whitespace
+        return WHITESPACE.sub(" ", summary).strip() if dirty else summary
+
+    def generate_batch(self, n: int, rng: random.Random | None = None, unique: bool = True) -> list[str]:
+        """`n` messages from bulk draws; unique against the filter when `unique_subjects` is on.
+
+        With `unique=False` the filter is neither read nor updated, so the batch
+        depends only on `rng`; `claim` then checks each message at commit time.
+        """
+        rng = rng or self.rng
+        messages = self.cfg.messages
+        seen = self.seen if unique else None
+        out: list[str] = []
+        misses = 0
+        while len(out) < n:
+            k = n - len(out)
+            rows = rng.choices(self.table, k=k)
+            issues = rng.choices(_ISSUES, k=k)
+            markov = [rng.random() < MARKOV_PROBABILITY for _ in range(k)] if messages.markov_enabled else [False] * k
+            emoji = rng.choices(EMOJI, k=k) if messages.emoji else None
+            typo = messages.typo_probability
+            for i, (prefix, body, tail) in enumerate(rows):
+                dirty = markov[i]
+                if dirty:
+                    body = self._markov_sentence(rng)
+                summary = f"{prefix}{body} (#{issues[i]}){tail}"
+                if emoji is not None:
+                    summary = emoji[i] + " " + summary
+                if typo > 0 and rng.random() < typo:
+                    summary = self._inject_typo(summary, rng)
+                    dirty = True
+                if dirty:
+                    summary = WHITESPACE.sub(" ", summary).strip()
+                if seen is None or seen.add(summary):
+                    out.append(summary)
+                    continue
+                # used before: the next round redraws it
+                misses += 1
+                if misses > UNIQUE_ATTEMPTS * n:
+                    self._give_up(summary)
+                    out.append(summary)
+        return out
+
+    def claim(self, message: str, rng: random.Random) -> str:
+        """Writer side of `unique_subjects`: `message`, or a fresh one drawn from `rng` if it was used before.
+
+        Call in commit order: the result depends on every subject claimed earlier.
+        """
+        if self.seen is None:
+            return message
+        for _ in range(UNIQUE_ATTEMPTS):
+            if self.seen.add(message):
+                return message
+            message = self.generate(rng)
+        self._give_up(message)
+        return message
+
+    def _give_up(self, message: str) -> None:
+        # a saturated filter must not stall a run
+        self.repeats += 1
+        if self.repeats in (1, 100, 10000):
+            log.warning("No unused subject found (%s repeat(s) so far); repeating %r", self.repeats, message)
+
+    def _seen_path(self) -> Path:
+        return Path(self.cfg.repo_path) / ".git" / "activity-sim-subjects.bloom"
+
+    def _open_seen(self) -> BloomFilter:
+        path = self._seen_path()
+        seen = BloomFilter.load(path)
+        if seen is None:
+            messages = self.cfg.messages
+            seen = BloomFilter.for_capacity(messages.unique_capacity, messages.unique_error_rate)
+            if path.parent.is_dir():
+                seen.update(history_subjects(path.parent.parent))
+                log.info("Indexed %s existing commit subject(s) for unique_subjects", len(seen))
+        return seen
+
+    def save(self) -> None:
+        """Persist the subject filter; called at each push checkpoint and at the end of a run."""
+        if self.seen is not None and not self.cfg.dry_run and self._seen_path().parent.is_dir():
+            self.seen.save(self._seen_path())
+
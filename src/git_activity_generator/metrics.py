@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from .logger import log_context
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                return
+        self.counts[-1] += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        running = 0
+        out = []
+        for bound, count in zip([*map(_fmt, self.buckets), "+Inf"], self.counts):
+            running += count
+            out.append((bound, running))
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": dict(self.cumulative())}
+
+
+@dataclass
+class Metrics:
+    """Per-run timing histograms: simulate_day phases, git subcommands and pushes per remote."""
+
+    phases: dict[str, Histogram] = field(default_factory=dict)
+    git_calls: dict[str, Histogram] = field(default_factory=dict)
+    push_seconds: dict[str, Histogram] = field(default_factory=dict)
+    push_bytes: dict[str, int] = field(default_factory=dict)
+    push_retries: dict[str, int] = field(default_factory=dict)
+    push_failures: dict[str, int] = field(default_factory=dict)
+    # worktree lanes and pipeline workers observe from their own threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block as phase `name`, which records logged inside it carry as `phase`."""
+        started = time.perf_counter()
+        try:
+            with log_context(phase=name):
+                yield
+        finally:
+            self.observe_phase(name, time.perf_counter() - started)
+
+    def observe_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            _series(self.phases, name).observe(seconds)
+
+    def observe_git(self, subcommand: str, seconds: float) -> None:
+        with self._lock:
+            _series(self.git_calls, subcommand).observe(seconds)
+
+    def observe_push(self, remote: str, seconds: float, sent: int, retries: int, ok: bool) -> None:
+        """One push to `remote`: wall time including retries, and bytes git reported writing."""
+        with self._lock:
+            _series(self.push_seconds, remote).observe(seconds)
+            self.push_bytes[remote] = self.push_bytes.get(remote, 0) + sent
+            self.push_retries[remote] = self.push_retries.get(remote, 0) + retries
+            self.push_failures[remote] = self.push_failures.get(remote, 0) + (not ok)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": {name: hist.to_dict() for name, hist in sorted(self.phases.items())},
+            "git_calls": {name: hist.to_dict() for name, hist in sorted(self.git_calls.items())},
+            "push_remotes": {
+                remote: {
+                    "seconds": hist.to_dict(),
+                    "bytes": self.push_bytes.get(remote, 0),
+                    "retries": self.push_retries.get(remote, 0),
+                    "failures": self.push_failures.get(remote, 0),
+                }
+                for remote, hist in sorted(self.push_seconds.items())
+            },
+        }
+
+
+def _series(series: dict[str, Histogram], name: str) -> Histogram:
+    hist = series.get(name)
+    if hist is None:
+        hist = series[name] = Histogram()
+    return hist
+
+
+def write_prometheus_textfile(path: str | Path, metrics: Metrics, labels: dict[str, str], gauges: dict[str, float]) -> None:
+    """Write metrics in the text exposition format, atomically, for node_exporter's textfile collector."""
+    lines: list[str] = []
+    for name, value in gauges.items():
+        lines += [f"# TYPE gag_{name} gauge", f"gag_{name}{_labels(labels)} {value}"]
+    for metric, key, series, help_text in (
+        ("gag_phase_seconds", "phase", metrics.phases, "Time spent per simulate_day phase."),
+        ("gag_git_command_seconds", "command", metrics.git_calls, "Time spent per git subcommand."),
+        ("gag_push_seconds", "remote", metrics.push_seconds, "Time spent per push to each remote, including retries."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for name, hist in sorted(series.items()):
+            series_labels = {**labels, key: name}
+            for bound, count in hist.cumulative():
+                lines.append(f"{metric}_bucket{_labels({**series_labels, 'le': bound})} {count}")
+            lines.append(f"{metric}_sum{_labels(series_labels)} {hist.total}")
+            lines.append(f"{metric}_count{_labels(series_labels)} {hist.count}")
+    for metric, counts, help_text in (
+        ("gag_push_bytes_total", metrics.push_bytes, "Bytes written by git push, per remote."),
+        ("gag_push_retries_total", metrics.push_retries, "Push attempts retried after a failure, per remote."),
+        ("gag_push_failures_total", metrics.push_failures, "Pushes that failed after all retries, per remote."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for remote, value in sorted(counts.items()):
+            lines.append(f"{metric}{_labels({**labels, 'remote': remote})} {value}")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _fmt(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import date, datetime, timedelta
+from typing import Any, Sequence
+
+from zoneinfo import ZoneInfo
+
+from .config import AppConfig
+from .scheduler import CommitWindow, SchedulingEngine
+from .seeds import SeedStream
+
+HEATMAP_LEVELS = " .:-=+*#%@"
+
+
+@dataclass
+class RangePlan:
+    """Commit counts per day plus every window as (day index, seconds after local midnight)."""
+
+    start: date
+    counts: Sequence[int]
+    window_day: Sequence[int]
+    window_seconds: Sequence[int]
+    tz: ZoneInfo
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.counts) - 1)
+
+    @property
+    def total(self) -> int:
+        return int(sum(self.counts))
+
+    def day(self, idx: int) -> date:
+        return self.start + timedelta(days=idx)
+
+    def iso_windows(self) -> list[str]:
+        base = datetime(self.start.year, self.start.month, self.start.day)
+        # one zoneinfo lookup per day; only windows on days whose UTC offset changes are resolved one by one
+        midnight = [self._utc_offset(d, 0) for d in range(len(self.counts) + 1)]
+        iso = []
+        for d, s in zip(self.window_day, self.window_seconds):
+            d, s = int(d), int(s)
+            offset = midnight[d] if midnight[d] == midnight[d + 1] else self._utc_offset(d, s)
+            iso.append((base + timedelta(days=d, seconds=s)).isoformat() + offset)
+        return iso
+
+    def by_day(self) -> list[dict[str, Any]]:
+        iso = self.iso_windows()
+        days: list[dict[str, Any]] = []
+        pos = 0
+        for idx, count in enumerate(self.counts):
+            count = int(count)
+            days.append({"date": self.day(idx).isoformat(), "planned": count, "windows": iso[pos : pos + count]})
+            pos += count
+        return days
+
+    def _utc_offset(self, day_idx: int, seconds: int) -> str:
+        local = datetime(self.start.year, self.start.month, self.start.day) + timedelta(days=day_idx, seconds=seconds)
+        return _format_offset(self.tz.utcoffset(local) or timedelta(0))
+
+
+@lru_cache(maxsize=64)
+def _format_offset(offset: timedelta) -> str:
+    minutes = int(offset.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+
+def plan_from_windows(start: date, days: list[tuple[date, list[CommitWindow]]], tz: ZoneInfo) -> RangePlan:
+    counts: list[int] = []
+    window_day: list[int] = []
+    window_seconds: list[int] = []
+    for idx, (day, windows) in enumerate(days):
+        midnight = datetime(day.year, day.month, day.day)
+        for slot in windows:
+            window_day.append(idx)
+            window_seconds.append(int((slot.when.replace(tzinfo=None) - midnight).total_seconds()))
+        counts.append(len(windows))
+    return RangePlan(start=start, counts=counts, window_day=window_day, window_seconds=window_seconds, tz=tz)
+
+
+def plan_range(cfg: AppConfig, start: date, end: date) -> RangePlan:
+    """The per-day `SchedulingEngine` over the range, with the seed streams `ActivityEngine` uses: the plan it runs."""
+    seeds = SeedStream(cfg.deterministic_seed)
+    scheduler = SchedulingEngine(cfg, seeds.rng("scheduler"))
+    days: list[tuple[date, list[CommitWindow]]] = []
+    day = start
+    while day <= end:
+        days.append((day, scheduler.plan_day(day, seeds.rng("day", day.toordinal()))))
+        day += timedelta(days=1)
+    return plan_from_windows(start, days, scheduler.tz)
+
+
+def render_heatmap(plan: RangePlan) -> str:
+    """GitHub-style grid: one row per weekday, one column per week."""
+    peak = max((int(c) for c in plan.counts), default=0) or 1
+    lead = plan.start.weekday()
+    cells = [" "] * lead + [HEATMAP_LEVELS[min(len(HEATMAP_LEVELS) - 1, -(-int(c) * (len(HEATMAP_LEVELS) - 1) // peak))] for c in plan.counts]
+    weeks = -(-len(cells) // 7)
+    cells += [" "] * (weeks * 7 - len(cells))
+
+    months = [" "] * weeks
+    for week in range(weeks):
+        first = max(plan.start, plan.start + timedelta(days=week * 7 - lead))
+        if week == 0 or first.day <= 7:
+            label = first.strftime("%b")
+            if all(c == " " for c in months[week : week + len(label)]):
+                months[week : week + len(label)] = label
+    months = months[:weeks]
+
+    rows = ["    " + "".join(months)]
+    for weekday, name in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
+        rows.append(f"{name} " + "".join(cells[week * 7 + weekday] for week in range(weeks)))
+    rows.append(f"legend: '{HEATMAP_LEVELS}' = 0..{peak} commits/day")
+    return "\n".join(rows)
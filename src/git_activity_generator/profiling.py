@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import CodeType
+from typing import Any, Iterator
+
+log = logging.getLogger(__name__)
+
+# set by `--profile`/`--profile-dir`, or directly in the environment; child processes (fleet workers) inherit them
+PROFILE_ENV = "GAG_PROFILE"
+PROFILE_DIR_ENV = "GAG_PROFILE_DIR"
+KINDS = ("cpu", "mem")
+SAMPLE_INTERVAL = 0.005
+TOP_N = 30
+MEM_FRAMES = 16
+# leaf frames of a helper thread waiting for work (executor queues, lane futures, lock waits)
+IDLE_LEAVES = {"thread._worker", "threading.Condition.wait", "threading.Event.wait", "queue.Queue.get"}
+
+
+def enable(kind: str, out_dir: str | Path = ".") -> None:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown profile kind {kind!r}; expected one of {', '.join(KINDS)}")
+    os.environ[PROFILE_ENV] = kind
+    os.environ[PROFILE_DIR_ENV] = str(Path(out_dir).resolve())
+
+
+@contextmanager
+def scope(name: str) -> Iterator[None]:
+    """Profile the block when `GAG_PROFILE` is set; otherwise do nothing.
+
+    Only the outermost scope profiles, so nested scopes are free. Reports are
+    per process and rewritten at the end of every outermost scope: a daemon or
+    a fleet worker that enters many scopes keeps one cumulative report.
+    """
+    global _active
+    kind = os.environ.get(PROFILE_ENV)
+    if kind not in KINDS or _active:
+        yield
+        return
+    session = _session(kind)
+    _active = True
+    session.enter()
+    try:
+        yield
+    finally:
+        session.leave(name)
+        _active = False
+
+
+_active = False
+_sessions: dict[tuple[int, str], _Session] = {}
+
+
+def _session(kind: str) -> _Session:
+    # keyed by pid too: a forked fleet worker must not append to its parent's profile
+    key = (os.getpid(), kind)
+    if key not in _sessions:
+        out_dir = Path(os.environ.get(PROFILE_DIR_ENV) or ".")
+        stem = f"gag-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        _sessions[key] = StackSampler(out_dir, stem) if kind == "cpu" else AllocationTracer(out_dir, stem)
+    return _sessions[key]
+
+
+class _Session:
+    def __init__(self, out_dir: Path, stem: str):
+        self.out_dir = out_dir
+        self.stem = stem
+        self.scopes: Counter[str] = Counter()
+        self.seconds = 0.0
+        self._started = 0.0
+
+    def enter(self) -> None:
+        self._started = time.perf_counter()
+        self.start()
+
+    def leave(self, name: str) -> None:
+        self.stop(name)
+        self.seconds += time.perf_counter() - self._started
+        self.scopes[name] += 1
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for path in self.write():
+                log.info("Profile written to %s", path)
+        except OSError as exc:
+            log.warning("Could not write profile to %s: %s", self.out_dir, exc)
+
+    def header(self) -> str:
+        scopes = ", ".join(f"{name} x{count}" for name, count in sorted(self.scopes.items()))
+        return f"# pid {os.getpid()}, scopes: {scopes}, {self.seconds:.3f}s profiled\n"
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def stop(self, name: str) -> None:
+        raise NotImplementedError
+
+    def write(self) -> list[Path]:
+        raise NotImplementedError
+
+
+class StackSampler(_Session):
+    """Wall-clock sampler: every `SAMPLE_INTERVAL` it records the stack of every other thread.
+
+    Pipeline workers and worktree lanes show up under their thread names, and a
+    thread blocked on git or a queue shows up in the frame it waits in. Writes
+    `<stem>.cpu.folded` (collapsed stacks for flamegraph.pl or speedscope) and
+    `<stem>.cpu.txt` (top functions by self and total samples). The tables
+    leave out helper threads parked waiting for work; the folded stacks keep them.
+    """
+
+    def __init__(self, out_dir: Path, stem: str, interval: float = SAMPLE_INTERVAL):
+        super().__init__(out_dir, stem)
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gag-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self, name: str) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{Path(code.co_filename).stem}.{getattr(code, 'co_qualname', code.co_name)}"
+        return label
+
+    def write(self) -> list[Path]:
+        folded = self.out_dir / f"{self.stem}.cpu.folded"
+        folded.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()), encoding="utf-8")
+
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        idle = 0
+        for stack, count in self.stacks.items():
+            thread, *frames = stack.split(";")
+            if not frames or (thread != "MainThread" and frames[-1] in IDLE_LEAVES):
+                idle += count
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        ms = self.interval * 1000
+        lines = [
+            self.header(),
+            f"# {self.samples} samples every {ms:g}ms across all threads (wall clock); {idle} idle helper-thread samples left out\n",
+        ]
+        for title, counts in (("self", own), ("total", total)):
+            lines.append(f"\n{'samples':>8} {'~ms':>9}  top {TOP_N} by {title}\n")
+            lines += [f"{count:>8} {count * ms:>9.0f}  {label}\n" for label, count in counts.most_common(TOP_N)]
+        report = self.out_dir / f"{self.stem}.cpu.txt"
+        report.write_text("".join(lines), encoding="utf-8")
+        return [folded, report]
+
+
+class AllocationTracer(_Session):
+    """tracemalloc over each scope: the allocations still alive at its end, by line and by traceback.
+
+    Writes `<stem>.mem.txt`, one section per scope with the traced peak, the
+    top `TOP_N` source lines and the tracebacks of the largest few.
+    """
+
+    def __init__(self, out_dir: Path, stem: str):
+        super().__init__(out_dir, stem)
+        self.sections: list[str] = []
+        self.peak = 0
+
+    def start(self) -> None:
+        import tracemalloc
+
+        tracemalloc.start(MEM_FRAMES)
+
+    def stop(self, name: str) -> None:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.peak = max(self.peak, peak)
+
+        lines = [f"\n## {name} at {time.strftime('%H:%M:%S')}: {_size(current)} retained, peak {_size(peak)}\n\n"]
+        lines.append(f"{'size':>10} {'blocks':>8}  line\n")
+        lines += [f"{_size(stat.size):>10} {stat.count:>8}  {stat.traceback[0]}\n" for stat in snapshot.statistics("lineno")[:TOP_N]]
+        for stat in snapshot.statistics("traceback")[:3]:
+            lines.append(f"\n{_size(stat.size)} in {stat.count} block(s):\n")
+            lines += [f"    {line}\n" for line in stat.traceback.format(most_recent_first=True)]
+        self.sections.append("".join(lines))
+
+    def write(self) -> list[Path]:
+        report = self.out_dir / f"{self.stem}.mem.txt"
+        body = "".join(self.sections)
+        report.write_text(f"{self.header()}# peak traced {_size(self.peak)}\n{body}", encoding="utf-8")
+        return [report]
+
+
+def _size(n: Any) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import AppConfig
+from .metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+# final progress line of pack writing, e.g. "Writing objects: 100% (3/3), 293.23 KiB | 15.43 MiB/s, done."
+WRITTEN = re.compile(r"Writing objects: 100% \(\d+/\d+\), ([\d.]+) (bytes|KiB|MiB|GiB)")
+UNITS = {"bytes": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30}
+# failures another attempt cannot fix: a bad remote, refused credentials or a refused ref
+PERMANENT = (
+    "does not appear to be a git repository",
+    "not found",
+    "authentication failed",
+    "permission denied",
+    "could not read username",
+    "[rejected]",
+    "[remote rejected]",
+    "does not match any",
+)
+
+
+class PushError(RuntimeError):
+    def __init__(self, failed: list[PushResult]):
+        self.failed = failed
+        # the `RunStats` of the run whose final push failed, set by the engine
+        self.stats: Any = None
+        super().__init__("push failed for " + ", ".join(f"{r.remote} ({r.error})" for r in failed))
+
+
+@dataclass
+class PushResult:
+    remote: str
+    ok: bool
+    seconds: float
+    sent: int
+    attempts: int
+    error: str | None = None
+
+
+class RemotePusher:
+    """Pushes one ref to every `push.remotes` entry at once, each in its own `git push`.
+
+    Remotes are independent: a slow or failing mirror does not hold up the
+    others. A failed attempt is retried after an exponential backoff with
+    jitter, up to `push.retries` times. A rejected ref, an unknown remote or
+    refused credentials are not retried, since retrying cannot fix them. Each push is recorded per remote:
+    wall time including retries, and the bytes git reports writing.
+    """
+
+    def __init__(self, cfg: AppConfig, repo: Path, metrics: Callable[[], Metrics]):
+        self.cfg = cfg.push
+        self.repo = repo
+        self.metrics = metrics
+        # jitter only spreads retries out; it must not draw from the seeded streams
+        self._jitter = random.Random()
+
+    def push(self, ref: str) -> list[PushResult]:
+        """Push `ref` to all remotes; raises `PushError` once every remote is done if any failed."""
+        results = asyncio.run(self._push_all(ref))
+        failed = [result for result in results if not result.ok]
+        if failed:
+            raise PushError(failed)
+        return results
+
+    async def _push_all(self, ref: str) -> list[PushResult]:
+        return list(await asyncio.gather(*(self._push_remote(remote, ref) for remote in self.cfg.remotes)))
+
+    async def _push_remote(self, remote: str, ref: str) -> PushResult:
+        started = time.perf_counter()
+        attempts, sent, error = 0, 0, None
+        while True:
+            attempts += 1
+            try:
+                sent = await self._attempt(remote, ref)
+                error = None
+                break
+            except _AttemptFailed as exc:
+                error = str(exc)
+                if not exc.retryable or attempts > self.cfg.retries:
+                    break
+            delay = min(self.cfg.max_backoff, self.cfg.backoff * 2 ** (attempts - 1)) * self._jitter.uniform(0.5, 1.0)
+            log.warning("Push to %s failed (attempt %s/%s), retrying in %.1fs: %s", remote, attempts, self.cfg.retries + 1, delay, error)
+            await asyncio.sleep(delay)
+
+        result = PushResult(remote, error is None, time.perf_counter() - started, sent, attempts, error)
+        self.metrics().observe_push(remote, result.seconds, sent, attempts - 1, result.ok)
+        if result.ok:
+            log.info("Pushed %s to %s: %s byte(s) in %.2fs", ref, remote, sent, result.seconds)
+        else:
+            log.error("Push to %s failed after %s attempt(s): %s", remote, attempts, error)
+        return result
+
+    async def _attempt(self, remote: str, ref: str) -> int:
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            "git", "push", "--progress", "--porcelain", remote, ref,
+            cwd=self.repo, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), self.cfg.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise _AttemptFailed(f"timed out after {self.cfg.timeout}s", retryable=True) from None
+        finally:
+            self.metrics().observe_git("push", time.perf_counter() - started)
+        stdout, stderr = out.decode(errors="replace"), err.decode(errors="replace")
+        if proc.returncode:
+            raise _AttemptFailed(_reason(stdout, stderr, proc.returncode), retryable=transient(stdout + stderr))
+        return written_bytes(stderr)
+
+
+class _AttemptFailed(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _reason(stdout: str, stderr: str, status: int | None) -> str:
+    for line in (*stdout.splitlines(), *stderr.splitlines()):
+        if line.startswith(("!\t", "fatal:", "error:")):
+            return line.strip()
+    return f"exit status {status}"
+
+
+def transient(output: str) -> bool:
+    """Whether a failed push might succeed if tried again, judging by git's output."""
+    output = output.lower()
+    return not any(marker in output for marker in PERMANENT)
+
+
+def written_bytes(progress: str) -> int:
+    """Pack size from `git push --progress` output (0 when nothing was sent); rounded as git prints it."""
+    matches = WRITTEN.findall(progress)
+    if not matches:
+        return 0
+    value, unit = matches[-1]
+    return int(float(value) * UNITS[unit])
@@ -7,11 +7,18 @@ from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from .config import AppConfig
+from .holidays import HolidayCalendar
 
 
 @dataclass
 class CommitWindow:
     when: datetime
+    day: date | None = None
+    index: int = 0
+    status: str = "planned"
+    message: str | None = None
+    sha: str | None = None
+    branch: str | None = None
 
 
 class SchedulingEngine:
@@ -19,32 +26,33 @@ class SchedulingEngine:
         self.cfg = cfg
         self.rng = rng
         self.tz = ZoneInfo(cfg.timezone)
+        self.calendar = HolidayCalendar.from_config(cfg)
 
     def is_vacation_day(self, target: date) -> bool:
-        for item in self.cfg.vacation_ranges:
-            start = datetime.fromisoformat(item["start"]).date()
-            end = datetime.fromisoformat(item["end"]).date()
-            if start <= target <= end:
-                return True
-        return False
-
-    def _sample_count(self) -> int:
+        return target in self.calendar
+
+    def _sample_count(self, rng: random.Random) -> int:
         if self.cfg.gaussian_distribution:
             mean = (self.cfg.daily_min_commits + self.cfg.daily_max_commits) / 2
             sigma = max((self.cfg.daily_max_commits - self.cfg.daily_min_commits) / 4, 1)
-            count = int(round(self.rng.gauss(mean, sigma)))
+            count = int(round(rng.gauss(mean, sigma)))
         else:
-            count = self.rng.randint(self.cfg.daily_min_commits, self.cfg.daily_max_commits)
+            count = rng.randint(self.cfg.daily_min_commits, self.cfg.daily_max_commits)
         return min(max(count, self.cfg.daily_min_commits), self.cfg.max_commits_per_day)
 
-    def planned_commits_for_day(self, target: date) -> int:
+    def plan_day(self, target: date, rng: random.Random | None = None) -> list[CommitWindow]:
+        rng = rng or self.rng
+        return self.build_windows(target, self.planned_commits_for_day(target, rng), rng)
+
+    def planned_commits_for_day(self, target: date, rng: random.Random | None = None) -> int:
+        rng = rng or self.rng
         if self.is_vacation_day(target):
             return 0
 
-        if self.rng.random() < self.cfg.realism.cooldown_day_probability:
+        if rng.random() < self.cfg.realism.cooldown_day_probability:
             return 0
 
-        commits = self._sample_count()
+        commits = self._sample_count(rng)
         weekday = target.weekday()
 
         if weekday >= 5:
@@ -53,23 +61,24 @@ class SchedulingEngine:
         month_factor = self.cfg.seasonal.monthly_multiplier.get(target.month, 1.0)
         commits = int(round(commits * month_factor))
 
-        if weekday == 4 and self.rng.random() < self.cfg.realism.pre_weekend_spike_probability:
-            commits += self.rng.randint(1, 2)
-        if self.rng.random() < self.cfg.realism.streak_burst_probability:
-            commits += self.rng.randint(1, 3)
+        if weekday == 4 and rng.random() < self.cfg.realism.pre_weekend_spike_probability:
+            commits += rng.randint(1, 2)
+        if rng.random() < self.cfg.realism.streak_burst_probability:
+            commits += rng.randint(1, 3)
 
         return max(0, min(commits, self.cfg.max_commits_per_day))
 
-    def build_windows(self, target: date, count: int) -> list[CommitWindow]:
+    def build_windows(self, target: date, count: int, rng: random.Random | None = None) -> list[CommitWindow]:
+        rng = rng or self.rng
         windows: list[CommitWindow] = []
         for _ in range(count):
-            hour = self.rng.randint(self.cfg.working_hours_start, self.cfg.working_hours_end)
-            if self.rng.random() < self.cfg.realism.late_night_probability:
-                hour = self.rng.choice([22, 23, 0, 1])
-            minute = self.rng.randint(0, 59)
-            second = self.rng.randint(0, 59)
+            hour = rng.randint(self.cfg.working_hours_start, self.cfg.working_hours_end)
+            if rng.random() < self.cfg.realism.late_night_probability:
+                hour = rng.choice([22, 23, 0, 1])
+            minute = rng.randint(0, 59)
+            second = rng.randint(0, 59)
             dt = datetime(target.year, target.month, target.day, hour, minute, second)
-            windows.append(CommitWindow(when=dt.replace(tzinfo=self.tz)))
+            windows.append(CommitWindow(when=dt.replace(tzinfo=self.tz), day=target))
 
         windows.sort(key=lambda x: x.when)
 
@@ -78,5 +87,7 @@ class SchedulingEngine:
             if windows[idx].when <= windows[idx - 1].when:
                 windows[idx].when = windows[idx - 1].when + timedelta(minutes=1)
 
+        for idx, window in enumerate(windows):
+            window.index = idx
         return windows
 
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable
+
+from .scheduler import CommitWindow
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    planned INTEGER NOT NULL,
+    planned_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS windows (
+    day TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'planned',
+    message TEXT,
+    sha TEXT,
+    branch TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (day, idx)
+);
+CREATE INDEX IF NOT EXISTS windows_status ON windows (status, day);
+"""
+
+
+class PlanStore:
+    """SQLite record of planned windows and their progress, so runs resume instead of re-rolling.
+
+    A window moves planned -> committing -> committed -> pushed. A window
+    committed on a work branch records the branch, so a resume can recognise
+    the branch's merge even when a squash left the window's own commit behind.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if "branch" not in {row[1] for row in self.db.execute("PRAGMA table_info(windows)")}:
+            self.db.execute("ALTER TABLE windows ADD COLUMN branch TEXT")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def load_days(self, start: date, end: date) -> dict[date, list[CommitWindow]]:
+        lo, hi = start.isoformat(), end.isoformat()
+        plans: dict[date, list[CommitWindow]] = {
+            date.fromisoformat(day): [] for (day,) in self.db.execute("SELECT day FROM days WHERE day BETWEEN ? AND ?", (lo, hi))
+        }
+        rows = self.db.execute(
+            "SELECT day, idx, at, status, message, sha, branch FROM windows WHERE day BETWEEN ? AND ? ORDER BY day, idx", (lo, hi)
+        )
+        for day, idx, at, status, message, sha, branch in rows:
+            key = date.fromisoformat(day)
+            plans.setdefault(key, []).append(
+                CommitWindow(when=datetime.fromisoformat(at), day=key, index=idx, status=status, message=message, sha=sha, branch=branch)
+            )
+        return plans
+
+    def load_day(self, day: date) -> list[CommitWindow] | None:
+        return self.load_days(day, day).get(day)
+
+    def save_days(self, plans: Iterable[tuple[date, list[CommitWindow]]]) -> None:
+        now = _now()
+        with self.db:
+            for day, windows in plans:
+                self.db.execute("INSERT OR REPLACE INTO days (day, planned, planned_at) VALUES (?, ?, ?)", (day.isoformat(), len(windows), now))
+                self.db.execute("DELETE FROM windows WHERE day = ?", (day.isoformat(),))
+                self.db.executemany(
+                    "INSERT INTO windows (day, idx, at, status, updated_at) VALUES (?, ?, ?, 'planned', ?)",
+                    [(day.isoformat(), w.index, w.when.isoformat(), now) for w in windows],
+                )
+
+    def mark(
+        self, slot: CommitWindow, status: str, message: str | None = None, sha: str | None = None, branch: str | None = None
+    ) -> None:
+        slot.status = status
+        slot.message = message if message is not None else slot.message
+        slot.sha = sha if sha is not None else slot.sha
+        slot.branch = branch if branch is not None else slot.branch
+        with self.db:
+            self.db.execute(
+                "UPDATE windows SET status = ?, message = ?, sha = ?, branch = ?, updated_at = ? WHERE day = ? AND idx = ?",
+                (status, slot.message, slot.sha, slot.branch, _now(), _day(slot).isoformat(), slot.index),
+            )
+
+    def mark_pushed(self) -> int:
+        with self.db:
+            cur = self.db.execute("UPDATE windows SET status = 'pushed', updated_at = ? WHERE status = 'committed'", (_now(),))
+        return cur.rowcount
+
+    def status_counts(self, start: date, end: date) -> dict[str, int]:
+        rows = self.db.execute(
+            "SELECT status, COUNT(*) FROM windows WHERE day BETWEEN ? AND ? GROUP BY status", (start.isoformat(), end.isoformat())
+        )
+        return dict(rows)
+
+
+def _day(slot: CommitWindow) -> date:
+    return slot.day or slot.when.date()
+
+
+def _now() -> str:
+    return datetime.now().astimezone().isoformat(timespec="seconds")
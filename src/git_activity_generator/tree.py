@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import TreeConfig
+
+TEXT_EXTS = (".py", ".md", ".txt", ".json", ".go", ".c", ".ts")
+BINARY_EXTS = (".bin", ".png", ".dat")
+WORDS = "value result config index buffer client handler request state cache return import self data items count limit offset token error".split()
+
+BlobKey = tuple[str, int, int]  # (kind, size, seed): content is a pure function of the key
+# reused writes pick one of this many shared blobs per kind
+SHARED_BLOBS = 256
+# enough of a blob's start to tell generated blobs of one size apart: the text header holds the seed, binary blobs start random
+HEAD_BYTES = 64
+
+
+@dataclass
+class Edit:
+    """One file-level change; `source` is the old path of a rename."""
+
+    path: Path
+    op: str = "append"  # append | write | rename | delete
+    source: Path | None = None
+    blob: BlobKey | None = None
+
+    @property
+    def paths(self) -> list[Path]:
+        return [self.path] if self.source is None else [self.source, self.path]
+
+
+class BlobCache:
+    """Rendered blob contents by key, LRU-bounded in bytes; shared by worker threads."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[BlobKey, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: BlobKey) -> bytes:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                return data
+        data = render_blob(key)
+        with self._lock:
+            if key not in self._items and len(data) <= self.max_bytes:
+                self._items[key] = data
+                self.size += len(data)
+                while self.size > self.max_bytes:
+                    self.size -= len(self._items.popitem(last=False)[1])
+        return data
+
+
+_text_blocks: list[bytes] = []
+_blocks_lock = threading.Lock()
+
+
+def _blocks() -> list[bytes]:
+    # built once from a fixed seed; locked so concurrent renderers never see a partial pool
+    with _blocks_lock:
+        if not _text_blocks:
+            rng = random.Random(0)
+            pool = []
+            for _ in range(256):
+                lines: list[str] = []
+                size = 0
+                while size < 4096:
+                    indent = "    " * rng.randint(0, 3)
+                    lines.append(indent + " ".join(rng.choices(WORDS, k=rng.randint(2, 9))) + "\n")
+                    size += len(lines[-1])
+                pool.append("".join(lines).encode())
+            _text_blocks.extend(pool)
+    return _text_blocks
+
+
+def render_blob(key: BlobKey) -> bytes:
+    kind, size, seed = key
+    rng = random.Random(seed)
+    if kind == "binary":
+        return rng.randbytes(size)
+    blocks = _blocks()
+    header = f"# generated blob {seed:016x}\n".encode()
+    body = b"".join(rng.choices(blocks, k=size // 4096 + 1))
+    return (header + body)[:size]
+
+
+class TreeGrower:
+    """Grows a deep synthetic tree under `tree.root`: creates, rewrites, renames and deletes files.
+
+    Planning runs in commit order and only touches this in-memory file list, so
+    edits can be planned ahead of the writer. The list is kept sorted, so a
+    seeded draw picks the same file in a fresh process that walked the tree as
+    in one that grew it. Contents come from `BlobCache`; a fraction of writes
+    reuse one of `SHARED_BLOBS` keys derived from a fixed seed, which git
+    stores only once. A rewrite never draws the contents its file already
+    holds, since that commit would be empty.
+    """
+
+    def __init__(self, cfg: TreeConfig, repo: Path):
+        self.cfg = cfg
+        self.root = repo / cfg.root
+        self.blobs = BlobCache(cfg.cache_mb << 20)
+        self._files: list[str] | None = None
+        # the key each file was last written with; files this process has not written are read from disk
+        self._keys: dict[str, BlobKey] = {}
+        self._seen: dict[str, tuple[int, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ensure())
+
+    def plan(self, rng: random.Random) -> Edit:
+        files = self._ensure()
+        cfg = self.cfg
+        roll = rng.random()
+        if files and roll < cfg.delete_probability:
+            rel = rng.choice(files)
+            self._discard(rel)
+            self._keys.pop(rel, None)
+            self._seen.pop(rel, None)
+            return Edit(self.root / rel, "delete")
+        if files and roll < cfg.delete_probability + cfg.rename_probability:
+            rel = rng.choice(files)
+            new = self._new_path(rng, Path(rel).suffix)
+            if rel in self._keys:
+                self._keys[new] = self._keys.pop(rel)
+            else:
+                self._seen[new] = self._on_disk(rel)
+                del self._seen[rel]
+            self._discard(rel)
+            self._add(new)
+            return Edit(self.root / new, "rename", source=self.root / rel)
+        if not files or (len(files) < cfg.target_files and rng.random() < 0.7):
+            binary = rng.random() < cfg.binary_probability
+            new = self._new_path(rng, rng.choice(BINARY_EXTS if binary else TEXT_EXTS))
+            self._add(new)
+            key = self._keys[new] = self._blob_key(rng, binary)
+            return Edit(self.root / new, "write", blob=key)
+        rel = rng.choice(files)
+        binary = rel.endswith(BINARY_EXTS)
+        key = self._blob_key(rng, binary)
+        while self._holds(rel, key):
+            key = self._blob_key(rng, binary)
+        self._keys[rel] = key
+        self._seen.pop(rel, None)
+        return Edit(self.root / rel, "write", blob=key)
+
+    def render(self, edit: Edit) -> bytes:
+        return self.blobs.get(edit.blob) if edit.blob is not None else b""
+
+    def apply(self, edit: Edit, data: bytes) -> None:
+        if edit.op == "write":
+            edit.path.parent.mkdir(parents=True, exist_ok=True)
+            edit.path.write_bytes(data)
+        elif edit.op == "rename" and edit.source is not None:
+            edit.path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(edit.source, edit.path)
+            self._prune(edit.source.parent)
+        elif edit.op == "delete":
+            edit.path.unlink(missing_ok=True)
+            self._prune(edit.path.parent)
+
+    def _blob_key(self, rng: random.Random, binary: bool) -> BlobKey:
+        kind = "binary" if binary else "text"
+        if rng.random() < self.cfg.reuse_probability:
+            # from the commit's own stream, not from earlier commits, so a resumed run reuses the same blobs
+            shared = random.Random(f"gag-shared-blob:{kind}:{rng.randrange(SHARED_BLOBS)}")
+            return (kind, self._size(shared), shared.getrandbits(63))
+        return (kind, self._size(rng), rng.getrandbits(63))
+
+    def _holds(self, rel: str, key: BlobKey) -> bool:
+        """Whether `rel` already holds the contents of `key`; short text blobs of different keys can match."""
+        if rel in self._keys:
+            current = self._keys[rel]
+            if current == key:
+                return True
+            if current[1] != key[1]:
+                return False
+            head = self.blobs.get(current)[:HEAD_BYTES]
+        else:
+            size, head = self._on_disk(rel)
+            if size != key[1]:
+                return False
+        return self.blobs.get(key)[:HEAD_BYTES] == head
+
+    def _on_disk(self, rel: str) -> tuple[int, bytes]:
+        # only for files this process has not written yet, so the writer cannot have changed them
+        seen = self._seen.get(rel)
+        if seen is None:
+            path = self.root / rel
+            try:
+                with path.open("rb") as fh:
+                    seen = (os.fstat(fh.fileno()).st_size, fh.read(HEAD_BYTES))
+            except OSError:
+                seen = (-1, b"")
+            self._seen[rel] = seen
+        return seen
+
+    def _size(self, rng: random.Random) -> int:
+        size = int(rng.lognormvariate(math.log(self.cfg.median_size), self.cfg.size_sigma))
+        return max(16, min(size, self.cfg.max_size))
+
+    def _new_path(self, rng: random.Random, ext: str) -> str:
+        while True:
+            depth = rng.randint(1, self.cfg.max_depth)
+            dirs = [f"d{rng.randrange(self.cfg.fanout)}" for _ in range(depth)]
+            rel = "/".join([*dirs, f"f{rng.getrandbits(32):08x}{ext}"])
+            if not self._has(rel):
+                return rel
+
+    def _ensure(self) -> list[str]:
+        if self._files is None:
+            self._files = []
+            for dirpath, _, names in os.walk(self.root):
+                base = Path(dirpath).relative_to(self.root).as_posix()
+                self._files.extend(name if base == "." else f"{base}/{name}" for name in names)
+            self._files.sort()
+        return self._files
+
+    def _has(self, rel: str) -> bool:
+        files = self._ensure()
+        idx = bisect.bisect_left(files, rel)
+        return idx < len(files) and files[idx] == rel
+
+    def _add(self, rel: str) -> None:
+        bisect.insort(self._ensure(), rel)
+
+    def _discard(self, rel: str) -> None:
+        files = self._ensure()
+        del files[bisect.bisect_left(files, rel)]
+
+    def _prune(self, directory: Path) -> None:
+        # git does not track empty directories; drop them so renames do not leave husks
+        while directory != self.root and directory.is_relative_to(self.root):
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
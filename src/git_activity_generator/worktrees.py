@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import random
+from contextvars import copy_context
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
+
+from .backends import BatchCheck, CommitBackend, commit_env
+from .config import AppConfig, AuthorProfile
+from .metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+Runner = Callable[..., str]
+T = TypeVar("T")
+
+
+@dataclass
+class Route:
+    """Where one commit lands: the default branch (`branch` None) or the branch held by `lane`."""
+
+    branch: str | None = None
+    lane: int = -1
+    opens: bool = False
+    closes: bool = False
+    squash: bool = False
+    when: datetime | None = None
+
+
+@dataclass
+class _OpenBranch:
+    name: str
+    remaining: int
+    squash: bool
+    last: datetime
+
+
+class BranchRouter:
+    """Spreads commits, in window order, over the default branch and up to `lanes` open branches.
+
+    Every decision comes from the commit's own RNG, so the same windows always
+    give the same branches, whichever lane happens to finish first.
+    """
+
+    def __init__(self, cfg: AppConfig, lanes: int):
+        self.cfg = cfg
+        self.lanes = lanes
+        self.open: dict[int, _OpenBranch] = {}
+        self.latest: datetime | None = None
+
+    def route(self, when: datetime, rng: random.Random) -> Route:
+        branching = self.cfg.branching
+        self.latest = when
+        roll = rng.random()
+        if not branching.enabled or roll >= branching.hotfix_branch_probability + branching.feature_branch_probability:
+            return Route()
+
+        free = [lane for lane in range(self.lanes) if lane not in self.open]
+        # a new branch is likelier the more lanes are idle; otherwise an open one grows
+        opens = bool(free) and rng.random() < len(free) / self.lanes
+        if opens:
+            lane = free[0]
+            hotfix = roll < branching.hotfix_branch_probability
+            stamp = when.astimezone(timezone.utc).strftime("%Y%m%d-%H%M%S")
+            self.open[lane] = _OpenBranch(
+                name=f"{'hotfix' if hotfix else 'feature'}/auto-{stamp}",
+                remaining=1 if hotfix else rng.randint(1, max(1, self.cfg.worktrees.max_branch_commits)),
+                squash=rng.random() < branching.squash_merge_probability,
+                last=when,
+            )
+        else:
+            lane = rng.choice(sorted(self.open))
+
+        branch = self.open[lane]
+        branch.remaining -= 1
+        branch.last = when
+        closes = branch.remaining <= 0
+        if closes:
+            del self.open[lane]
+        return Route(branch.name, lane, opens=opens, closes=closes, squash=branch.squash, when=when)
+
+    def drain(self) -> list[Route]:
+        """Close the branches still open at the end of a run, in lane order, as of its last commit."""
+        routes = [Route(b.name, lane, closes=True, squash=b.squash, when=self.latest or b.last) for lane, b in sorted(self.open.items())]
+        self.open.clear()
+        return routes
+
+
+class WorktreePool:
+    """One linked worktree per lane under `worktrees.root`, each driven by its own thread.
+
+    Jobs submitted to a lane run in submission order on that lane's thread, so a
+    branch's commits never race each other; different lanes commit side by side.
+    Commits to the default branch and all merges go through the `main` thread,
+    in the main checkout, so they land in the order they were submitted.
+    """
+
+    def __init__(self, cfg: AppConfig, run: Runner, objects: BatchCheck, backend: CommitBackend, metrics: Callable[[], Metrics]):
+        if cfg.commit_backend != "subprocess":
+            raise ValueError("worktrees.enabled needs commit_backend: subprocess; fast-import never checks branches out")
+        if cfg.tree.enabled:
+            raise ValueError("worktrees.enabled does not support tree.enabled; renames and deletes would conflict across branches")
+        if cfg.worktrees.branches < 1:
+            raise ValueError("worktrees.branches must be at least 1")
+        self.cfg = cfg
+        self.run = run
+        self.objects = objects
+        self.backend = backend
+        self.metrics = metrics
+        self.repo = Path(cfg.repo_path)
+        # inside .git by default, so `git add -A` in the main checkout never sees the lanes
+        self.root = self.repo / (cfg.worktrees.root or ".git/activity-sim-worktrees")
+        self.paths = [self.root / f"lane-{idx}" for idx in range(cfg.worktrees.branches)]
+        self.main: ThreadPoolExecutor | None = None
+        self.lanes: list[ThreadPoolExecutor] = []
+        self._checkouts: list[Future[None] | None] = [None] * len(self.paths)
+        self._merged: list[str] = []
+        self._unmerged: set[str] = set()
+        self._failed: BaseException | None = None
+
+    def start(self) -> None:
+        if self.main is not None:
+            return
+        default = self.cfg.default_branch
+        if self.objects.resolve(f"refs/heads/{default}^{{commit}}") is None:
+            raise RuntimeError(f"worktrees need an existing {default!r} branch to branch from")
+        if self.backend.current_branch() != default:
+            self.run("checkout", "-q", default)
+            self.backend.invalidate()
+        self.run("worktree", "prune")
+        for path in self.paths:
+            if not (path / ".git").exists():
+                self.run("worktree", "add", "-q", "--detach", "--force", str(path), default)
+            else:
+                # an interrupted run may have left a branch checked out here, or half-made edits
+                self.run("checkout", "-q", "-f", "--detach", cwd=path)
+        self._failed = None
+        log.debug("%s worktree lane(s) ready under %s", len(self.paths), self.root)
+        self.main = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gag-main")
+        self.lanes = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"gag-lane-{idx}") for idx in range(len(self.paths))]
+
+    @property
+    def running(self) -> bool:
+        return self.main is not None
+
+    def stop(self) -> None:
+        for executor in [self.main, *self.lanes]:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self.main, self.lanes = None, []
+        self._checkouts = [None] * len(self.paths)
+        if self._unmerged:
+            # an aborted run: drop its unmerged branches, so resume re-commits their windows
+            log.warning("Dropping %s unmerged branch(es) of the aborted run", len(self._unmerged))
+            for path in self.paths:
+                self.run("checkout", "-q", "-f", "--detach", cwd=path)
+            self.run("update-ref", "--stdin", input="".join(f"delete refs/heads/{branch}\n" for branch in sorted(self._unmerged)))
+            self._unmerged.clear()
+        self.flush()
+
+    def local(self, lane: int, path: Path) -> Path:
+        """`path` in the main checkout, as seen from `lane`'s worktree."""
+        return self.paths[lane] / path.relative_to(self.repo)
+
+    def on_main(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        assert self.main is not None, "WorktreePool.start() first"
+        return self.main.submit(copy_context().run, self._job, None, fn, args)
+
+    def on_lane(self, lane: int, fn: Callable[..., T], *args: Any) -> Future[T]:
+        # bound now, not when the job runs: by then a later branch may be queued on the lane
+        return self.lanes[lane].submit(copy_context().run, self._job, self._checkouts[lane], fn, args)
+
+    def open_branch(self, lane: int, branch: str) -> None:
+        """Check `branch` out on `lane` at the default branch tip, as of everything already sent to `main`."""
+        self._unmerged.add(branch)
+        base = self.on_main(self.tip)
+        self._checkouts[lane] = self.lanes[lane].submit(copy_context().run, self._job, None, self._checkout, (lane, branch, base))
+
+    def close_branch(self, route: Route) -> Future[None]:
+        """Merge `route.branch` into the default branch once its lane has committed everything queued for it."""
+        released = self.on_lane(route.lane, self._detach, route.lane)
+        return self.on_main(self._merge, route, released)
+
+    def tip(self) -> str:
+        tip = self.objects.resolve(f"refs/heads/{self.cfg.default_branch}^{{commit}}")
+        assert tip is not None
+        return tip
+
+    def commit(self, lane: int, branch: str, message: str, when: datetime, author: AuthorProfile | None, paths: Iterable[Path]) -> str | None:
+        cwd = self.paths[lane]
+        self.run("add", "--", *(str(path) for path in paths), cwd=cwd)
+        self.run("commit", "-q", "-m", message, env=commit_env(when, author), cwd=cwd)
+        return self.objects.resolve(f"refs/heads/{branch}")
+
+    def flush(self) -> None:
+        """Delete merged branches in one ref transaction."""
+        merged, self._merged = self._merged, []
+        if merged:
+            self.run("update-ref", "--stdin", input="".join(f"delete refs/heads/{branch}\n" for branch in merged))
+
+    def _job(self, checkout: Future[None] | None, fn: Callable[..., T], args: tuple[Any, ...]) -> T:
+        # after one failure nothing queued behind it runs, so an aborted run strands as little as possible
+        if self._failed is not None:
+            raise RuntimeError("skipped: an earlier worktree job failed") from self._failed
+        try:
+            if checkout is not None:
+                checkout.result()
+            return fn(*args)
+        except BaseException as exc:
+            self._failed = self._failed or exc
+            raise
+
+    def _checkout(self, lane: int, branch: str, base: Future[str]) -> None:
+        tip = base.result()
+        with self.metrics().phase("branch"):
+            self.run("checkout", "-q", "-f", "-B", branch, tip, cwd=self.paths[lane])
+
+    def _detach(self, lane: int) -> None:
+        # a branch checked out in a worktree cannot be deleted once merged
+        with self.metrics().phase("branch"):
+            self.run("checkout", "-q", "--detach", cwd=self.paths[lane])
+
+    def _merge(self, route: Route, released: Future[None]) -> None:
+        released.result()
+        assert route.branch is not None and route.when is not None
+        env = commit_env(route.when)
+        with self.metrics().phase("merge"):
+            # appends from branches that overlapped in time may touch the same lines; the branch wins
+            if route.squash:
+                self.run("merge", "-q", "--squash", "-X", "theirs", route.branch)
+                self.run("commit", "-q", "-m", f"chore(merge): squash merge {route.branch}", env=env)
+            else:
+                self.run("merge", "-q", "--no-ff", "-X", "theirs", route.branch, "-m", f"chore(merge): merge {route.branch}", env=env)
+        self._merged.append(route.branch)
+        self._unmerged.discard(route.branch)
+
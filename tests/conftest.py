@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+# the repo and config factories are shared with the benchmarks
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import common  # noqa: E402
+from common import git  # noqa: E402
+from git_activity_generator.config import AppConfig, BranchingConfig  # noqa: E402
+
+
+def history(repo: Path, ref: str = "main") -> list[str]:
+    """Commit SHAs, trees and subjects on `ref`, newest first."""
+    return git(repo, "log", "--format=%H %T %s", ref).splitlines()
+
+
+@pytest.fixture(autouse=True)
+def _isolated(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # no global git config or cached state from the machine running the tests
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setenv("GAG_CONFIG_CACHE", "off")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("GAG_PROFILE", raising=False)
+
+
+@pytest.fixture
+def make_repo(tmp_path: Path) -> Callable[..., Path]:
+    """A committed repo with `files` tracked files and, unless `with_origin` is false, a bare `origin`."""
+
+    def make(name: str = "repo", files: int = 20, with_origin: bool = True) -> Path:
+        return common.make_repo(tmp_path, files=files, with_origin=with_origin, name=name)
+
+    return make
+
+
+@pytest.fixture
+def make_config() -> Callable[..., AppConfig]:
+    def make(repo: Path, **overrides: Any) -> AppConfig:
+        defaults: dict[str, Any] = {
+            "dry_run": False,
+            "daily_min_commits": 8,
+            "daily_max_commits": 12,
+            "max_commits_per_day": 12,
+            "branching": BranchingConfig(feature_branch_probability=0.3, hotfix_branch_probability=0.05),
+        }
+        return common.make_config(repo, **{**defaults, **overrides})
+
+    return make
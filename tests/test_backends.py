@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+import subprocess
+from datetime import date
+
+import pytest
+
+from conftest import git, history
+
+from git_activity_generator.backends import BatchCheck
+from git_activity_generator.config import BranchingConfig, TreeConfig
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.git_ops import GitService
+
+START, END = date(2025, 1, 1), date(2025, 1, 6)
+
+MODES = {
+    "append": {},
+    "tree": {"tree": TreeConfig(enabled=True, target_files=40, rename_probability=0.1, delete_probability=0.05)},
+    "squash": {"branching": BranchingConfig(feature_branch_probability=0.5, squash_merge_probability=1.0)},
+}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_fast_import_writes_the_same_commits_as_subprocess(make_repo, make_config, mode):
+    repos = {}
+    for backend in ("subprocess", "fast-import"):
+        repos[backend] = make_repo(backend)
+        ActivityEngine(make_config(repos[backend], commit_backend=backend, **MODES[mode])).backfill(START, END, progress_every=0)
+
+    # same SHAs: same trees, parents, authors, dates and messages, merges included
+    commits = history(repos["fast-import"])
+    assert commits == history(repos["subprocess"])
+    assert any(" chore(merge): " in line for line in commits)
+    for repo in repos.values():
+        git(repo, "fsck", "--strict", "--no-progress")
+        assert git(repo, "status", "--porcelain") == ""
+        assert git(repo, "branch", "--list", "feature/*", "hotfix/*") == ""
+
+
+def test_batch_check_resolves_like_rev_parse_through_one_process(make_repo):
+    repo = make_repo(with_origin=False)
+    objects = BatchCheck(repo)
+    try:
+        assert objects.resolve_many(["HEAD", "main^{tree}", "no-such-ref"]) == [
+            git(repo, "rev-parse", "HEAD"),
+            git(repo, "rev-parse", "main^{tree}"),
+            None,
+        ]
+        proc = objects.proc
+        # a commit made by another git process is seen by the running helper
+        git(repo, "commit", "-q", "--allow-empty", "-m", "later")
+        assert objects.resolve("refs/heads/main") == git(repo, "rev-parse", "HEAD")
+        assert objects.proc is proc
+    finally:
+        objects.close()
+    assert objects.proc is None and proc.returncode == 0
+
+
+def test_branch_is_cached_until_a_git_command_fails(make_repo, make_config):
+    repo = make_repo(with_origin=False)
+    service = GitService(make_config(repo), random.Random(0))
+
+    def lookups() -> int:
+        return service.metrics.git_calls["rev-parse"].count
+
+    assert service._current_branch() == "main"
+    assert service._current_branch() == "main"
+    assert lookups() == 1
+
+    # a branch switch behind the service's back stays invisible until a failure drops the cache
+    git(repo, "checkout", "-q", "-b", "elsewhere")
+    assert service._current_branch() == "main"
+    with pytest.raises(subprocess.CalledProcessError):
+        service._run("checkout", "-q", "no-such-branch")
+    assert service._current_branch() == "elsewhere"
+    assert lookups() == 2
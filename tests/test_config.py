@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from git_activity_generator import config
+from git_activity_generator.config import load_config
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    path = tmp_path / "config-cache"
+    monkeypatch.setenv("GAG_CONFIG_CACHE", str(path))
+    return path
+
+
+def write(path, seed):
+    path.write_text(f"repo_path: /srv/repo\ndeterministic_seed: {seed}\nseasonal:\n  monthly_multiplier:\n    12: 0.5\n", encoding="utf-8")
+
+
+def test_cache_holds_the_parsed_file_as_json(cache_dir, tmp_path, monkeypatch):
+    source = tmp_path / "config.yaml"
+    write(source, 1111)
+    first = load_config(source)
+
+    (entry,) = cache_dir.iterdir()
+    assert entry.suffix == ".json"
+    assert json.loads(entry.read_text(encoding="utf-8"))["raw"]["deterministic_seed"] == 1111
+
+    monkeypatch.setattr(config, "_load_raw", lambda path: pytest.fail("parsed a cached config"))
+    assert load_config(source) == first
+    assert first.seasonal.monthly_multiplier == {12: 0.5}
+
+
+def test_cache_sees_an_edit_within_the_same_mtime_tick(cache_dir, tmp_path):
+    source = tmp_path / "config.yaml"
+    write(source, 1111)
+    stat = source.stat()
+    assert load_config(source).deterministic_seed == 1111
+
+    # same size, and the clock did not tick between the two writes
+    write(source, 2222)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert load_config(source).deterministic_seed == 2222
+
+
+def test_damaged_cache_entry_is_ignored(cache_dir, tmp_path):
+    source = tmp_path / "config.yaml"
+    write(source, 1111)
+    load_config(source)
+    (entry,) = cache_dir.iterdir()
+    entry.write_text("{not json", encoding="utf-8")
+    assert load_config(source).deterministic_seed == 1111
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from conftest import git
+
+from git_activity_generator.config import PushConfig
+from git_activity_generator.daemon import ActivityDaemon
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.pushing import RemotePusher, _AttemptFailed
+
+FIRST = date(2025, 1, 6)
+
+
+def test_daemon_keeps_running_after_a_failed_push(make_repo, make_config, monkeypatch):
+    repo = make_repo()
+    engine = ActivityEngine(make_config(repo, push=PushConfig(backoff=0)))
+    daemon = ActivityDaemon(engine)
+    # replay "today" and the days after it as FIRST onwards, so every window is already due
+    shift = datetime.now(engine.tz).date() - FIRST
+    real_plan, real_midnight, planned = engine.plan_day, daemon._midnight, []
+
+    def plan_day(day):
+        planned.append(day - shift)
+        if len(planned) == 3:
+            daemon.stop()
+            return []
+        return real_plan(day - shift)
+
+    monkeypatch.setattr(engine, "plan_day", plan_day)
+    monkeypatch.setattr(daemon, "_midnight", lambda day: real_midnight(day - shift))
+
+    real_attempt, calls = RemotePusher._attempt, []
+
+    async def attempt(self, remote, ref):
+        calls.append(remote)
+        if len(calls) == 1:
+            raise _AttemptFailed("fatal: Authentication failed", retryable=False)
+        return await real_attempt(self, remote, ref)
+
+    monkeypatch.setattr(RemotePusher, "_attempt", attempt)
+    daemon.run(install_signals=False)
+
+    # the first day's push failed, the second day was still committed and its push sent both days
+    assert planned == [FIRST, date(2025, 1, 7), date(2025, 1, 8)]
+    assert calls == ["origin", "origin"]
+    days = set(git(repo, "log", "--format=%ad", "--date=short", "--no-merges", "main").splitlines())
+    assert {"2025-01-06", "2025-01-07"} <= days
+    assert git(repo, "rev-parse", "main") == git(repo, "rev-parse", "origin/main")
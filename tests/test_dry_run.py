@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+
+from conftest import git
+
+from git_activity_generator import cli
+from git_activity_generator.config import FileSimConfig, MessageConfig, TreeConfig
+from git_activity_generator.engine import ActivityEngine
+
+
+def snapshot(repo):
+    return sorted((str(path.relative_to(repo)), path.stat().st_mtime_ns) for path in repo.rglob("*"))
+
+
+def test_dry_run_reads_the_repo_but_never_writes_to_it(make_repo, make_config, tmp_path):
+    repo = make_repo()
+    before = snapshot(repo)
+    cfg = make_config(
+        repo,
+        dry_run=True,
+        plan_store=str(tmp_path / "plan.sqlite"),
+        files=FileSimConfig(index_cache=True),
+        messages=MessageConfig(unique_subjects=True, unique_capacity=1000),
+        tree=TreeConfig(enabled=True, target_files=40),
+    )
+    engine = ActivityEngine(cfg)
+    stats = engine.backfill(date(2025, 1, 1), date(2025, 1, 3), progress_every=0)
+
+    assert stats.commits_created > 0
+    # the tracked files were read into the edit-candidate index
+    assert len(engine.files.index) >= 20
+    assert snapshot(repo) == before
+    assert git(repo, "status", "--porcelain", "--ignored") == ""
+
+
+def test_dry_run_without_a_repo(make_config, tmp_path):
+    repo = tmp_path / "missing"
+    stats = ActivityEngine(make_config(repo, dry_run=True)).backfill(date(2025, 1, 1), date(2025, 1, 3), progress_every=0)
+    assert stats.commits_created > 0
+    assert not repo.exists()
+
+
+def test_preview_counts_what_a_dry_run_backfill_models(make_config, tmp_path):
+    cfg = make_config(tmp_path / "missing", dry_run=True)
+    start, end = date(2025, 1, 1), date(2025, 3, 31)
+    previewed = ActivityEngine(cfg)
+    stats = previewed.preview(start, end)
+    backfilled = ActivityEngine(cfg)
+    backfilled.backfill(start, end, progress_every=0)
+
+    summary = previewed.git.backend.summary()
+    assert summary == backfilled.git.backend.summary()
+    assert stats.commits_created == summary["commits"] > 0 and summary["merges"] and summary["squash_merges"]
+
+
+def test_preview_prints_only_the_summary(make_config, tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps(asdict(make_config(tmp_path / "missing"))), encoding="utf-8")
+    src = Path(cli.__file__).resolve().parents[1]
+    out = subprocess.run(
+        [sys.executable, "-m", "git_activity_generator.cli", "--config", str(config), "preview", "--from", "2025-01-01", "--to", "2025-01-31"],
+        env={**os.environ, "PYTHONPATH": str(src)},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert json.loads(out.stdout)["commits"] > 0
+    assert out.stderr == ""
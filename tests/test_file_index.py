@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import random
+
+from git_activity_generator.file_index import CandidateIndex
+
+
+def tree(root):
+    for rel in ("a/one.py", "a/notes.txt", "b/c/two.md", "b/three.py", ".git/objects/skip.py", "top.py"):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding="utf-8")
+
+
+def listed(monkeypatch):
+    real, dirs = CandidateIndex._list_dir, []
+
+    def list_dir(self, full):
+        dirs.append(full.relative_to(self.root).as_posix())
+        return real(self, full)
+
+    monkeypatch.setattr(CandidateIndex, "_list_dir", list_dir)
+    return dirs
+
+
+def test_index_lists_candidates_outside_git_sorted(tmp_path):
+    tree(tmp_path)
+    index = CandidateIndex(tmp_path)
+    assert index._paths == [] and len(index) == 4
+    assert index._paths == ["a/one.py", "b/c/two.md", "b/three.py", "top.py"]
+
+
+def test_cache_relists_only_changed_directories(tmp_path, monkeypatch):
+    tree(tmp_path)
+    cache = tmp_path / ".git" / "index.json"
+    first = CandidateIndex(tmp_path, cache_path=cache)
+    assert len(first) == 4
+    first.save()
+
+    dirs = listed(monkeypatch)
+    assert len(CandidateIndex(tmp_path, cache_path=cache)) == 4
+    assert dirs == []
+
+    (tmp_path / "b" / "c" / "four.py").write_text("", encoding="utf-8")
+    stat = (tmp_path / "b" / "c").stat()
+    # a coarse filesystem clock could leave the directory's mtime as it was
+    os.utime(tmp_path / "b" / "c", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    index = CandidateIndex(tmp_path, cache_path=cache)
+    assert len(index) == 5 and "b/c/four.py" in index._paths
+    assert dirs == ["b/c"]
+
+
+def test_unusable_cache_is_rebuilt(tmp_path, monkeypatch):
+    tree(tmp_path)
+    cache = tmp_path / ".git" / "index.json"
+    index = CandidateIndex(tmp_path, cache_path=cache)
+    assert len(index) == 4
+    index.save()
+
+    dirs = listed(monkeypatch)
+    # other suffixes than the cached listing was made for
+    assert len(CandidateIndex(tmp_path, suffixes=(".txt",), cache_path=cache)) == 1
+    assert len(dirs) == 4
+    cache.write_text("{broken", encoding="utf-8")
+    assert len(CandidateIndex(tmp_path, cache_path=cache)) == 4
+    assert len(dirs) == 8
+
+
+def test_choice_skips_files_deleted_since_the_walk(tmp_path):
+    tree(tmp_path)
+    index = CandidateIndex(tmp_path)
+    assert len(index) == 4
+    for rel in ("a/one.py", "b/c/two.md", "b/three.py"):
+        (tmp_path / rel).unlink()
+    rng = random.Random(1)
+    assert {index.choice(rng) for _ in range(5)} == {tmp_path / "top.py"}
+    assert len(index) == 1
+    # an edit planned but not yet written counts as present
+    pending = tmp_path / "a" / "one.py"
+    index.add(pending)
+    assert {index.choice(rng, pending={pending}) for _ in range(20)} == {pending, tmp_path / "top.py"}
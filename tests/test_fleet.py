@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+
+from conftest import git
+
+from git_activity_generator.fleet import discover_configs, run_fleet
+
+
+def test_fleet_reports_each_repo_and_isolates_a_bad_config(make_repo, make_config, tmp_path):
+    configs = tmp_path / "fleet"
+    configs.mkdir()
+    good = make_repo("good")
+    (configs / "a-good.json").write_text(json.dumps(asdict(make_config(good))), encoding="utf-8")
+    bad = asdict(make_config(make_repo("bad"), timezone="Mars/Olympus_Mons"))
+    (configs / "b-bad.json").write_text(json.dumps(bad), encoding="utf-8")
+    (configs / "notes.txt").write_text("not a config\n", encoding="utf-8")
+
+    paths = discover_configs([configs])
+    assert [p.name for p in paths] == ["a-good.json", "b-bad.json"]
+    summary = run_fleet(paths, workers=2)
+
+    assert (summary["repos"], summary["succeeded"], summary["failed"]) == (2, 1, 1)
+    ok, failed = summary["results"]
+    assert ok["ok"] and ok["repo_path"] == str(good)
+    assert ok["stats"]["created"] == ok["stats"]["planned"] == summary["commits_created"]
+    assert int(git(good, "rev-list", "--count", "--no-merges", "main")) == ok["stats"]["created"] + 1
+    assert not failed["ok"] and failed["error"] == "ValueError: Unknown timezone 'Mars/Olympus_Mons'"
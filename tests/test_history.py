@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from conftest import git
+
+from git_activity_generator import history
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.history import load_history
+
+
+def log_counts(repo):
+    # dates in $TZ, which the tests set to the configured timezone
+    out = git(repo, "log", "--no-merges", "--date=format-local:%Y-%m-%d", "--format=%ad %aN", "main")
+    return Counter(tuple(line.split(" ", 1)) for line in out.splitlines())
+
+
+def index_counts(index):
+    return Counter({(day, author): count for day, authors in index.days.items() for author, count in authors.items()})
+
+
+@pytest.fixture
+def walks(monkeypatch):
+    real, revs = history.stream_log, []
+
+    def stream_log(repo, rev_range, tz):
+        revs.append(rev_range)
+        return real(repo, rev_range, tz)
+
+    monkeypatch.setattr(history, "stream_log", stream_log)
+    return revs
+
+
+def test_history_index_is_extended_incrementally(make_repo, make_config, monkeypatch, walks):
+    monkeypatch.setenv("TZ", "UTC")
+    repo = make_repo()
+    cfg = make_config(repo)
+    engine = ActivityEngine(cfg)
+    engine.backfill(date(2025, 1, 1), date(2025, 1, 3), progress_every=0)
+
+    first_tip = git(repo, "rev-parse", "main")
+    first = load_history(cfg)
+    assert walks == [first_tip]
+    assert index_counts(first) == log_counts(repo)
+
+    # an unchanged tip is served from the cache without reading the log
+    assert index_counts(load_history(cfg)) == index_counts(first) and len(walks) == 1
+
+    engine.backfill(date(2025, 1, 4), date(2025, 1, 6), progress_every=0)
+    tip = git(repo, "rev-parse", "main")
+    second = load_history(cfg)
+    assert walks[-1] == f"{first_tip}..{tip}"
+    assert index_counts(second) == log_counts(repo)
+    assert second.total == int(git(repo, "rev-list", "--count", "--no-merges", "main"))
+    assert second.counts(date(2025, 1, 1), date(2025, 1, 6)) == [
+        sum(c for (day, _), c in log_counts(repo).items() if day == f"2025-01-0{d}") for d in range(1, 7)
+    ]
+
+
+def test_history_index_is_rebuilt_after_a_rewrite(make_repo, make_config, monkeypatch, walks):
+    monkeypatch.setenv("TZ", "UTC")
+    repo = make_repo()
+    cfg = make_config(repo)
+    ActivityEngine(cfg).backfill(date(2025, 1, 1), date(2025, 1, 3), progress_every=0)
+    load_history(cfg)
+
+    git(repo, "reset", "-q", "--hard", "HEAD~3")
+    git(repo, "commit", "-q", "--allow-empty", "-m", "rewritten")
+    rebuilt = load_history(cfg)
+    assert walks[-1] == git(repo, "rev-parse", "main")
+    assert index_counts(rebuilt) == log_counts(repo)
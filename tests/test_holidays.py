@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from git_activity_generator.config import AppConfig
+from git_activity_generator.holidays import HolidayCalendar, load_calendar_file
+from git_activity_generator.planner import plan_range
+
+ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+SUMMARY:New Year
+DTSTART;VALUE=DATE:20250101
+DTEND;VALUE=DATE:20250102
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Offsite, folded
+ over two lines
+DTSTART;VALUE=DATE:20250310
+DTEND;VALUE=DATE:2025
+ 0313
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Timed, over a weekend
+DTSTART;TZID=Europe/Berlin:20250405T090000
+DTEND;TZID=Europe/Berlin:20250407T170000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:No end
+DTSTART;VALUE=DATE:20250501
+END:VEVENT
+END:VCALENDAR
+"""
+
+CSV = """start,end
+# comments and malformed rows are skipped
+2025-12-25
+not-a-date
+2025-12-31T00:00:00
+2025-08-04, 2025-08-15
+"""
+
+
+def days(intervals):
+    return [(date.fromordinal(start), date.fromordinal(end)) for start, end in intervals]
+
+
+def test_load_ics(tmp_path):
+    path = tmp_path / "team.ics"
+    path.write_text(ICS.replace("\n", "\r\n"), encoding="utf-8")
+    assert days(load_calendar_file(path)) == [
+        # an all-day DTEND is exclusive
+        (date(2025, 1, 1), date(2025, 1, 1)),
+        (date(2025, 3, 10), date(2025, 3, 12)),
+        (date(2025, 4, 5), date(2025, 4, 7)),
+        (date(2025, 5, 1), date(2025, 5, 1)),
+    ]
+
+
+def test_load_csv(tmp_path):
+    path = tmp_path / "holidays.csv"
+    path.write_text(CSV, encoding="utf-8")
+    assert days(load_calendar_file(path)) == [
+        (date(2025, 12, 25), date(2025, 12, 25)),
+        (date(2025, 12, 31), date(2025, 12, 31)),
+        (date(2025, 8, 4), date(2025, 8, 15)),
+    ]
+
+
+def test_unknown_calendar_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported holiday calendar"):
+        load_calendar_file(tmp_path / "holidays.txt")
+
+
+def test_calendar_merges_overlapping_and_adjacent_ranges():
+    calendar = HolidayCalendar([(10, 12), (13, 15), (20, 20), (11, 14), (30, 25)])
+    assert (calendar.starts, calendar.ends) == ([10, 20], [15, 20])
+    assert [date.fromordinal(o) in calendar for o in (9, 10, 15, 16, 20, 25)] == [False, True, True, False, True, False]
+
+
+def test_planned_days_skip_calendar_and_vacation_days(tmp_path):
+    ics, csv = tmp_path / "team.ics", tmp_path / "holidays.csv"
+    ics.write_text(ICS, encoding="utf-8")
+    csv.write_text(CSV, encoding="utf-8")
+    cfg = AppConfig(
+        repo_path=str(tmp_path),
+        daily_min_commits=3,
+        holiday_calendars=[str(ics), str(csv)],
+        vacation_ranges=[{"start": "2025-06-02", "end": "2025-06-06"}],
+    )
+    plan = plan_range(cfg, date(2025, 1, 1), date(2025, 12, 31))
+    off = {date(2025, 1, 1), date(2025, 3, 11), date(2025, 5, 1), date(2025, 6, 4), date(2025, 8, 8), date(2025, 12, 25)}
+    assert all(count == 0 for idx, count in enumerate(plan.counts) if plan.day(idx) in off)
+    assert plan.total > 0
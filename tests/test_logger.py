@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+
+import pytest
+
+from git_activity_generator import logger
+from git_activity_generator.config import LogConfig
+from git_activity_generator.logger import AsyncHandler, DebugSampler, bind, flush_logging, log_context, setup_logging, stop_logging
+
+log = logging.getLogger("gag.test")
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """A stream for `setup_logging`, started on a root logger without pytest's capture handlers."""
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "level", root.level)
+    monkeypatch.setattr(logger, "_context", logger.ContextVar("gag_log_context_test", default={}))
+    out = io.StringIO()
+
+    def start(cfg):
+        # setup_logging leaves a root logger with handlers of its own alone
+        monkeypatch.setattr(root, "handlers", [])
+        setup_logging(False, cfg, stream=out)
+        return out
+
+    yield start
+    stop_logging()
+    monkeypatch.setattr(logger, "_installed", None)
+
+
+def record(msg, level=logging.DEBUG, name="gag.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, (), None)
+
+
+def test_json_records_carry_context_and_traceback(stream):
+    out = stream(LogConfig(format="json"))
+    bind(run="r1")
+    with log_context(day="2025-01-06", commit=3):
+        log.info("committed %s", "x.py")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed")
+    log.debug("hidden below INFO")
+    stop_logging()
+
+    first, second = (json.loads(line) for line in out.getvalue().splitlines())
+    assert set(first) == {"ts", "level", "logger", "msg", "run", "day", "commit"}
+    assert (first["level"], first["logger"], first["msg"], first["run"], first["day"], first["commit"]) == (
+        "INFO", "gag.test", "committed x.py", "r1", "2025-01-06", 3,
+    )
+    assert first["ts"].endswith("+00:00")
+    assert second["msg"] == "failed" and "ValueError: boom" in second["exc"]
+
+
+def test_shutdown_drains_the_queue(stream):
+    out = stream(LogConfig(queue_size=5000))
+    for idx in range(2000):
+        log.info("line %s", idx)
+    flush_logging()
+    assert len(out.getvalue().splitlines()) == 2000
+    log.info("after flush")
+    stop_logging()
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2001 and lines[-1].endswith("after flush")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = AsyncHandler(2)
+    for idx in range(5):
+        handler.handle(record(f"r{idx}", logging.INFO))
+    assert (handler.queue.qsize(), handler.dropped) == (2, 3)
+
+
+def test_debug_sampler_limits_each_call_site(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logger.time, "monotonic", lambda: now[0])
+    sampler = DebugSampler(rate=1.0, burst=3)
+
+    assert [sampler.filter(record("site a")) for _ in range(10)] == [True] * 3 + [False] * 7
+    assert sampler.filter(record("site b"))
+    assert sampler.filter(record("site a", logging.INFO))
+
+    now[0] += 2.0
+    passed = record("site a")
+    assert sampler.filter(passed) and passed.suppressed == 7
+    assert sampler.filter(record("site a")) and not sampler.filter(record("site a"))
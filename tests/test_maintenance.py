@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from conftest import git, history
+
+from git_activity_generator.config import MaintenanceConfig, WorktreeConfig, compile_config
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.maintenance import RepoMaintenance
+from git_activity_generator.worktrees import WorktreePool
+
+START, END = date(2025, 1, 1), date(2025, 1, 6)
+# every threshold low enough to fire during a few days of commits
+EAGER = MaintenanceConfig(enabled=True, check_every=7, loose_objects=1, max_packs=2, commit_graph_every=10)
+
+MODES = {
+    "default": {},
+    "fast-import": {"commit_backend": "fast-import"},
+    "worktrees": {"worktrees": WorktreeConfig(enabled=True, branches=2)},
+}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_maintenance_leaves_history_unchanged(make_repo, make_config, monkeypatch, mode):
+    plain = make_repo("plain")
+    ActivityEngine(make_config(plain, **MODES[mode])).backfill(START, END, progress_every=0)
+
+    repo = make_repo("maintained")
+    engine = ActivityEngine(make_config(repo, maintenance=EAGER, **MODES[mode]))
+    real_check, real_job, checks, busy = RepoMaintenance.check, WorktreePool._job, [], []
+
+    def job(self, *args):
+        busy.append(1)
+        try:
+            return real_job(self, *args)
+        finally:
+            busy.pop()
+
+    def check(self):
+        # nothing may be writing to the repo: no open fast-import stream, no lane or merge job in flight
+        checks.append(getattr(engine.git.backend, "proc", None) is None and not busy)
+        real_check(self)
+
+    monkeypatch.setattr(WorktreePool, "_job", job)
+    monkeypatch.setattr(RepoMaintenance, "check", check)
+    stats = engine.backfill(START, END, progress_every=0)
+
+    # at least one check mid-run besides the one before the final push
+    assert len(checks) >= 2 and all(checks)
+    assert "commit-graph" in stats.metrics.git_calls
+    assert history(repo) == history(plain)
+    git(repo, "fsck", "--strict", "--no-progress")
+
+
+def test_max_packs_below_two_is_rejected():
+    with pytest.raises(ValueError, match="max_packs"):
+        compile_config({"repo_path": ".", "maintenance": {"max_packs": 1}})
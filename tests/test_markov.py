@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from conftest import git
+
+from git_activity_generator.markov import MarkovModel, load_or_train, normalize_subject
+
+SUBJECTS = [
+    "feat(api): add retry to the upload client (#12)",
+    "fix: handle empty config in the loader",
+    "docs: explain the upload client retry",
+    "refactor [core]: split the loader into stages",
+    "chore: bump the build image",
+]
+
+
+def test_normalize_subject_drops_prefixes_and_refs():
+    assert normalize_subject("feat(api)!: Add Retry (#12) to [core] #34 client") == "add retry to client"
+
+
+def test_samples_only_follow_trained_transitions():
+    sentences = [normalize_subject(s) for s in SUBJECTS]
+    model = MarkovModel.train(sentences)
+    pairs = {pair for sentence in sentences for pair in zip(["^", *sentence.split()], [*sentence.split(), "$"])}
+    rng = random.Random(3)
+    for _ in range(200):
+        words = model.sample(rng, max_words=50).split()
+        assert words and set(zip(["^", *words], [*words, "$"])) <= pairs
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "subjects.txt"
+    path.write_text("\n".join(SUBJECTS) + "\n", encoding="utf-8")
+    return path
+
+
+def test_model_is_cached_and_reloaded(corpus, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    trained = load_or_train(corpus, cache)
+    (entry,) = cache.iterdir()
+    assert entry.suffix == ".bin"
+
+    monkeypatch.setattr(MarkovModel, "train", classmethod(lambda cls, sentences: pytest.fail("retrained a cached corpus")))
+    loaded = load_or_train(corpus, cache)
+    assert loaded.tokens == trained.tokens
+    assert [loaded.sample(random.Random(seed)) for seed in range(50)] == [trained.sample(random.Random(seed)) for seed in range(50)]
+
+
+def test_changed_corpus_is_retrained(corpus, tmp_path):
+    cache = tmp_path / "cache"
+    load_or_train(corpus, cache)
+    corpus.write_text("perf: cache the markov model\n", encoding="utf-8")
+    assert "markov" in load_or_train(corpus, cache).tokens
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_damaged_cache_is_retrained(corpus, tmp_path):
+    cache = tmp_path / "cache"
+    trained = load_or_train(corpus, cache)
+    (entry,) = cache.iterdir()
+    entry.write_bytes(entry.read_bytes()[:-3])
+    assert MarkovModel.load(entry) is None
+    assert load_or_train(corpus, cache).tokens == trained.tokens
+
+
+def test_repo_corpus_is_keyed_by_head(make_repo, tmp_path):
+    repo = make_repo(with_origin=False)
+    cache = tmp_path / "cache"
+    assert "initial" in load_or_train(repo, cache).tokens
+    git(repo, "commit", "-q", "--allow-empty", "-m", "fix: tighten the widget tolerance")
+    assert "widget" in load_or_train(repo, cache).tokens
+    assert len(list(cache.iterdir())) == 2
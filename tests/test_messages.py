@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+from datetime import date
+
+from conftest import git
+
+from git_activity_generator.bloom import BloomFilter
+from git_activity_generator.config import MessageConfig, PushConfig
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.git_ops import GitService
+from git_activity_generator.messages import MessageGenerator
+
+START, END = date(2025, 1, 1), date(2025, 1, 6)
+UNIQUE = MessageConfig(unique_subjects=True, unique_capacity=10_000)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives(tmp_path):
+    bloom = BloomFilter.for_capacity(5_000, 0.01)
+    added = [f"subject {idx}" for idx in range(5_000)]
+    assert all(bloom.add(item) for item in added[:10])
+    bloom.update(added)
+    assert not bloom.add(added[0])
+    assert all(item in bloom for item in added)
+    false_positives = sum(f"other {idx}" in bloom for idx in range(10_000))
+    assert false_positives < 300
+
+    bloom.save(tmp_path / "subjects.bloom")
+    loaded = BloomFilter.load(tmp_path / "subjects.bloom")
+    assert loaded is not None and (loaded.bits, loaded.hashes, len(loaded)) == (bloom.bits, bloom.hashes, len(bloom))
+    assert all(item in loaded for item in added)
+
+
+def test_bloom_filter_rejects_a_damaged_file(tmp_path):
+    path = tmp_path / "subjects.bloom"
+    BloomFilter.for_capacity(100, 0.01).save(path)
+    path.write_bytes(path.read_bytes()[:-1])
+    assert BloomFilter.load(path) is None
+    assert BloomFilter.load(tmp_path / "missing.bloom") is None
+
+
+def test_generate_batch_is_unique_against_the_filter(make_repo, make_config):
+    cfg = make_config(make_repo(), messages=UNIQUE)
+    messages = MessageGenerator(cfg, random.Random(1))
+    first = messages.generate_batch(500, random.Random(2))
+    second = messages.generate_batch(500, random.Random(2))
+    assert len(set(first + second)) == 1000
+
+
+def test_generate_batch_without_unique_leaves_the_filter_alone(make_repo, make_config):
+    cfg = make_config(make_repo(), messages=UNIQUE)
+    messages = MessageGenerator(cfg, random.Random(1))
+    before = len(messages.seen)
+    drafts = messages.generate_batch(50, random.Random(2), unique=False)
+    assert drafts == messages.generate_batch(50, random.Random(2), unique=False)
+    assert len(messages.seen) == before
+
+
+def test_backfill_subjects_are_unique(make_repo, make_config):
+    repo = make_repo()
+    ActivityEngine(make_config(repo, messages=UNIQUE)).backfill(START, END, progress_every=0)
+    subjects = git(repo, "log", "--format=%s", "--no-merges", "main").splitlines()
+    assert len(subjects) == len(set(subjects)) > 40
+
+
+def test_subject_filter_is_saved_at_each_push_checkpoint(make_repo, make_config, monkeypatch):
+    repo = make_repo()
+    cfg = make_config(repo, messages=UNIQUE, push=PushConfig(every_commits=10))
+    real, on_disk = GitService.commit_all, []
+
+    def snapshot(self, *args, **kwargs):
+        # what a run killed right now would leave behind
+        on_disk.append((BloomFilter.load(repo / ".git" / "activity-sim-subjects.bloom"), git(repo, "rev-parse", "origin/main")))
+        return real(self, *args, **kwargs)
+
+    monkeypatch.setattr(GitService, "commit_all", snapshot)
+    ActivityEngine(cfg).backfill(START, END, progress_every=0)
+
+    checked = 0
+    for saved, pushed in on_disk[11:]:
+        assert saved is not None
+        # merge subjects name their branch and never go through the filter
+        subjects = git(repo, "log", "--format=%s", "--invert-grep", "--grep=^chore(merge): ", pushed).splitlines()
+        assert all(subject in saved for subject in subjects)
+        checked += len(subjects) > 10
+    assert checked
+
+
+def test_messages_survive_a_split_run(make_repo, make_config):
+    single, split = make_repo("single"), make_repo("split")
+    ActivityEngine(make_config(single, messages=UNIQUE)).backfill(START, END, progress_every=0)
+    cfg = make_config(split, messages=UNIQUE)
+    ActivityEngine(cfg).backfill(START, date(2025, 1, 3), progress_every=0)
+    ActivityEngine(replace(cfg)).backfill(date(2025, 1, 4), END, progress_every=0)
+    assert git(split, "log", "--format=%s", "main") == git(single, "log", "--format=%s", "main")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import re
+from datetime import date
+
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.metrics import Metrics, write_prometheus_textfile
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{(?:[a-z_]+="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def parse(text):
+    """(name, labels, value) for each sample; checks every sample follows a TYPE line for its metric."""
+    samples, typed = [], set()
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            typed.add(line.split()[2])
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.group(1), match.group(2) or "", float(match.group(3))
+        assert re.sub(r"_(bucket|sum|count)$", "", name) in typed or name in typed, line
+        samples.append((name, labels, value))
+    return samples
+
+
+def test_textfile_format(tmp_path):
+    metrics = Metrics()
+    for seconds in (0.002, 0.02, 0.2, 45.0):
+        metrics.observe_git("commit", seconds)
+    metrics.observe_phase("push", 0.3)
+    metrics.observe_push("origin", 1.5, sent=2048, retries=1, ok=True)
+    path = tmp_path / "textfile" / "gag.prom"
+    write_prometheus_textfile(path, metrics, {"repo": 'C:\\repos\\"odd"'}, {"run_commits_created": 4})
+
+    text = path.read_text(encoding="utf-8")
+    samples = parse(text)
+    assert ("gag_run_commits_created", '{repo="C:\\\\repos\\\\\\"odd\\""}', 4.0) in samples
+    buckets = [(labels, value) for name, labels, value in samples if name == "gag_git_command_seconds_bucket"]
+    values = [value for _, value in buckets]
+    assert values == sorted(values) and values[-1] == 4
+    assert buckets[-1][0].endswith(',command="commit",le="+Inf"}')
+    assert ("gag_push_bytes_total", '{repo="C:\\\\repos\\\\\\"odd\\"",remote="origin"}', 2048.0) in samples
+    assert any(name == "gag_git_command_seconds_count" and value == 4 for name, _, value in samples)
+
+
+def test_textfile_is_replaced_atomically(tmp_path, monkeypatch):
+    path = tmp_path / "gag.prom"
+    path.write_text("# old\n", encoding="utf-8")
+    real, seen = os.replace, []
+
+    def replace(src, dst):
+        # the collector never sees a partial file: the old one stays until the complete new one is renamed over it
+        seen.append((path.read_text(encoding="utf-8"), parse(open(src, encoding="utf-8").read())))
+        assert os.path.dirname(src) == os.path.dirname(dst)
+        real(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    write_prometheus_textfile(path, Metrics(), {}, {"run_seconds": 1.5})
+    ((before, written),) = seen
+    assert before == "# old\n" and ("gag_run_seconds", "", 1.5) in written
+    assert [p.name for p in tmp_path.iterdir()] == ["gag.prom"]
+
+
+def test_backfill_writes_run_metrics(make_repo, make_config, tmp_path):
+    path = tmp_path / "gag.prom"
+    repo = make_repo()
+    stats = ActivityEngine(make_config(repo, metrics_textfile=str(path))).backfill(date(2025, 1, 6), date(2025, 1, 6), progress_every=0)
+    samples = {(name, labels): value for name, labels, value in parse(path.read_text(encoding="utf-8"))}
+    assert samples[("gag_run_commits_created", f'{{repo="{repo}"}}')] == stats.commits_created > 0
+    assert samples[("gag_phase_seconds_count", f'{{repo="{repo}",phase="commit"}}')] == stats.commits_created
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import asdict
+from datetime import date, datetime
+
+import pytest
+
+from git_activity_generator import cli
+from git_activity_generator.config import load_config
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.planner import plan_range
+
+START, END = date(2025, 1, 1), date(2025, 1, 6)
+
+
+def report(monkeypatch, capsys, config, *args):
+    monkeypatch.setattr(sys, "argv", ["gag", "--config", str(config), "report", *args])
+    assert cli.main() == 0
+    return json.loads(capsys.readouterr().out)
+
+
+@pytest.fixture
+def config_file(make_repo, make_config, tmp_path):
+    def write(**overrides):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(asdict(make_config(make_repo(), **overrides))), encoding="utf-8")
+        return path
+
+    return write
+
+
+def test_plan_range_is_the_engine_plan(make_repo, make_config):
+    # a zone with DST, so some windows fall on days whose UTC offset changes
+    cfg = make_config(make_repo(), daily_min_commits=1, daily_max_commits=6, max_commits_per_day=8, timezone="America/New_York")
+    start, end = date(2024, 1, 1), date(2025, 12, 31)
+    plan = plan_range(cfg, start, end)
+    engine = [(day, [w.when.isoformat() for w in windows]) for day, windows in ActivityEngine(cfg).plan_days(start, end)]
+    assert [(date.fromisoformat(d["date"]), d["windows"]) for d in plan.by_day()] == engine
+
+
+@pytest.mark.parametrize("store", [False, True])
+def test_report_range_shows_what_backfill_commits(monkeypatch, capsys, config_file, tmp_path, store):
+    config = config_file(plan_store=str(tmp_path / "plan.sqlite") if store else None)
+    window = f"{START}..{END}"
+    planned = report(monkeypatch, capsys, config, "--range", window, "--no-history")
+
+    ActivityEngine(load_config(str(config))).backfill(START, END, progress_every=0)
+
+    compared = report(monkeypatch, capsys, config, "--range", window)
+    assert [d["planned"] for d in compared["days"]] == [d["planned"] for d in planned["days"]]
+    assert [d["actual"] for d in compared["days"]] == [d["planned"] for d in planned["days"]]
+    assert compared["actual"] == planned["planned"] > 0
+
+
+def test_report_today_is_the_engine_plan(monkeypatch, capsys, config_file):
+    config = config_file(timezone="Europe/Berlin")
+    engine = ActivityEngine(load_config(str(config)))
+    windows = engine.plan_day(datetime.now(engine.tz).date())
+    today = report(monkeypatch, capsys, config, "--no-history")
+    assert today["windows"] == [w.when.isoformat() for w in windows]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import asdict
+
+import pytest
+
+from git_activity_generator import cli, profiling
+
+
+@pytest.fixture
+def run_profiled(monkeypatch, capsys, make_config, tmp_path):
+    # enable() writes the environment directly; registering the keys first restores them afterwards
+    monkeypatch.setenv(profiling.PROFILE_ENV, "")
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, "")
+    monkeypatch.setattr(profiling, "_sessions", {})
+
+    def run(kind, repo, *args, **overrides):
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps(asdict(make_config(repo, **overrides))), encoding="utf-8")
+        out_dir = tmp_path / "profiles"
+        argv = ["gag", "--profile", kind, "--profile-dir", str(out_dir), "--config", str(config), *args]
+        monkeypatch.setattr(sys, "argv", argv)
+        assert cli.main() == 0
+        capsys.readouterr()
+        return sorted(out_dir.iterdir())
+
+    return run
+
+
+def test_cpu_profile_writes_folded_stacks_and_top_table(run_profiled, make_repo):
+    folded, report = run_profiled("cpu", make_repo(), "backfill", "--from", "2025-01-01", "--to", "2025-01-03")
+    assert folded.name.endswith(".cpu.folded") and report.name.endswith(".cpu.txt")
+    assert folded.name.removesuffix(".cpu.folded") == report.name.removesuffix(".cpu.txt")
+
+    stacks = {}
+    for line in folded.read_text(encoding="utf-8").splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    assert all(count > 0 for count in stacks.values())
+    # rooted at the thread name, then the outermost frame down to the leaf
+    main = [stack for stack in stacks if stack.startswith("MainThread;")]
+    assert any("engine.ActivityEngine.backfill" in stack for stack in main)
+    assert "gag-profiler" not in "".join(stacks)
+
+    text = report.read_text(encoding="utf-8")
+    assert "scopes: backfill x1," in text.splitlines()[0]
+    assert "top 30 by self" in text and "top 30 by total" in text
+
+
+def test_mem_profile_reports_each_scope(run_profiled, tmp_path):
+    (report,) = run_profiled("mem", tmp_path / "missing", "preview", "--from", "2025-01-01", "--to", "2025-03-31", dry_run=True)
+    assert report.name.endswith(".mem.txt")
+    text = report.read_text(encoding="utf-8")
+    header, peak = text.splitlines()[:2]
+    assert "scopes: preview x1," in header
+    assert peak.startswith("# peak traced ")
+    assert text.count("\n## preview at ") == 1
+    assert "engine.py" in text
+
+
+def test_unprofiled_run_writes_nothing(run_profiled, monkeypatch, tmp_path):
+    monkeypatch.delenv(profiling.PROFILE_ENV)
+    with profiling.scope("backfill"):
+        pass
+    assert profiling._sessions == {}
+    with pytest.raises(ValueError, match="Unknown profile kind"):
+        profiling.enable("io", tmp_path)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import asdict
+from datetime import date
+
+import pytest
+
+from conftest import git
+
+from git_activity_generator import cli
+from git_activity_generator.config import PushConfig
+from git_activity_generator.engine import ActivityEngine, PreparedCommit
+from git_activity_generator.pushing import PushError, RemotePusher, _AttemptFailed, transient
+
+DAY = date(2025, 1, 6)
+
+
+def test_push_retries_a_transient_failure(make_repo, make_config, monkeypatch):
+    repo = make_repo()
+    real, calls = RemotePusher._attempt, []
+
+    async def flaky(self, remote, ref):
+        calls.append(remote)
+        if len(calls) == 1:
+            raise _AttemptFailed("fatal: the remote end hung up unexpectedly", retryable=True)
+        return await real(self, remote, ref)
+
+    monkeypatch.setattr(RemotePusher, "_attempt", flaky)
+    stats = ActivityEngine(make_config(repo, push=PushConfig(backoff=0))).backfill(DAY, DAY, progress_every=0)
+
+    assert calls == ["origin", "origin"]
+    assert stats.metrics.push_retries == {"origin": 1}
+    assert git(repo, "rev-parse", "main") == git(repo, "rev-parse", "origin/main")
+
+
+def test_push_gives_up_at_once_on_a_missing_remote(make_repo, make_config, tmp_path):
+    missing = str(tmp_path / "missing.git")
+    engine = ActivityEngine(make_config(make_repo(), push=PushConfig(remotes=[missing, "origin"], backoff=0)))
+    with pytest.raises(PushError) as raised:
+        engine.backfill(DAY, DAY, progress_every=0)
+
+    (failed,) = raised.value.failed
+    assert (failed.remote, failed.attempts) == (missing, 1)
+    assert "does not appear to be a git repository" in failed.error
+    # the other remote still got the push, and the run was closed out
+    assert raised.value.stats.metrics.push_failures == {missing: 1, "origin": 0}
+    assert raised.value.stats.commits_created > 0
+
+
+def test_push_batches_count_payload_bytes(make_repo, make_config):
+    engine = ActivityEngine(make_config(make_repo(), push=PushConfig(every_bytes=16)))
+    engine._count_unpushed(PreparedCommit(plan=None, payload="é" * 6, message="", seconds=0.0))
+    assert engine.unpushed_bytes == 12 and not engine.push_due()
+    engine._count_unpushed(PreparedCommit(plan=None, payload=b"\x00" * 4, message="", seconds=0.0))
+    assert engine.unpushed_bytes == 16 and engine.push_due()
+
+
+@pytest.mark.parametrize(
+    "output, retry",
+    [
+        ("fatal: the remote end hung up unexpectedly", True),
+        ("fatal: unable to access 'https://example.com/r.git/': Could not resolve host: example.com", True),
+        ("timed out after 30s", True),
+        ("fatal: 'nope' does not appear to be a git repository", False),
+        ("remote: Repository not found.\nfatal: repository 'https://example.com/r.git/' not found", False),
+        ("fatal: Authentication failed for 'https://example.com/r.git/'", False),
+        ("git@example.com: Permission denied (publickey).", False),
+        ("!\trefs/heads/main:refs/heads/main\t[rejected] (non-fast-forward)", False),
+        ("!\trefs/heads/main:refs/heads/main\t[remote rejected] (pre-receive hook declined)", False),
+    ],
+)
+def test_transient(output, retry):
+    assert transient(output) is retry
+
+
+def test_backfill_reports_a_failed_push(make_repo, make_config, tmp_path, monkeypatch, capsys):
+    repo = make_repo()
+    metrics = tmp_path / "metrics.prom"
+    cfg = make_config(repo, push=PushConfig(remotes=[str(tmp_path / "missing.git")]), metrics_textfile=str(metrics))
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps(asdict(cfg)), encoding="utf-8")
+
+    day = DAY.isoformat()
+    monkeypatch.setattr(sys, "argv", ["gag", "--config", str(config), "backfill", "--from", day, "--to", day])
+    assert cli.main() == 1
+
+    summary = json.loads(capsys.readouterr().out)
+    assert "does not appear to be a git repository" in summary["error"]
+    assert summary["created"] == summary["planned"] > 0
+    assert metrics.exists()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from conftest import git, history
+
+from git_activity_generator.config import TreeConfig, WorktreeConfig
+from git_activity_generator.engine import ActivityEngine
+from git_activity_generator.git_ops import GitService
+from git_activity_generator.store import PlanStore
+from git_activity_generator.worktrees import WorktreePool
+
+START, END = date(2025, 1, 1), date(2025, 1, 6)
+# the call to crash on, as (commits, plan store marks), somewhere in the middle of the run; worktree lanes commit
+# only branch windows, and windows are marked `committing` well ahead of their lane commits
+CRASH_AT = {"worktrees": (12, 80)}
+
+MODES = {
+    "default": {},
+    "fast-import": {"commit_backend": "fast-import"},
+    "tree": {"tree": TreeConfig(enabled=True, target_files=40)},
+    "worktrees": {"worktrees": WorktreeConfig(enabled=True, branches=2)},
+}
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_on_call(monkeypatch, owner, name, count, after=False):
+    """Make `owner.name` raise `Crash` on its `count`-th call, before or after the real call."""
+    real = getattr(owner, name)
+    calls = []
+
+    def wrapper(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == count and not after:
+            raise Crash(name)
+        result = real(self, *args, **kwargs)
+        if len(calls) == count:
+            raise Crash(name)
+        return result
+
+    monkeypatch.setattr(owner, name, wrapper)
+
+
+def uninterrupted(make_repo, make_config, tmp_path, mode):
+    repo = make_repo("reference")
+    ActivityEngine(make_config(repo, plan_store=str(tmp_path / "reference.sqlite"), **MODES[mode])).backfill(START, END, progress_every=0)
+    return history(repo)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("where", ["before-commit", "after-commit", "before-record"])
+def test_resume_after_crash_matches_uninterrupted_run(make_repo, make_config, tmp_path, monkeypatch, mode, where):
+    expected = uninterrupted(make_repo, make_config, tmp_path, mode)
+
+    repo = make_repo("crashed")
+    cfg = make_config(repo, plan_store=str(tmp_path / "crashed.sqlite"), **MODES[mode])
+    commits, marks = CRASH_AT.get(mode, (17, 34))
+    with monkeypatch.context() as patch:
+        if where == "before-record":
+            # committed in git, but the store still says `committing`
+            crash_on_call(patch, PlanStore, "mark", marks)
+        elif mode == "worktrees":
+            # a lane commit fails; the lanes stop and the run's unmerged branches are dropped
+            crash_on_call(patch, WorktreePool, "commit", commits, after=where == "after-commit")
+        else:
+            # the edit is on disk; the commit either never ran or ran and was not recorded
+            crash_on_call(patch, GitService, "commit_all", commits, after=where == "after-commit")
+        with pytest.raises(Exception) as raised:
+            ActivityEngine(cfg).backfill(START, END, progress_every=0)
+        # lanes report a failed job on the next one they skip, chained to the original error
+        assert isinstance(raised.value, Crash) or isinstance(raised.value.__cause__, Crash)
+
+    stats = ActivityEngine(cfg).backfill(START, END, progress_every=0)
+
+    assert history(repo) == expected
+    if mode != "fast-import":
+        # fast-import only updates refs when its stream ends, so there nothing before the crash was kept
+        assert 0 < stats.commits_created < stats.commits_planned
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_relative_plan_store_lives_in_the_repo(make_repo, make_config, tmp_path, monkeypatch):
+    repo = make_repo()
+    elsewhere = tmp_path / "cron-cwd"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    cfg = make_config(repo, plan_store=".git/activity-plan.sqlite")
+    ActivityEngine(cfg).backfill(START, START, progress_every=0)
+
+    assert (repo / ".git" / "activity-plan.sqlite").exists()
+    assert list(elsewhere.iterdir()) == []
+    windows = ActivityEngine(cfg).plan_day(START)
+    assert windows and all(w.status == "pushed" for w in windows)
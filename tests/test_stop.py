@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from git_activity_generator import cli
+
+# stands in for `cli.cmd_start`: holds the pid file's lock and waits to be signalled
+DAEMON = """
+import fcntl, os, sys, time
+handle = open(sys.argv[1], "a+")
+fcntl.flock(handle, fcntl.LOCK_EX)
+handle.write(str(os.getpid()))
+handle.flush()
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def daemon():
+    proc = subprocess.Popen([sys.executable, "-c", DAEMON, str(cli.PID_FILE)], stdout=subprocess.PIPE, text=True)
+    assert proc.stdout.readline().strip() == "ready"
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def test_stop_signals_the_daemon_holding_the_lock(capsys, daemon):
+    assert cli.cmd_stop(None) == 0
+    assert daemon.wait(timeout=10) == -signal.SIGTERM
+    assert capsys.readouterr().out.strip() == f"Stop signal sent to {daemon.pid}."
+
+
+def test_stop_reports_a_daemon_it_may_not_signal(capsys, monkeypatch, daemon):
+    def refuse(*args):
+        raise PermissionError("Operation not permitted")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "kill", refuse)
+        assert cli.cmd_stop(None) == 1
+    assert cli.PID_FILE.exists()
+    assert "Could not stop the daemon" in capsys.readouterr().out
+
+
+def test_stop_never_signals_a_stale_pid(capsys, monkeypatch):
+    # a reused pid: the daemon is gone and some other process, here the test itself, has its pid
+    cli.PID_FILE.write_text(str(os.getpid()), encoding="utf-8")
+    monkeypatch.setattr(os, "kill", lambda *args: pytest.fail("signalled a stale pid"))
+    assert cli.cmd_stop(None) == 0
+    assert not cli.PID_FILE.exists()
+    assert "Stale pid file removed." in capsys.readouterr().out
+
+
+def test_stop_without_pid_file(capsys):
+    assert cli.cmd_stop(None) == 0
+    assert "No active loop detected." in capsys.readouterr().out
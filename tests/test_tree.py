@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import random
+
+from git_activity_generator.config import TreeConfig
+from git_activity_generator.tree import TreeGrower
+
+# a small tree that only ever reuses shared blobs, so rewrites keep drawing the blob a file holds
+CFG = TreeConfig(target_files=4, median_size=64, size_sigma=0.5, reuse_probability=1.0)
+
+
+def grow(grower: TreeGrower, rng: random.Random, edits: int) -> int:
+    rewrites = 0
+    for _ in range(edits):
+        edit = grower.plan(rng)
+        data = grower.render(edit)
+        if edit.op == "write" and edit.path.exists():
+            rewrites += 1
+            assert edit.path.read_bytes() != data, f"no-op rewrite of {edit.path}"
+        grower.apply(edit, data)
+    return rewrites
+
+
+def test_rewrites_never_write_the_blob_a_file_holds(tmp_path):
+    rng = random.Random(7)
+    # the second grower starts from what the first left on disk, like a later run
+    rewrites = grow(TreeGrower(CFG, tmp_path), rng, 1500) + grow(TreeGrower(CFG, tmp_path), rng, 1500)
+    assert rewrites > 2000